@@ -0,0 +1,49 @@
+# import standard modules
+import json
+import argparse
+
+# import third party modules
+
+# import project related modules
+
+
+def load(path: str):
+    """
+    reads a result file written by stages.py.
+
+    :param path: str: path of the json result file
+
+    :return: tuple: (meta data dict, dict of (benchmark, case, stage) -> seconds)
+    """
+
+    with open(path) as file:
+        data = json.load(file)
+
+    return data["meta"], {(r["benchmark"], r["case"], r["stage"]): r["seconds"] for r in data["results"]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="compares two result files of stages.py")
+    parser.add_argument("baseline", help="result file of the reference commit")
+    parser.add_argument("candidate", help="result file of the commit to compare")
+    args = parser.parse_args()
+
+    base_meta, base = load(args.baseline)
+    cand_meta, cand = load(args.candidate)
+    print(f"baseline {base_meta.get('commit')} vs candidate {cand_meta.get('commit')}")
+
+    # speedup > 1 means the candidate is faster, stages one of the checkouts skipped are listed without numbers
+    for key in base:
+        if key not in cand:
+            continue
+        benchmark, case, stage = key
+        if base[key] is None or cand[key] is None:
+            skipped = "baseline" if base[key] is None else "candidate"
+            print(f"{benchmark:<8} {case:<40} {stage:<22} {'skipped':>15} in {skipped}")
+            continue
+        print(f"{benchmark:<8} {case:<40} {stage:<22} {base[key] * 1e6:12.2f} us {cand[key] * 1e6:12.2f} us "
+              f"{base[key] / cand[key]:8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
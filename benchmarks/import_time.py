@@ -0,0 +1,83 @@
+# import standard modules
+import os
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+
+# import third party modules
+
+# import project related modules
+
+
+# root of the repository - each measurement runs in a fresh interpreter with the root as working directory
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# modules of interest and heavy dependencies which should not be imported by the core modules
+MODULES = [
+    "components.controller.membership",
+    "components.controller.rules",
+    "components.controller.fuzzy",
+    "components.vehicle.bidirectional",
+]
+HEAVY = ["pandas", "matplotlib", "scipy", "shapely"]
+
+SNIPPET = """
+import sys, time, json
+start = time.perf_counter()
+import {module}
+duration = time.perf_counter() - start
+print(json.dumps({{"seconds": duration, "loaded": [m for m in {heavy} if m in sys.modules]}}))
+"""
+
+
+def measure(module: str, repeat: int = 5, root: str = ROOT):
+    """
+    measures the time to import a module in a fresh interpreter and which heavy dependencies got imported with it.
+
+    :param module: str: dotted name of the module e.g. "components.controller.fuzzy"
+    :param repeat: int: amount of fresh interpreters, the median is reported (default: 5)
+    :param root: str: root of the checkout the module gets imported from (default: this repository)
+
+    :return: dict: {"module": name, "seconds": median import time or None if the import failed, "runs": all
+                   import times, "loaded": heavy dependencies imported with the module}
+    """
+
+    runs, loaded = list(), list()
+    for _ in range(repeat):
+        result = subprocess.run([sys.executable, "-c", SNIPPET.format(module=module, heavy=HEAVY)], cwd=root,
+                                capture_output=True, text=True)
+
+        # e.g. a module which does not exist in an older checkout
+        if result.returncode != 0:
+            return {"module": module, "seconds": None, "runs": list(), "loaded": list()}
+
+        record = json.loads(result.stdout.strip().splitlines()[-1])
+        runs.append(record["seconds"])
+        loaded = record["loaded"]
+
+    return {"module": module, "seconds": statistics.median(runs), "runs": runs, "loaded": loaded}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="import time of the project modules in fresh interpreters")
+    parser.add_argument("--repeat", type=int, default=5, help="fresh interpreters per module")
+    parser.add_argument("--root", default=ROOT, help="checkout to measure e.g. a worktree of an older commit")
+    parser.add_argument("--output", default=None, help="optional path of a json file for the results")
+    args = parser.parse_args()
+
+    results = [measure(module, repeat=args.repeat, root=args.root) for module in MODULES]
+    for result in results:
+        if result["seconds"] is None:
+            print(f"{result['module']:<40} import failed")
+            continue
+        print(f"{result['module']:<40} {result['seconds'] * 1000:8.1f} ms   heavy: {', '.join(result['loaded']) or '-'}")
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(results, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+# import standard modules
+import os
+import sys
+import json
+import argparse
+import itertools
+
+# import third party modules
+import numpy as np
+
+# import project related modules
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.stages import best_of, metadata
+from experiment.follow import build_controller, follow, lead_distances
+
+
+# inference modes compared with the mamdani mode (mode, crisp value, normalize)
+MODES = [
+    ("mamdani", "centroid", False),
+    ("sugeno", "centroid", False),
+    ("sugeno", "center", False),
+    ("sugeno", "centroid", True),
+    ("sugeno", "center", True),
+]
+
+
+def compare_modes(samples: int = 20000, number: int = 500, seed: int = 0):
+    """
+    evaluates the experiment controller (experiment/intervals.py) in each inference mode. The outputs get compared
+    with the mamdani mode on random input situations and in the headless car following experiment, the speed of run
+    and run_batch gets timed for each mode.
+
+    :param samples: int: amount of random input situations (default: 20000)
+    :param number: int: run calls per repeat (default: 500)
+    :param seed: int: seed of the random input situations (default: 0)
+
+    :return: list: one record per mode
+    """
+
+    fc = build_controller()
+    rng = np.random.default_rng(seed)
+    batch = np.stack([rng.uniform(m.min_value, m.max_value, samples) for m in fc.feature_space.values()], axis=1)
+    inputs = [dict(zip(fc.feature_space, row)) for row in batch[:256].tolist()]
+    lead = lead_distances()
+
+    reference, reference_follow, records = None, None, list()
+    for mode, crisp, normalize in MODES:
+        fc.set_inference(mode, crisp, normalize)
+        outputs = fc.run_batch(batch)
+        result = follow(fc, lead=lead)
+        if reference is None:
+            reference, reference_follow = outputs, result
+
+        items = itertools.cycle(inputs)
+        error = np.abs(outputs - reference)
+        records.append({
+            "mode": mode,
+            "crisp": crisp,
+            "normalize": normalize,
+            "max_abs_error": float(error.max()),
+            "mean_abs_error": float(error.mean()),
+            "correlation": float(np.corrcoef(outputs, reference)[0, 1]),
+            "run_seconds": best_of(lambda: fc.run(next(items)), number=number),
+            "run_batch_seconds_per_row": best_of(lambda: fc.run_batch(batch), number=1, repeat=3) / samples,
+            "follow_min_gap": float(result["gap"][1:].min()),
+            "follow_max_gap_difference": float(np.abs(result["gap"] - reference_follow["gap"]).max()),
+        })
+
+    return records
+
+
+def main():
+    parser = argparse.ArgumentParser(description="compares the mamdani and sugeno inference of the experiment")
+    parser.add_argument("--samples", type=int, default=20000, help="amount of random input situations")
+    parser.add_argument("--output", default=None, help="path of a json result file")
+    args = parser.parse_args()
+
+    records = compare_modes(samples=args.samples)
+
+    print(f"{'mode':<26} {'max error':>10} {'mean error':>10} {'corr':>7} {'run':>10} {'batch/row':>10} "
+          f"{'min gap':>8} {'gap diff':>9}")
+    for r in records:
+        name = f"{r['mode']} {r['crisp']}" + (" normalized" if r["normalize"] else "")
+        print(f"{name:<26} {r['max_abs_error']:10.4f} {r['mean_abs_error']:10.4f} {r['correlation']:7.4f} "
+              f"{r['run_seconds'] * 1e6:8.1f}us {r['run_batch_seconds_per_row'] * 1e6:8.2f}us "
+              f"{r['follow_min_gap']:8.2f} {r['follow_max_gap_difference']:9.2f}")
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump({"meta": metadata(), "results": records}, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
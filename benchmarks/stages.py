@@ -0,0 +1,277 @@
+# import standard modules
+import os
+import sys
+import json
+import time
+import timeit
+import argparse
+import platform
+import itertools
+import subprocess
+
+# import third party modules
+import numpy as np
+import pandas as pd
+
+# import project related modules - they get imported on first use, so --root can point to another checkout first
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+# synthetic controllers (inputs, members per input) - the rule sets are complete grids over all member combinations,
+# so the amount of rules grows with both
+CASES = [(2, 5), (3, 5), (4, 5), (3, 9), (4, 9), (3, 15), (5, 7)]
+QUICK_CASES = [(2, 5), (3, 5), (3, 9)]
+
+
+def synthetic_members(n: int):
+    """
+    creates n evenly spaced triangle members on [0, 1] with shoulders at both ends, like the settings of the experiment.
+
+    :param n: int: amount of members
+
+    :return: dict: members in the structure handed over to set_inputs and set_output
+    """
+
+    centers = np.linspace(0, 1, n)
+    members = dict()
+    for ix, center in enumerate(centers):
+        lower = centers[max(ix - 1, 0)]
+        upper = centers[min(ix + 1, n - 1)]
+        members[f"m{ix}"] = {"lower_end": float(lower), "center": float(center), "upper_end": float(upper)}
+    return members
+
+
+def synthetic_controller(n_inputs: int, n_members: int, seed: int = 0):
+    """
+    creates a controller with n_inputs input parameters of n_members members each and a complete rule grid with
+    random output members.
+
+    :param n_inputs: int: amount of input parameters
+    :param n_members: int: amount of members per input and output parameter
+    :param seed: int: seed of the random output members (default: 0)
+
+    :return: FuzzyController: controller with inputs, rule set and output handed over
+    """
+    from components.controller.fuzzy import FuzzyController
+
+    rng = np.random.default_rng(seed)
+    members = synthetic_members(n_members)
+    names = [f"x{ix}" for ix in range(n_inputs)]
+
+    grid = np.array(list(itertools.product(range(n_members), repeat=n_inputs)))
+    rules = pd.DataFrame({name: [f"m{m}" for m in grid[:, ix]] for ix, name in enumerate(names)})
+    rules["y"] = [f"m{m}" for m in rng.integers(0, n_members, len(grid))]
+
+    fc = FuzzyController()
+    fc.set_inputs({name: [members, ""] for name in names})
+    fc.set_ruleset(rules)
+    fc.set_output(members, "y")
+    return fc
+
+
+def experiment_controller(root: str = ROOT):
+    """
+    creates the distance controller of the experiment like experiment.follow.build_controller, but only with the
+    modules every checkout has (intervals.py and test_rules.csv).
+
+    :param root: str: root of the checkout (default: this repository)
+
+    :return: FuzzyController: controller with inputs, rule set and output handed over
+    """
+    from experiment.intervals import accel, settings
+    from components.controller.fuzzy import FuzzyController
+
+    fc = FuzzyController()
+    fc.set_inputs(settings)
+    fc.set_ruleset(pd.read_csv(os.path.join(root, "experiment", "test_rules.csv"), sep=";"))
+    fc.set_output(accel, "acceleration")
+    return fc
+
+
+def rule_count(fc):
+    """
+    amount of rules of a controller, also for checkouts without a compiled rule index.
+
+    :param fc: FuzzyController: controller with the rule set handed over
+
+    :return: int: amount of rules
+    """
+
+    if getattr(fc, "rule_index", None) is not None:
+        return fc.rule_index.size
+    return len(fc.rules)
+
+
+def best_of(function, number: int, repeat: int = 5):
+    """
+    times a function and returns the best seconds per call over all repeats.
+
+    :param function: callable: function without arguments
+    :param number: int: calls per repeat
+    :param repeat: int: amount of repeats (default: 5)
+
+    :return: float: seconds per call
+    """
+
+    return min(timeit.repeat(function, number=number, repeat=repeat)) / number
+
+
+def _time_stage(function, number: int, repeat: int = 5):
+    """
+    times a stage which may be missing or fail in an older checkout.
+
+    :param function: callable: function without arguments, None if the checkout does not have the stage
+    :param number: int: calls per repeat
+    :param repeat: int: amount of repeats (default: 5)
+
+    :return: tuple: (seconds, error) - seconds per call or None and the reason why the stage was skipped
+    """
+
+    if function is None:
+        return None, "missing"
+    try:
+        return best_of(function, number=number, repeat=repeat), None
+    except Exception as exc:
+        return None, repr(exc)
+
+
+def stage_benchmarks(fc, case: str, samples: int = 64, number: int = 200, seed: int = 0):
+    """
+    times each stage of the controller on its own with the output of the previous stage as input, plus full run and
+    run_batch calls. Each timing cycles over a fixed set of random input situations. Stages the controller does not
+    have or which fail (e.g. in an older checkout) get None as seconds and the reason as "skipped".
+
+    :param fc: FuzzyController: controller with all settings handed over
+    :param case: str: description of the controller
+    :param samples: int: amount of random input situations (default: 64)
+    :param number: int: calls per repeat (default: 200)
+    :param seed: int: seed of the random input situations (default: 0)
+
+    :return: list: one record per stage
+    """
+
+    rng = np.random.default_rng(seed)
+    inputs = [{name: rng.uniform(m.min_value, m.max_value) for name, m in fc.feature_space.items()}
+              for _ in range(samples)]
+
+    def prepare(function, arguments):
+        try:
+            return [function(argument) for argument in arguments] if arguments is not None else None
+        except Exception:
+            return None
+
+    def cycle(name, arguments):
+        function = getattr(fc, name, None)
+        if function is None or arguments is None:
+            return None
+        items = itertools.cycle(arguments)
+        return lambda: function(next(items))
+
+    perceptions = prepare(getattr(fc, "_fuzzification", None), inputs)
+    results = prepare(getattr(fc, "_inference", None), perceptions)
+
+    stages = {
+        "_fuzzification": cycle("_fuzzification", inputs),
+        "_get_rule_subset": cycle("_get_rule_subset", perceptions),
+        "_inference": cycle("_inference", perceptions),
+        "_defuzzification": cycle("_defuzzification", results),
+        "run": cycle("run", inputs),
+    }
+
+    records = list()
+    for stage, function in stages.items():
+        seconds, skipped = _time_stage(function, number=number)
+        records.append({"benchmark": "stages", "case": case, "stage": stage, "seconds": seconds, "skipped": skipped})
+
+    # batch evaluation - seconds per row
+    batch = np.array([[x[name] for name in fc.feature_space] for x in inputs * 64])
+    function = (lambda: fc.run_batch(batch)) if hasattr(fc, "run_batch") else None
+    seconds, skipped = _time_stage(function, number=1, repeat=3)
+    records.append({"benchmark": "stages", "case": case, "stage": "run_batch (per row)",
+                    "seconds": seconds / len(batch) if seconds is not None else None, "skipped": skipped})
+    return records
+
+
+def follow_benchmark(repeat: int = 5):
+    """
+    times the headless car following experiment (60 seconds, one controller call per second).
+
+    :param repeat: int: amount of repeats, the best is reported (default: 5)
+
+    :return: list: records for the full experiment and per simulated second, seconds None for checkouts without
+                   experiment.follow
+    """
+
+    try:
+        from experiment.follow import build_controller, follow
+    except ImportError as exc:
+        seconds, skipped = None, repr(exc)
+    else:
+        fc = build_controller()
+        follow(fc)     # warm up - imports and route interpolation
+        seconds, skipped = _time_stage(lambda: follow(fc), number=1, repeat=repeat)
+
+    return [
+        {"benchmark": "follow", "case": "experiment 60s", "stage": "experiment", "seconds": seconds,
+         "skipped": skipped},
+        {"benchmark": "follow", "case": "experiment 60s", "stage": "per simulated second",
+         "seconds": seconds / 60 if seconds is not None else None, "skipped": skipped},
+    ]
+
+
+def metadata(root: str = ROOT):
+    """
+    describes the environment of a benchmark run, so result files of different commits can be told apart.
+
+    :param root: str: root of the measured checkout (default: this repository)
+
+    :return: dict: commit, python, numpy and platform information
+    """
+
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=root, capture_output=True,
+                                text=True).stdout.strip()
+    except OSError:
+        commit = ""
+
+    return {
+        "commit": commit,
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="benchmarks of each controller stage and the follow experiment")
+    parser.add_argument("--quick", action="store_true", help="only the small synthetic controllers")
+    parser.add_argument("--output", default="benchmark_results.json", help="path of the json result file")
+    parser.add_argument("--root", default=ROOT, help="checkout to measure e.g. a worktree of an older commit")
+    args = parser.parse_args()
+
+    # the project modules come from the measured checkout only - the project folders have no __init__.py, so with both
+    # checkouts on the path python would merge their modules
+    root = os.path.abspath(args.root)
+    sys.path[:] = [root] + [path for path in sys.path if os.path.abspath(path or os.curdir) != ROOT]
+
+    records = list()
+    for n_inputs, n_members in (QUICK_CASES if args.quick else CASES):
+        fc = synthetic_controller(n_inputs, n_members)
+        case = f"inputs={n_inputs} members={n_members} rules={rule_count(fc)}"
+        records += stage_benchmarks(fc, case)
+
+    records += stage_benchmarks(experiment_controller(root), "experiment controller")
+    records += follow_benchmark()
+
+    for record in records:
+        seconds = f"{record['seconds'] * 1e6:12.2f} us" if record["seconds"] is not None else f"{'skipped':>15}"
+        print(f"{record['benchmark']:<8} {record['case']:<40} {record['stage']:<22} {seconds}")
+
+    with open(args.output, "w") as file:
+        json.dump({"meta": metadata(root), "results": records}, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+# import standard modules
+import threading
+from collections import OrderedDict
+
+# import third party modules
+import numpy as np
+
+# import project related modules
+
+
+class ResultCache:
+    """
+    Class that memoizes controller outputs for quantized input situations. Each input value gets rounded to a
+    multiple of the resolution of its parameter, the rounded values form the key of the cache. The cache holds at most
+    maxsize entries and evicts the least recently used one. All operations are guarded by a lock, so a controller
+    shared by several threads can use the cache as well.
+
+    :param names: list: names of the input parameters in the order of the key
+    :param resolution: float or dict: step size the inputs get rounded to, either one value for all parameters or a
+                                      dict with the name of the parameter as key. None or 0 keeps a value as it is.
+    :param maxsize: int: max amount of cached outputs (default: 4096)
+    """
+
+    def __init__(self, names: list, resolution, maxsize: int = 4096):
+        if isinstance(resolution, dict):
+            self.resolution = [resolution.get(name) for name in names]
+        else:
+            self.resolution = [resolution] * len(names)
+
+        self.names = list(names)          # names of the input parameters in the order of the key
+        self.setting = resolution         # resolution as handed over, to build the cache again for other names
+        self.maxsize = maxsize            # max amount of cached outputs
+        self._entries = OrderedDict()     # key -> output, least recently used first
+        self._lock = threading.Lock()
+        self.hits = 0                     # requests answered from the cache
+        self.misses = 0                   # requests which needed the controller
+        self.evictions = 0                # outputs dropped because the cache was full
+
+    def quantize(self, inputs: dict):
+        """
+        rounds an input situation to the resolution of each parameter.
+
+        :param inputs: dict: contains key name of each input parameter and an absolute value for each input parameter
+
+        :return: tuple: (key, quantized inputs) - the key is a tuple of integers (or raw values without resolution)
+                        and the quantized inputs a dict with the rounded values. None if the inputs can not be
+                        cached (missing parameter, a value which is no finite number), the controller handles them
+                        without cache
+        """
+
+        key, quantized = list(), dict()
+        try:
+            for name, step in zip(self.names, self.resolution):
+                value = float(inputs[name])
+                if value != value:
+                    return None
+                if step:
+                    value = round(value / step)
+                    quantized[name] = value * step
+                else:
+                    quantized[name] = value
+                key.append(value)
+        except (KeyError, TypeError, ValueError, OverflowError):
+            return None
+
+        return tuple(key), quantized
+
+    def get(self, key: tuple):
+        """
+        looks up a cached output and marks it as recently used.
+
+        :param key: tuple: key created by quantize
+
+        :return: float: cached output or None if the key is not cached
+        """
+
+        with self._lock:
+            try:
+                self._entries.move_to_end(key)
+            except KeyError:
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            return self._entries[key]
+
+    def put(self, key: tuple, output):
+        """
+        stores an output and evicts the least recently used entries if the cache is full.
+
+        :param key: tuple: key created by quantize
+        :param output: float: controller output for the quantized inputs
+
+        :return: None
+        """
+
+        with self._lock:
+            self._entries[key] = output
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        """
+        drops all cached outputs, e.g. because the settings of the controller changed. The counters are kept.
+
+        :return: None
+        """
+
+        with self._lock:
+            self._entries.clear()
+
+    def invalidate(self, affected):
+        """
+        drops the cached outputs of some input situations only, e.g. because a few rules of the controller changed.
+        The counters are kept.
+
+        :param affected: callable: takes the quantized inputs of all cached outputs as N x k array (columns in the
+                                   order of names) and returns a boolean array, True for each output to drop
+
+        :return: int: amount of dropped outputs
+        """
+
+        with self._lock:
+            keys = list(self._entries)
+            if not keys:
+                return 0
+
+            # the quantized inputs of each key, the same values quantize handed to the controller
+            values = [[value * step if step else value for value, step in zip(key, self.resolution)] for key in keys]
+            dropped = [key for key, drop in zip(keys, affected(np.array(values, dtype=float)).tolist()) if drop]
+            for key in dropped:
+                del self._entries[key]
+            return len(dropped)
+
+    def stats(self):
+        """
+        counters of the cache.
+
+        :return: dict: {"hits", "misses", "evictions", "size", "maxsize", "hit_rate"}
+        """
+
+        with self._lock:
+            requests = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hit_rate": self.hits / requests if requests else 0.0,
+            }
@@ -0,0 +1,307 @@
+# import standard modules
+import types
+
+# import third party modules
+import numpy as np
+
+# import project related modules
+from components.controller.rules import RuleTensor
+
+
+HEADER = '''"""
+Fuzzy controller generated by components.controller.codegen - do not edit, generate it again from the controller.
+
+inputs: {inputs}
+outputs: {outputs}
+mode: {mode}
+
+evaluate({arguments}) returns the reaction for the input values in the order of INPUTS, run(inputs) takes a dict
+with the name of each input parameter as key like FuzzyController.run.
+"""
+
+# import standard modules
+import math
+
+
+INPUTS = {input_names}
+OUTPUTS = {output_names}
+MODE = {mode!r}
+'''
+
+RATIO = '''
+
+def _ratio(moment, area):
+    # division with the results of numpy for an area of zero
+    if area:
+        return moment / area
+    if moment != moment or not moment:
+        return math.nan
+    return math.copysign(math.inf, moment) * math.copysign(1.0, area)
+'''
+
+
+def _literal(value):
+    """
+    writes a number as python literal which reads back to the same float.
+
+    :param value: float: number
+
+    :return: str: literal e.g. "0.25", "math.inf"
+    """
+
+    value = float(value)
+    if value != value:
+        return "math.nan"
+    if value in (np.inf, -np.inf):
+        return "math.inf" if value > 0 else "-math.inf"
+    return repr(value)
+
+
+def _literal_tuple(values):
+    """
+    writes numbers as python tuple literal.
+
+    :param values: iterable: numbers
+
+    :return: str: literal e.g. "(0.25, 1.0)"
+    """
+
+    items = [_literal(value) for value in values]
+    return "(" + ", ".join(items) + ("," if len(items) == 1 else "") + ")"
+
+
+def _rule_table(controller):
+    """
+    collects the member ids of all rules of a controller, grouped by the combination of their input members.
+
+    :param controller: FuzzyController: controller with all settings handed over
+
+    :return: tuple: (rules, members) - dict of input member ids (-1 unknown) -> list of output member ids of each rule
+                    in the order of the rule set and per input parameter the sorted member ids used by the rules
+    """
+
+    index = controller.rule_index
+    positions = np.arange(index.size)
+    if isinstance(index, RuleTensor):
+        positions = positions[index.has_rule(positions)]
+
+    inputs = np.stack([controller._input_codes[name][index.get_codes(name, positions)]
+                       for name in controller.feature_space], axis=1).tolist()
+    outputs = np.stack([controller._output_codes[name][index.get_codes(name, positions)]
+                        for name in controller.outputs], axis=1).tolist()
+
+    # removed rules (all member ids -1) never fire
+    rules = dict()
+    for members, actions in zip(inputs, outputs):
+        if max(actions) >= 0:
+            rules.setdefault(tuple(members), list()).append(tuple(actions))
+
+    members = [sorted({key[ix] for key in rules}) for ix in range(len(controller.feature_space))]
+    return rules, members
+
+
+def generate_source(controller):
+    """
+    writes a fitted controller as standalone python module which only needs the standard library. The triangles of
+    all members, the rule set and the centroid tables (or crisp values) are constants of the module, the
+    fuzzification of each member is inlined as straight line code. The generated evaluate function follows the same
+    steps as run: inputs are clipped to the scale of their parameter, a parameter without any active member does not
+    limit the rules, the degree of a rule is the mean over all input parameters and the reaction is the sum of the
+    weighted centroids (or crisp values). Only the combinations of the active members are looked up in the rule set.
+
+    Lookup tables, caches and statistics of the controller are not part of the module.
+
+    :param controller: FuzzyController: controller with all settings handed over
+
+    :return: str: source code of the module
+    """
+
+    inputs = list(controller.feature_space)
+    outputs = list(controller.outputs)
+    missing = [name for name in inputs + outputs
+               if name not in {**controller._input_codes, **controller._output_codes}]
+    if missing:
+        raise ValueError(f"the rule set does not contain the parameters {missing}")
+
+    rules, members = _rule_table(controller)
+    arguments = [f"x{ix}" for ix in range(len(inputs))]
+    sugeno = controller.mode == "sugeno"
+
+    lines = [HEADER.format(inputs=", ".join(inputs), outputs=", ".join(outputs), mode=controller.mode,
+                           arguments=", ".join(arguments), input_names=tuple(inputs), output_names=tuple(outputs))]
+
+    # member ids of each input parameter used by the rules, all of them are candidates without an active member
+    lines.append("# member ids of each input parameter used by the rules (-1 for members unknown to the parameter)")
+    lines.append(f"MEMBERS = {tuple(tuple(m) for m in members)!r}")
+    lines.append("")
+
+    # output tables - corner points of each member for the closed form centroid or one crisp value per member
+    for k, name in enumerate(outputs):
+        if sugeno:
+            lines.append(f"# crisp value of each member of {name}")
+            lines.append(f"CRISP_{k} = {_literal_tuple(controller._crisp_values[name][:-1])}")
+        else:
+            table = controller._centroid_tables[name]
+            lines.append(f"# lower, rise, upper, fall and shoulder of each member of {name}")
+            lines.append(f"CORNERS_{k} = (")
+            for corners in zip(*(table[key] for key in ("lower", "rise", "upper", "fall", "shoulder"))):
+                lines.append(f"    {_literal_tuple(corners)},")
+            lines.append(")")
+        lines.append("")
+
+    # rules by their combination of input members, each with the output member ids of all outputs
+    lines.append("# output member ids (-1 unknown) of the rules of each combination of input member ids")
+    lines.append("RULES = {")
+    for key, actions in rules.items():
+        lines.append(f"    {key!r}: {tuple(actions)!r},")
+    lines.append("}")
+
+    if not sugeno:
+        lines.append(RATIO)
+        for k in range(len(outputs)):
+            lines += [
+                "",
+                f"def _centroid_{k}(member, degree):",
+                f"    a, rise, c, fall, shoulder = CORNERS_{k}[member]",
+                "    if shoulder > 0:",
+                "        return a + (c - a) * (degree + 2) / 3 if degree < 1 else (a + c) / 2",
+                "    p = a + degree * rise",
+                "    q = c - degree * fall",
+                "    area = degree * (a + p - q - c)",
+                "    moment = degree * (a * a + a * p + p * p - q * q - q * c - c * c)",
+                "    return _ratio(moment, 3 * area)",
+            ]
+        lines.append("")
+
+    # fuzzification - one line per member with its triangle inlined
+    lines += ["", f"def evaluate({', '.join(arguments)}):"]
+    for ix, (name, argument) in enumerate(zip(inputs, arguments)):
+        membership = controller.feature_space[name]
+        lines.append(f"    # {name}")
+        lines.append(f"    x = min(max(float({argument}), {_literal(membership.min_value)}), "
+                     f"{_literal(membership.max_value)})")
+        lines.append(f"    a{ix} = []")
+        for member, (lower, center, upper) in enumerate(zip(membership.lower, membership.center, membership.upper)):
+            rising = f"(x - {_literal(lower)}) / {_literal(center - lower)}" if center > lower else "1.0"
+            falling = f"({_literal(upper)} - x) / {_literal(upper - center)}" if upper > center else "1.0"
+            lines.append(f"    if {_literal(lower)} <= x <= {_literal(upper)}:")
+            lines.append(f"        d = min({rising}, {falling})")
+            lines.append("        if d > 0:")
+            lines.append(f"            a{ix}.append(({member}, d))")
+
+    # without any active member no rule has a degree above zero
+    lines.append("")
+    lines.append(f"    if not ({' or '.join(f'a{ix}' for ix in range(len(inputs)))}):")
+    lines.append(f"        return {'0' if len(outputs) == 1 else '{' + ', '.join(f'{n!r}: 0' for n in outputs) + '}'}")
+    lines.append("")
+
+    for ix in range(len(inputs)):
+        lines.append(f"    c{ix} = a{ix} or [(m, 0.0) for m in MEMBERS[{ix}]]")
+    for k in range(len(outputs)):
+        lines.append(f"    y{k} = 0.0" + (f"\n    w{k} = 0.0" if sugeno and controller.normalize else ""))
+
+    # the combinations of the candidate members of all inputs, each one may hold several rules
+    indent = "    "
+    for ix in range(len(inputs)):
+        lines.append(f"{indent}for m{ix}, d{ix} in c{ix}:")
+        indent += "    "
+    key = ", ".join(f"m{ix}" for ix in range(len(inputs))) + ("," if len(inputs) == 1 else "")
+    degree = " + ".join(["0.0"] + [f"d{ix}" for ix in range(len(inputs))])
+    lines += [
+        f"{indent}actions = RULES.get(({key}))",
+        f"{indent}if actions is None:",
+        f"{indent}    continue",
+        f"{indent}degree = ({degree}) / {len(inputs)}",
+        f"{indent}if not degree:",
+        f"{indent}    continue",
+        f"{indent}for action in actions:",
+    ]
+    for k in range(len(outputs)):
+        lines.append(f"{indent}    if action[{k}] >= 0:")
+        if sugeno:
+            lines.append(f"{indent}        y{k} += degree * CRISP_{k}[action[{k}]]")
+            if controller.normalize:
+                lines.append(f"{indent}        w{k} += degree")
+        else:
+            lines.append(f"{indent}        y{k} += degree * _centroid_{k}(action[{k}], degree)")
+
+    lines.append("")
+    if sugeno and controller.normalize:
+        for k in range(len(outputs)):
+            lines.append(f"    y{k} = y{k} / w{k} if w{k} else 0.0")
+    if len(outputs) == 1:
+        lines.append("    return y0")
+    else:
+        lines.append("    return {" + ", ".join(f"{name!r}: y{k}" for k, name in enumerate(outputs)) + "}")
+
+    lines += [
+        "",
+        "",
+        "def run(inputs):",
+        "    return evaluate(" + ", ".join(f"inputs[{name!r}]" for name in inputs) + ")",
+        "",
+    ]
+    return "\n".join(lines)
+
+
+def load_source(source: str, name: str = "generated_controller"):
+    """
+    creates a module from source code written by generate_source without writing it to a file.
+
+    :param source: str: source code of the module
+    :param name: str: name of the module (default: "generated_controller")
+
+    :return: module: module with the functions evaluate and run
+    """
+
+    module = types.ModuleType(name)
+    exec(compile(source, f"<{name}>", "exec"), module.__dict__)
+    return module
+
+
+def check_parity(controller, module, samples: int = 10000, seed: int = 0, tolerance: float = 1e-9):
+    """
+    compares a generated module with run of its controller on random input situations within the scale of each
+    input parameter, including the ends of the scales and the corner points of all members. A lookup table or cache
+    of the controller makes run approximate, the comparison is only meaningful without them.
+
+    :param controller: FuzzyController: controller the module was generated from
+    :param module: module or str: module (e.g. imported from the generated file) or its source code
+    :param samples: int: amount of random input situations (default: 10000)
+    :param seed: int: seed of the random input situations (default: 0)
+    :param tolerance: float: max absolute difference of an output (default: 1e-9)
+
+    :return: dict: {"samples", "max_error", "passed", "worst_inputs"}
+    """
+
+    if isinstance(module, str):
+        module = load_source(module)
+
+    rng = np.random.default_rng(seed)
+    names = list(controller.feature_space)
+    columns = list()
+    for membership in controller.feature_space.values():
+        corners = np.concatenate([membership.lower, membership.center, membership.upper,
+                                  [membership.min_value, membership.max_value]])
+        values = rng.uniform(membership.min_value, membership.max_value, samples)
+        values[:samples // 4] = rng.choice(corners, samples // 4)
+        columns.append(values)
+
+    worst, max_error = None, 0.0
+    for row in np.stack(columns, axis=1).tolist():
+        inputs = dict(zip(names, row))
+        expected, actual = controller.run(inputs), module.evaluate(*row)
+        if not isinstance(expected, dict):
+            expected, actual = {None: expected}, {None: actual}
+
+        for key in expected:
+            a, b = float(expected[key]), float(actual[key])
+
+            # equal infinite values or nan on both sides are no difference
+            if a == b or (a != a and b != b):
+                continue
+            error = abs(a - b) if abs(a - b) == abs(a - b) else np.inf
+            if error > max_error:
+                worst, max_error = inputs, error
+
+    return {"samples": samples, "max_error": max_error, "passed": max_error <= tolerance, "worst_inputs": worst}
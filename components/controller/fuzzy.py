@@ -1,15 +1,34 @@
 # import standard modules
+import sys
+import time
 import warnings
 
-# import third party modules
-import pandas as pd
-
-from matplotlib import pyplot as plt
-from shapely.geometry import Polygon
-from shapely.geometry import LineString
+# import third party modules - pandas and matplotlib are optional and only imported where they are needed, the
+# inference itself only requires numpy
+import numpy as np
 
 # import project related modules
 from components.controller.membership import Membership
+from components.controller.rules import RuleIndex, RuleTensor
+from components.controller.lookup import LookupTable
+from components.controller.profiling import Profiler
+from components.controller.cache import ResultCache
+from components.controller import storage, codegen
+from components.controller.loader import RuleFileError, read_rule_codes
+
+
+def _is_data_frame(obj):
+    """
+    checks whether an object is a pandas data frame without importing pandas. In case pandas was never imported the
+    object cannot be a data frame.
+
+    :param obj: object: any object
+
+    :return: boolean: True if obj is a pandas.DataFrame, False otherwise
+    """
+
+    pd = sys.modules.get("pandas")
+    return pd is not None and isinstance(obj, pd.DataFrame)
 
 
 class FuzzyController(object):
@@ -23,12 +42,33 @@ class FuzzyController(object):
         3. Defuzzification
 
     which can be called by the main function "run".
+
+    Once the settings are handed over (set_inputs, set_ruleset, set_output) the controller is only read by "run" and
+    "run_batch" - all state of a single evaluation lives in local variables. Therefore one fitted controller can be
+    shared by any number of threads without locks or copies. Changing the settings while other threads evaluate the
+    controller is not supported.
     """
 
     def __init__(self):
         self.feature_space = None      # feature space / inputs to measure memberships
         self.rules = None              # rule set applied for inference
+        self.rule_index = None         # compiled, integer coded version of the rule set (RuleIndex or RuleTensor)
         self.output = None             # output space defined by user - needs to follow the same structure as input
+        self.outputs = None            # all output parameters by name, self.output is the first of them
+        self.lut = None                # optional lookup table which replaces the inference, see compile_lut
+        self.profiler = None           # optional run time statistics, see enable_profiling
+        self.cache = None              # optional memoization of outputs for quantized inputs, see enable_cache
+        self.mode = "mamdani"          # inference mode "mamdani" or "sugeno", see set_inference
+        self.crisp = "centroid"        # crisp value of each output member in the sugeno mode, "centroid" or "center"
+        self.normalize = True          # divide by the sum of the degrees in the sugeno mode
+        self.version = 0               # goes up with each change of the settings or the rules
+
+        self._input_codes = None            # input parameter -> member id of each member id in the rule index
+        self._rule_ids = None               # input parameter -> member id in the rule index of each member
+        self._output_codes = None           # output parameter -> member id of each member id in the rule index
+        self._centroid_tables = None        # output parameter -> corner points of the members for the centroid
+        self._crisp_values = None           # output parameter -> crisp value of each member and 0 for unknown members
+        self._shared_block = None           # shared memory block the rule set lives in, see attach_shared
 
     def _fuzzification(self, conditions: dict):
         """
@@ -41,8 +81,8 @@ class FuzzyController(object):
         :param conditions: dict: contains the name of the parameter as key e.g: "vel_crnt" and it's input value e.g 12
                                  name and scale of the condition are defined in the previous settings handed over.
 
-        :return: dict: returns a structure with all condition parameters and it's degrees of "truth"
-                       for each sub group / member
+        :return: dict: returns a structure with all condition parameters and it's degrees of "truth" - only the sub
+                       groups / members which are true to a degree, as ids in the order of the input parameter
         """
 
         # initialize empty dict as fallback return value
@@ -52,241 +92,736 @@ class FuzzyController(object):
             # calculate the memberships for each category and make them available in dict structure for further process.
             for category, value in conditions.items():
 
-                # request the member ship degree from the previous initialized Class available in the dict
+                # request the member ship degrees from the previous initialized Class available in the dict
                 # for more information read the inline code of set inputs. self.feature_space[category] holds
-                # a specific helper class for a input parameter which provides the function get_membership_degree.
-                memberships = self.feature_space[category].get_membership_degree(value)
-                perception[category] = memberships
+                # a specific helper class for a input parameter which provides the function get_active_degrees.
+                perception[category] = self.feature_space[category].get_active_degrees(value)
 
-            # return dict in structure {"category_name": {"member": membership_confidence, ....}}
+            # return dict in structure {"category_name": (np.ndarray of active member ids, np.ndarray of their
+            # membership confidence), ....}
             return perception
 
-        except (TypeError, KeyError) as exc:
+        except (TypeError, KeyError, ValueError) as exc:
             warnings.warn("fuzzification was not successfull, make sure your inputs match your settings")
             return dict()
 
-    @staticmethod
-    def _query_generator(category_members: dict):
-        """
-        class specific generator function without influence of class attributes. I will generate a query condition
-        from a category name e.g. "vel_crnt" and a membership e.g. "very slow".  -> "vel_crnt" == "very slow".
-
-        :param category_members: dict: holds input parameter names with a member. Example above.
-
-        :return: str: returns a query string
-        """
-        # generate a query value combinations from category and related values - is needed to keep the query dynamic
-        for cat, members in category_members.items():
-
-            # query string must include a [OR  | ] condition - since a category can have multiple members true
-            # to a certain degree
-            query_string = " | ".join(f"({cat}=='{mem}')" for mem in members)
-            yield query_string
-
     def _get_rule_subset(self, perception: dict):
         """
         class internal function which will filter the rule set of the controller to a useful subset of rules.
         Not all rules will be important for a certain input situation, and therefore this function will limit
-        the used ruleset only to the relevant rules from the handed over rule set. For more information how the rule
-        set is handed over read the function set_ruleset.
+        the used ruleset only to the relevant rules from the handed over rule set. The filter works on the compiled
+        rule index created in set_ruleset, for more information read the function set_ruleset.
 
         :param perception: dict: should be the resulting dict structure from the _fuzzification function
 
-        :return: pd.DataFrame: results a pandas data frame filtered to the relevant rules from the ruleset
+        :return: np.ndarray: positions of the relevant rules within the rule set
         """
 
-        # initialize resulting dict
-        category_members = dict()
-        for category, members in perception.items():
-
-            # set a list for the current category so members can be collected
-            category_members[category] = list()
-
-            for key, value in members.items():
+        # without any input parameter (e.g. the fuzzification failed) no rule is true to a degree
+        if not perception:
+            return np.zeros(0, dtype=np.int64)
 
-                if abs(value["degree"]) > 0:
-                    category_members[category].append(key)
+        # collect the ids of all members with a degree of truth - a category without any active member
+        # does not limit the rule set
+        conditions = dict()
+        for category, (active, _) in perception.items():
 
-        # create a subset of the given rules - copy complete data set and filter afterwards to ensure
-        # other memory location and prevent overwriting
-        subset = self.rules.loc[:, :]
+            if len(active):
 
-        q = list()
-        # create query conditions and filter the given data set for conditions
-        for query in self._query_generator(category_members):
-            if query != "":
-                q.append(query)
+                # translate the member ids of the input parameter into the member ids of the rule index
+                ids = self._rule_ids[category][active]
+                conditions[category] = ids[ids >= 0]
 
-        # use the query list generated and create a final main query with an AND condition between all queries
-        # and return the filtered subset.
-        return subset.query("&".join(f"({qy})" for qy in q))
+        # union of the posting lists within a category and intersection over all categories
+        return self.rule_index.match(conditions)
 
-    def _inference(self, perception: dict):
+    def _inference(self, perception: dict, subset: np.ndarray = None):
         """
         class internal function which takes the results from the fuzzification step and reasonable reactions to
         a given situation (perception). In order to find these possible responses the ruleset is used.
 
         :param perception: dict: should be the resulting dict structure from the _fuzzification function
-        :return: list: returns a list of reactions (dicts) for the output category with degree of truth
+        :param subset: np.ndarray: result of _get_rule_subset in case it is already known (default: None)
+        :return: tuple: ({output parameter: output member ids}, degrees) - one reaction of each output category per
+                        rule with degree of truth
         """
 
         # filter subset of rules that match the perception - filter because the rest is not needed and can be ignored
-        subset = self._get_rule_subset(perception)
-
-        # get interval relevant columns - with the name of memberships
-        valid_columns = list(perception.keys())
-        for column in valid_columns:
+        if subset is None:
+            subset = self._get_rule_subset(perception)
+
+        # sum up the degree of truth of each input parameter for each rule of the subset. The degrees are looked up
+        # by the member id of each rule within the sorted active members, rule members which are not active or
+        # unknown to the input parameter (id -1) get a degree of zero
+        degree = np.zeros(len(subset))
+        for column, (active, degrees) in perception.items():
+            if not len(active):
+                continue
 
-            # add the degree of truth to each category from the perception (new column)
-            memberships = perception[column]
-            subset[f"{column}_value"] = subset.apply(lambda row: memberships[row[column]]["degree"], axis=1)
+            codes = self._input_codes[column][self.rule_index.get_codes(column, subset)]
+            position = np.minimum(np.searchsorted(active, codes), len(active) - 1)
+            degree += np.where(active[position] == codes, degrees[position], 0)
 
         # since each member / input parameter has it's own degree calculate the average over all input parameters
         # to get an idea of how true the combination of input parameters is
-        subset["degree"] = subset.loc[:, [f"{column}_value" for column in valid_columns]].sum(axis='columns') / len(
-            valid_columns)
+        degree /= max(len(perception), 1)
 
-        # create a set of fuzzy outputs [{"output category": "member", "degree": value of degree}, ...]
-        result = subset.loc[:, ["acceleration", "degree"]].to_dict("r")
-        return result
+        # create the fuzzy outputs: the id of the output member (order of the output parameter) for each output
+        # parameter and the degree of truth for each rule of the subset. All outputs share the same fired rules
+        return {name: codes[self.rule_index.get_codes(name, subset)] for name, codes in self._output_codes.items()}, \
+            degree
 
     @staticmethod
-    def _get_intersection(a: tuple, b: tuple, c: tuple, d: tuple):
+    def _build_centroid_table(output: Membership):
         """
-        class internal function without influence on class attributes. Calculates the intersection point
-        of two vectors.
+        class internal function without influence on class attributes. Collects the corner points of each output
+        members triangle in arrays, so the centroid of the members polygon can be calculated in closed form for any
+        degree. Members with center == upper_end keep their last polygon corner on the height of 1.
 
-        :param a: tuple: (x, y) coordinates starting point vector 1
-        :param b: tuple: (x, y) coordinates end point vector 1
-        :param c: tuple: (x, y) coordinates starting point vector 2
-        :param d: tuple: (x, y) coordinates end point vector 2
+        :param output: Membership: fitted output parameter
 
-        :return: tuple: returns (x, y) of intersection
+        :return: dict: arrays "lower", "rise", "upper", "fall" and "shoulder" in the order of the output members
         """
 
-        # create vector from two points for vector 1 and vector 2
-        line1 = LineString([a, b])
-        line2 = LineString([c, d])
+        lower, center, upper = output.lower, output.center, output.upper
 
-        # calculate the intersection and return tuple - module shapely used for the calculation
-        int_pt = line1.intersection(line2)
-        point_of_intersection = int_pt.x, int_pt.y
-        return point_of_intersection
+        return {
+            "lower": lower,
+            "rise": center - lower,
+            "upper": upper,
+            "fall": upper - center,
+            "shoulder": ((center == upper) & (lower != center)).astype(float)
+        }
 
     @staticmethod
-    def _coordinate_validation(x: tuple, y: tuple):
+    def _build_crisp_values(output: Membership, crisp: str):
         """
-        class internal function without influence on class attributes. check whether a y coordinate must be zero or 1.
-        In case the center and the starting or endpoint are equal the y must be zero or one. check input parameter
-        definition _meta groups in case the logic is not clear without image.
+        class internal function without influence on class attributes. Reduces each output member to one crisp value
+        for the sugeno mode, either the center of its triangle or the centroid of the full triangle. The values get an
+        additional 0 at the end for rule members unknown to the output parameter (id -1).
 
-        :param x: tuple: all x values so from input parameter definition dict lower_end, center, upper_end
-        :param y: all y coordinates. values must be binary so either 1 or 0
+        :param output: Membership: fitted output parameter
+        :param crisp: str: "centroid" for (lower_end + center + upper_end) / 3 or "center" for the center
 
-        :return: tuple: returns tuples with x and y values - y values might be modified
+        :return: np.ndarray: crisp value of each output member and 0
         """
 
-        if (x[0] == x[1]) and (y[0] == y[1]):
-            y[0] = 0
+        if crisp == "center":
+            values = output.center
+        else:
+            values = (output.lower + output.center + output.upper) / 3
 
-        elif (x[1] == x[2]) and (y[1] == y[2]):
-            y[1] = 0
+        values = np.append(values, 0.0)
+        values.setflags(write=False)
+        return values
 
-        return x, y
+    def _member_centroid_generator(self, members: np.ndarray, degree: np.ndarray, output: str):
+        """
+        class internal function which calculates the centroid x value for each fuzzy result. The centroid is based on
+        a polygon for each member which results from the members triangle cut by a vector on the height of degree.
+        all polygons are based on the output categories of one output parameter set in set_output.
 
-    def _member_centroid_generator(self, fuzzy_results: list):
+        The polygon (lower, 0) - (left cut, degree) - (right cut, degree) - (upper, shoulder) is solved with the
+        shoelace formula in closed form, so members and degree can be arrays of any (matching) shape.
+
+        :param members: np.ndarray: ids of the output members, output of _inference
+        :param degree: np.ndarray: degree of truth for each member, output of _inference
+        :param output: str: name of the output parameter the members belong to
+        :return: np.ndarray: centroid x value for each member and degree, nan for a degree of zero
         """
-        class internal function which adds the centroid data to each result within fuzzy results. The centroid is
-        based on a polygon for each member which results from the members triangle cut by a vector on the height
-        of degree. all polygons are based on the output categories from the output parameter set in set_output.
 
-        :param fuzzy_results: list: output of _interference [{"output category": "member", "degree": value of degree}.]
-        :return: list: same structure as input but each dict enriched with centroid data
+        table = self._centroid_tables[output]
+        a, c, e = table["lower"][members], table["upper"][members], table["shoulder"][members]
+
+        # x values where the vector of degree cuts the rising and the falling edge of the triangle
+        p = a + degree * table["rise"][members]
+        q = c - degree * table["fall"][members]
+
+        # twice the signed area and three times the first moment of the polygon with its last corner on the ground
+        area = degree * (a + p - q - c)
+        moment = degree * (a * a + a * p + p * p - q * q - q * c - c * c)
+
+        # with the last corner on the height of 1 (center == upper_end) area and moment share the factor
+        # (1 - degree)², which cancels out to lower + (upper - lower) * (degree + 2) / 3. For a degree of 1 the
+        # polygon collapses to the rising edge, its centroid is the middle of the edge like in the polygon library
+        shoulder = np.where(degree < 1, a + (c - a) * (degree + 2) / 3, (a + c) / 2)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(e > 0, shoulder, moment / (3 * area))
+
+    def _defuzzification(self, fuzzy_results: tuple):
         """
+        class internal function to perform the final step of defuzzification of the interference results.
+        It will create a concrete output value on the x axis of the output parameter. e.g. Acceleration group slow
+        goes from 0 to 1. The output value on the x axis will be the centroids x value of the polygon area with the
+        polygon area defined by the group "slow" and a vector of degree.
 
-        # initialize empty list which will replace fuzzy_results later
-        results = list()
+        :param fuzzy_results: tuple: output of _interference ({output parameter: output member ids}, degrees)
+        :return: returns an absolute action value for the output parameter e.g. +0.54 acceleration, or a dict with
+                 one action value per output parameter name in case of several output parameters
+        """
 
-        # loop over each dict in fuzzy_results list in order to add the centroid data to each output category
-        for f_set in fuzzy_results:
+        members, degree = fuzzy_results
+        if self.mode == "sugeno":
+            return self._sugeno_defuzzification(members, degree)
 
-            # set variables - member name and degree to which the member is true
-            member = f_set[self.output.name]
-            degree = f_set["degree"]
+        fired = degree != 0
 
-            # get_member is a function provided by a helper class defined in membership.py
-            # for more information read also set_inputs function
-            coordinates = self.output.get_member(member)["coordinates"]
+        actions = dict()
+        for output, codes in members.items():
 
-            # create polygon coordinates in order to calculate centroid for group
-            x = coordinates["x"]
-            y = coordinates["y"]
+            # in case the degree is 0 (and therefore the area of the polygon is zero as well) or the member is unknown
+            # to the output parameter the rule does not contribute to the action value
+            active = fired & (codes >= 0)
+            if not active.any():
+                actions[output] = 0
+                continue
 
-            si = 0
-            if x[1] == x[2]:
-                si = 1
+            # create an action value from the center of gravities - the centroid x value of each member weighted by
+            # it's degree
+            codes, weight = codes[active], degree[active]
+            actions[output] = float(np.dot(weight, self._member_centroid_generator(codes, weight, output)))
 
-            x, y = self._coordinate_validation(x, y)
-            x1 = (x[0], y[0])
+        return self._collect(actions)
 
-            # get the intersection values from the triangle and the vector of degree
-            x2 = self._get_intersection(x1, (x[1 + si], y[1 + si]), (x[0], degree), (x[2], degree))
-            x3 = self._get_intersection((x[1], y[1]), (x[2], y[2]), (x[0], degree), (x[2], degree))
-            x4 = (x[2], y[2])
+    def _sugeno_defuzzification(self, members: dict, degree: np.ndarray):
+        """
+        class internal function, counterpart of _defuzzification for the sugeno mode. Each fired rule contributes the
+        crisp value of its output member weighted by its degree, so the action value is one dot product. normalize
+        divides it by the sum of the degrees, otherwise the weighted values are summed up like the centroids of the
+        mamdani mode.
+
+        :param members: dict: {output parameter: output member ids} output of _interference
+        :param degree: np.ndarray: degree of truth for each rule, output of _interference
+        :return: returns an absolute action value for the output parameter, or a dict with one action value per output
+                 parameter name in case of several output parameters
+        """
 
-            # calculate the centroid for the polygon generated by a certain confidence degree
-            poly = Polygon([x1, x2, x3, x4])
+        actions = dict()
+        for output, codes in members.items():
+            weight = np.where(codes >= 0, degree, 0)
+            action = float(np.dot(weight, self._crisp_values[output][codes]))
+            if self.normalize:
+                total = weight.sum()
+                action = action / total if total else 0.0
+            actions[output] = action
 
-            # recreate dict with additional centroid information and add it to output list / array
-            results.append({"member": member, "degree": degree, "centroid": tuple(poly.centroid.coords)[0]})
+        return self._collect(actions)
 
-        return results
+    @staticmethod
+    def _collect(actions: dict):
+        """
+        class internal function without influence on class attributes. A controller with a single output parameter
+        returns the bare action value, a controller with several output parameters the dict of all action values.
 
-    def _defuzzification(self, fuzzy_results: list):
+        :param actions: dict: {"output parameter name": action value(s)}
+        :return: action value(s) of the only output parameter or the dict itself
         """
-        class internal function to perform the final step of defuzzification of the interference results.
-        It will create a concrete output value on the x axis of the output parameter. e.g. Acceleration group slow
-        goes from 0 to 1. The output value on the x axis will be the centroids x value of the polygon area with the
-        polygon area defined by the group "slow" and a vector of degree.
 
-        :param fuzzy_results: list: output of _interference [{"output category": "member", "degree": value of degree}.]
-        :return: returns an absolute action value for the output parameter e.g. +0.54 acceleration
+        if len(actions) == 1:
+            return next(iter(actions.values()))
+        return actions
+
+    def _batch_fuzzification(self, values: np.ndarray):
         """
+        class internal function, vectorized counterpart of _fuzzification. Calculates the degrees of truth of all
+        members for all rows at once. Each degree matrix gets an additional zero column, which is used for all rule
+        members the input parameter does not know (id -1).
 
-        # get the centroid of each member area, to make the output area usable as absolute value
-        centroid_data = self._member_centroid_generator(fuzzy_results)
+        :param values: np.ndarray: N x k input values with one column per input parameter in the order of set_inputs
 
-        # create an action value from the center of gravities
-        action = 0
-        for result in centroid_data:
-            try:
-                # in case the degree is not 0 (and therefore the area of the polygon is zero as well)
-                # add the centroid x value of each member and sub group to it's degree to the action value
-                if result["degree"] != 0:
-                    action += result["degree"] * result["centroid"][0]
+        :return: dict: {"category_name": np.ndarray N x (members + 1) degrees of truth}
+        """
 
-            except ZeroDivisionError:
-                continue
+        perception = dict()
+        for ix, (category, membership) in enumerate(self.feature_space.items()):
+            degrees = membership.get_degrees(values[:, ix])
+            perception[category] = np.hstack([degrees, np.zeros((len(values), 1))])
 
-        return action
+        return perception
+
+    def _batch_inference(self, perception: dict):
+        """
+        class internal function, vectorized counterpart of _inference. Fires the rules for all rows at once. Like in
+        the single call a category only limits the rules of a row if at least one of its members is true to a degree.
+
+        :param perception: dict: should be the resulting dict structure from the _batch_fuzzification function
+
+        :return: tuple: (positions, degrees) - positions of the rules, None for all rules of the rule index, and a
+                        N x rules matrix with the degree of each rule, zero if the rule did not fire for the row
+        """
+
+        if isinstance(self.rule_index, RuleTensor):
+            return self._batch_inference_dense(perception)
+
+        n = len(next(iter(perception.values())))
+        fired = np.ones((n, self.rule_index.size), dtype=bool)
+        degree = np.zeros((n, self.rule_index.size))
+
+        for category, degrees in perception.items():
+
+            # degree of truth of the rule member for each row and rule
+            rule_degree = degrees[:, self._input_codes[category][self.rule_index.get_codes(category)]]
+            limiting = (degrees != 0).any(axis=1)
+            fired &= (rule_degree > 0) | ~limiting[:, None]
+            degree += rule_degree
+
+        # average over all input parameters just like the single call and drop all rules which did not fire
+        return None, np.where(fired, degree / max(len(perception), 1), 0)
+
+    def _batch_inference_dense(self, perception: dict):
+        """
+        class internal function, counterpart of _batch_inference for a rule tensor. Instead of all rules each row only
+        looks at the combinations of its candidate members: the members which are true to a degree or all members of
+        an input parameter without any active member. The candidates of each row get padded to the max amount of
+        candidates of all rows.
+
+        :param perception: dict: should be the resulting dict structure from the _batch_fuzzification function
+
+        :return: tuple: (positions, degrees) - N x combinations matrices with the flat positions of the rules in the
+                        grid and the degree of each rule, zero if there is no rule or the rule did not fire for the row
+        """
+
+        tensor = self.rule_index
+        n = len(next(iter(perception.values())))
+        shape = [n] + [1] * len(tensor.axes)
+
+        positions = np.zeros(shape, dtype=np.int64)
+        fired = np.ones(shape, dtype=bool)
+        degree = np.zeros(shape)
+
+        for ix, category in enumerate(tensor.axes):
+
+            # degrees in the order of the grid axis, rule members unknown to the input parameter use the zero column
+            degrees = perception[category]
+            axis_degrees = degrees[:, self._input_codes[category][:-1]]
+            limiting = (degrees != 0).any(axis=1)
+            candidates = (axis_degrees > 0) | ~limiting[:, None]
+
+            # candidate member ids of each row first (ascending), padded with non candidates
+            width = int(candidates.sum(axis=1).max()) if n else 0
+            ids = np.argsort(~candidates, axis=1, kind="stable")[:, :width]
+            valid = np.take_along_axis(candidates, ids, axis=1)
+
+            shape[ix + 1] = width
+            positions = positions + (ids * tensor.strides[ix]).reshape(shape)
+            fired = fired & valid.reshape(shape)
+            degree = degree + np.take_along_axis(axis_degrees, ids, axis=1).reshape(shape)
+            shape[ix + 1] = 1
+
+        positions = positions.reshape(n, -1)
+        fired = fired.reshape(n, -1) & tensor.has_rule(positions)
+
+        # average over all input parameters just like the single call and drop all rules which did not fire
+        return positions, np.where(fired, degree.reshape(n, -1) / max(len(perception), 1), 0)
 
-    def set_ruleset(self, rules: pd.DataFrame):
+    def _batch_defuzzification(self, fuzzy_results: tuple):
         """
-        function to set a rule set and to assign the ruleset to the class attributes.
+        class internal function, vectorized counterpart of _defuzzification. The closed form centroids of all rows
+        and rules are calculated at once.
+
+        :param fuzzy_results: tuple: output of _batch_inference (positions, degrees)
+
+        :return: dict: {"output parameter name": np.ndarray one absolute action value per row}
+        """
+
+        positions, degree = fuzzy_results
+
+        if self.mode == "sugeno":
+            return self._batch_sugeno_defuzzification(positions, degree)
+
+        actions = dict()
+        for output, codes in self._output_codes.items():
+            members = np.broadcast_to(codes[self.rule_index.get_codes(output, positions)], degree.shape)
+            centroid = self._member_centroid_generator(members, degree, output)
+
+            active = (degree != 0) & (members >= 0)
+            actions[output] = np.where(active, degree * centroid, 0).sum(axis=1)
+
+        return actions
+
+    def _batch_sugeno_defuzzification(self, positions: np.ndarray, degree: np.ndarray):
+        """
+        class internal function, vectorized counterpart of _sugeno_defuzzification. For a rule index all rows share
+        the crisp value of each rule, so the action values of all rows are one matrix vector product.
+
+        :param positions: np.ndarray: positions of the rules, output of _batch_inference
+        :param degree: np.ndarray: N x rules matrix with the degree of each rule, output of _batch_inference
+
+        :return: dict: {"output parameter name": np.ndarray one absolute action value per row}
+        """
+
+        actions = dict()
+        for output, codes in self._output_codes.items():
+            members = codes[self.rule_index.get_codes(output, positions)]
+            weights = [self._crisp_values[output][members]]
+            if self.normalize:
+                weights.append((members >= 0).astype(float))
+
+            # unknown members have a crisp value of 0, rules which did not fire a degree of 0
+            if positions is None:
+                action, *total = [degree @ weight for weight in weights]
+            else:
+                action, *total = [np.einsum("ij,ij->i", degree, weight) for weight in weights]
+
+            if self.normalize:
+                with np.errstate(divide="ignore", invalid="ignore"):
+                    action = np.where(total[0] > 0, action / total[0], 0.0)
+            actions[output] = action
+
+        return actions
+
+    def _compile(self):
+        """
+        class internal function which derives the state needed for the inference from the settings. It gets called
+        by set_inputs, set_ruleset and set_output, and only derives the parts whose settings are available. The
+        members of each rule get mapped from the rule index to the member ids of the input and output parameters
+        (-1 for unknown members) and the other way around.
+
+        :return: None
+        """
+
+        # a lookup table or cached outputs computed with the previous settings are outdated, statistics start over
+        # for the new settings
+        self.version += 1
+        self.lut = None
+        if self.cache is not None:
+            names = list(self.feature_space.keys()) if self.feature_space is not None else list()
+            if names == self.cache.names:
+                self.cache.clear()
+            else:
+                self.cache = ResultCache(names, self.cache.setting, maxsize=self.cache.maxsize)
+        if self.profiler is not None:
+            self.profiler = Profiler(n_rules=self.rule_index.size if self.rule_index is not None else 0)
+
+        if self.outputs is not None:
+            self._crisp_values = {name: self._build_crisp_values(mem, self.crisp) for name, mem in self.outputs.items()}
+
+        self._translate()
+
+    def _translate(self):
+        """
+        class internal function which maps the members of each rule from the rule index to the member ids of the
+        input and output parameters (-1 for unknown members) and the other way around. The costs depend on the amount
+        of members, not on the amount of rules.
+
+        :return: None
+        """
+
+        if self.rule_index is None:
+            return
+
+        def translate(membership: Membership):
+            # member id of the parameter for each member of the rule index and vice versa. The codes get an additional
+            # -1 at the end, so a missing rule of a rule tensor (id -1) stays unknown
+            codes = np.array([membership.index.get(m, -1) for m in self.rule_index.members[membership.name]] + [-1],
+                             dtype=np.int64)
+            rule_ids = np.array([self.rule_index.lookup[membership.name].get(m, -1) for m in membership.names],
+                                dtype=np.int64)
+            for array in (codes, rule_ids):
+                array.setflags(write=False)
+            return codes, rule_ids
+
+        def available(membership: Membership):
+            if membership.name not in self.rule_index.columns:
+                warnings.warn(f"the rule set does not contain the parameter {membership.name}")
+                return False
+            return True
+
+        # the derived state is built completely before it gets assigned, running evaluations never see half of it
+        if self.feature_space is not None:
+            input_codes, rule_ids = dict(), dict()
+            for category, membership in self.feature_space.items():
+                if available(membership):
+                    input_codes[category], rule_ids[category] = translate(membership)
+            self._input_codes, self._rule_ids = input_codes, rule_ids
+
+        if self.outputs is not None:
+            output_codes = dict()
+            for category, membership in self.outputs.items():
+                if available(membership):
+                    output_codes[category] = translate(membership)[0]
+            self._output_codes = output_codes
+
+    def set_ruleset(self, rules, dense: bool = False):
+        """
+        function to set a rule set and to assign the ruleset to the class attributes. The rule set gets compiled
+        once into an integer coded rule index, so the rules relevant for an input situation can be found without
+        parsing any query on each run.
+
+        Rule sets over a (nearly) complete grid of all input member combinations can be compiled into a dense rule
+        tensor instead: one grid axis per input parameter and one small integer tensor with the output member of each
+        combination per output parameter. The rules of an input situation are found by indexing the grid with the
+        active members, so the costs do not grow with the size of the rule set. The inputs must be set before, each
+        combination may only have one rule and combinations without a rule never fire. The data frame itself is not
+        kept (self.rules stays None), the positions of the rules are their flat positions in the grid.
 
         :param rules: pandas.DataFrame: rule set which includes all parameters set in set_inputs and set_output
+        :param dense: bool: compile the rule set into a dense rule tensor (default: False)
 
         :return: boolean: True is assignment was successful, False otherwise
         """
 
         # set self.rules (required rule set) if object type is a pandas data frame: data frame is used to make
         # the code more readable and understandable
-        if type(rules) is pd.DataFrame:
+        if not _is_data_frame(rules):
+            return False
+
+        if not dense:
+            index = RuleIndex()
+            index.fit(rules)
             self.rules = rules
+            self.rule_index = index
+            self._compile()
             return True
-        else:
+
+        if self.feature_space is None:
+            warnings.warn("a dense rule set needs the inputs, call set_inputs first")
             return False
 
+        try:
+            tensor = RuleTensor()
+            tensor.fit(rules, axes=list(self.feature_space.keys()))
+        except ValueError as exc:
+            warnings.warn(f"compiling the dense rule set was not possible because of Error {exc}!")
+            return False
+
+        self.rules = None
+        self.rule_index = tensor
+        self._compile()
+        return True
+
+    def load_ruleset(self, path: str, sep: str = ";", dense: bool = False, chunk_size: int = 65536,
+                     skip_invalid: bool = False):
+        """
+        function to read a rule set directly from a rule file, e.g. "experiment/test_rules.csv", without loading it
+        into a pandas data frame first. The file gets read in chunks of rows, each member name gets validated against
+        the members set in set_inputs and set_output and encoded into an integer id right away, so only one chunk of
+        strings is in memory at a time. Columns which do not belong to any parameter, missing columns and unknown
+        members are reported with their line number. Inputs and outputs must be set before, self.rules stays None.
+
+        :param path: str: path of the rule file with one column per parameter
+        :param sep: str: separator of the columns (default: ";")
+        :param dense: bool: compile the rule set into a dense rule tensor, see set_ruleset (default: False)
+        :param chunk_size: int: amount of rows validated together (default: 65536)
+        :param skip_invalid: bool: drop invalid rows with a warning instead of rejecting the file (default: False)
+
+        :return: boolean: True is assignment was successful, False otherwise
+        """
+
+        if self.feature_space is None or self.outputs is None:
+            warnings.warn("reading a rule file needs the inputs and outputs, call set_inputs and set_output first")
+            return False
+
+        parameters = dict(self.feature_space, **self.outputs)
+        try:
+            codes, errors = read_rule_codes(path, parameters, sep=sep, chunk_size=chunk_size,
+                                            skip_invalid=skip_invalid)
+        except (OSError, RuleFileError) as exc:
+            warnings.warn(f"reading the rule set was not possible because of Error {exc}!")
+            return False
+
+        if errors:
+            warnings.warn(f"skipped {len(errors)} invalid rows of {path}: " +
+                          "; ".join(f"line {line}: {message}" for line, message in errors[:10]))
+
+        # the vocabulary of each column is the list of members of its parameter, the codes are the member ids
+        members = {name: membership.names for name, membership in parameters.items()}
+        try:
+            if dense:
+                index = RuleTensor()
+                index.fit_codes(members, codes, axes=list(self.feature_space.keys()))
+            else:
+                index = RuleIndex()
+                index.fit_codes(members, codes)
+        except ValueError as exc:
+            warnings.warn(f"compiling the rule set was not possible because of Error {exc}!")
+            return False
+
+        self.rules = None
+        self.rule_index = index
+        self._compile()
+        return True
+
+    def _encode_rules(self, rules):
+        """
+        class internal function which validates rules against the input and output parameters and encodes them into
+        the member ids of the rule index. Member names which are new to the rule index get added to its vocabulary.
+
+        :param rules: pandas.DataFrame, list or dict: rules with one column per parameter - a data frame, a list of
+                                                      dicts (one per rule) or a dict of lists (one per parameter)
+
+        :return: dict: column -> integer array with the member id of each rule in the rule index
+        """
+
+        if _is_data_frame(rules):
+            columns = {column: np.asarray(rules[column]).astype(str).tolist() for column in rules.columns}
+        elif isinstance(rules, dict):
+            columns = {column: [str(m) for m in members] for column, members in rules.items()}
+        else:
+            rules = list(rules)
+            columns = {column: [str(rule[column]) for rule in rules] for column in (rules[0] if rules else dict())}
+
+        if set(columns) != set(self.rule_index.columns):
+            raise ValueError(f"the rules need the columns {self.rule_index.columns} but got {list(columns)}")
+
+        parameters = dict(self.feature_space or dict(), **(self.outputs or dict()))
+        for column, names in columns.items():
+            unknown = sorted({name for name in names if name not in parameters[column].index}) \
+                if column in parameters else list()
+            if unknown:
+                raise ValueError(f"unknown members {unknown} of {column}")
+
+        return {column: self.rule_index.add_members(column, columns[column]) for column in self.rule_index.columns}
+
+    def _check_positions(self, positions):
+        """
+        class internal function which validates the positions of rules.
+
+        :param positions: array like: positions of rules within the rule index
+
+        :return: np.ndarray: positions as integer array
+        """
+
+        positions = np.asarray(positions, dtype=np.int64).reshape(-1)
+        if len(positions) and (positions.min() < 0 or positions.max() >= self.rule_index.size):
+            raise ValueError(f"rule positions must be between 0 and {self.rule_index.size - 1}")
+        return positions
+
+    def _rule_regions(self, values: list, codes: dict):
+        """
+        class internal function which finds where rules can fire. Like in the inference a rule can only fire for a
+        value of an input parameter if its member is true to a degree or if no member of the parameter is true at all.
+
+        :param values: list: one array of values per input parameter in the order of set_inputs
+        :param codes: dict: input parameter -> member id (-1 for unknown) of each rule
+
+        :return: list: one boolean array (rules x values) per input parameter
+        """
+
+        regions = list()
+        for (name, membership), value in zip(self.feature_space.items(), values):
+            active = membership.get_degrees(np.asarray(value, dtype=float).reshape(-1)) > 0
+            free = ~active.any(axis=1)
+            active = np.hstack([active, np.zeros((len(active), 1), dtype=bool)])
+            regions.append(active[:, codes[name]].T | free)
+        return regions
+
+    def _apply_edit(self, edits: list):
+        """
+        class internal function which brings the derived state up to date after rules got added, removed or updated.
+        Only cached outputs and lookup table positions where one of the edited rules (before or after the edit) can
+        fire get computed again, everything else is kept.
+
+        :param edits: list: dicts of column -> member ids in the rule index of the edited rules
+
+        :return: None
+        """
+
+        self.rules = None
+        self.version += 1
+        self._translate()
+        if self.profiler is not None:
+            self.profiler.grow(self.rule_index.size)
+
+        codes = {name: np.concatenate([self._input_codes[name][edit[name]] for edit in edits])
+                 for name in self.feature_space}
+        if not len(next(iter(codes.values()), [])):
+            return
+
+        if self.cache is not None:
+            def affected(values: np.ndarray):
+                regions = self._rule_regions(list(values.T), codes)
+                return np.logical_and.reduce(regions).any(axis=0)
+
+            self.cache.invalidate(affected)
+
+        if self.lut is not None:
+            def grid(positions: list):
+                regions = self._rule_regions(positions, codes)
+                mask = np.zeros([len(position) for position in positions], dtype=bool)
+                for rule in range(len(regions[0])):
+                    mask[np.ix_(*[np.flatnonzero(region[rule]) for region in regions])] = True
+                return mask
+
+            # the lookup table gets computed with the exact inference
+            lut, self.lut = self.lut, None
+            try:
+                lut.refresh(self, grid)
+            finally:
+                self.lut = lut
+
+    def add_rules(self, rules):
+        """
+        Adds rules to the compiled rule set without compiling it again, the costs depend on the amount of new rules
+        only. The member names get validated against the input and output parameters. Cached outputs and lookup table
+        regions where a new rule can fire get computed again, self.version goes up and self.rules becomes None (the
+        rule index holds the rules from now on). A dense rule set only takes rules for empty combinations.
+
+        :param rules: pandas.DataFrame, list or dict: rules with one column per parameter - a data frame, a list of
+                                                      dicts (one per rule) or a dict of lists (one per parameter)
+        :return: np.ndarray: positions of the new rules, e.g. for remove_rules or update_rules
+        """
+
+        codes = self._encode_rules(rules)
+        positions = self.rule_index.append(codes)
+        self._apply_edit([codes])
+        return positions
+
+    def remove_rules(self, positions):
+        """
+        Removes rules from the compiled rule set without compiling it again. The rules keep their position as empty
+        slot, so the positions of all other rules stay the same. Cached outputs and lookup table regions where a
+        removed rule could fire get computed again and self.version goes up.
+
+        :param positions: array like: positions of the rules, e.g. their row in the rule set or from add_rules (the
+                                      flat position of the combination of input members for a dense rule set)
+        :return: None
+        """
+
+        positions = self._check_positions(positions)
+        removed = {column: self.rule_index.get_codes(column, positions) for column in self.rule_index.columns}
+        self.rule_index.remove(positions)
+        self._apply_edit([removed])
+
+    def update_rules(self, positions, rules):
+        """
+        Replaces rules of the compiled rule set without compiling it again. Rules which keep their input members get
+        their new output members in place and keep their position. Rules with new input members are removed and
+        added again, so they get a new position. Cached outputs and lookup table regions where the old or the new
+        rules can fire get computed again and self.version goes up.
+
+        :param positions: array like: positions of the rules to replace, see remove_rules
+        :param rules: pandas.DataFrame, list or dict: one new rule per position, see add_rules
+        :return: np.ndarray: position of each new rule
+        """
+
+        positions = self._check_positions(positions)
+        new = self._encode_rules(rules)
+        if len(new[self.rule_index.columns[0]]) != len(positions):
+            raise ValueError("update_rules needs one rule per position")
+
+        old = {column: self.rule_index.get_codes(column, positions) for column in self.rule_index.columns}
+        inputs = [column for column in self.rule_index.columns if column in self.feature_space]
+        outputs = [column for column in self.rule_index.columns if column not in self.feature_space]
+        moved = ~np.logical_and.reduce([old[column] == new[column] for column in inputs])
+
+        # a dense rule set must have room for the moved rules before anything changes
+        if isinstance(self.rule_index, RuleTensor) and moved.any():
+            target = np.ravel_multi_index([new[column][moved] for column in self.rule_index.axes],
+                                          self.rule_index.shape)
+            occupied = self.rule_index.has_rule(target) & ~np.isin(target, positions[moved])
+            if occupied.any() or len(np.unique(target)) != len(target):
+                raise ValueError("each combination of input members may only have one rule")
+
+        self.rule_index.assign(positions[~moved], {column: new[column][~moved] for column in outputs})
+        positions = positions.copy()
+        if moved.any():
+            self.rule_index.remove(positions[moved])
+            positions[moved] = self.rule_index.append({column: codes[moved] for column, codes in new.items()})
+
+        self._apply_edit([old, new])
+        return positions
+
     def set_inputs(self, feature_space: dict):
         """
         function initialize a set of parameters as feature space used for calculations.
@@ -320,45 +855,96 @@ class FuzzyController(object):
 
                 # store the object in the feature space dict
                 self.feature_space[category] = mem
+
+            self._compile()
             return True
 
         except Exception as exc:
             warnings.warn(f"setting inputs was not possible because of Error {exc}!")
             return False
 
-    def set_output(self, output: dict, name: str):
+    def set_output(self, output: dict, name: str = None):
         """
-        Sets an output parameter of memberships or sub groups.
+        Sets an output parameter of memberships or sub groups. Several output parameters can be set at once in the
+        structure of set_inputs, each one needs its own column in the rule set. All output parameters share the
+        fuzzification and the fired rules of a run, only the defuzzification runs once per output parameter. With
+        several output parameters run returns a dict and run_batch a dict of arrays with the name of each output
+        parameter as key.
 
         :param output: dict: e.g. output = {"very small": {"lower_end": value of lower end, "center": value of center,
                                                            "upper_end": value of upper end}, "small": { ...
                                             }
+                             or without a name a setting dict - output = {
+                                                            "name of output1": [output1, "[ unit of measure]"],
+                                                            "name of output n": [output_n, "[ unit of measure]"],
+                                                        }
                             For more information check README.md or check experiment
-        :param name: str: name of the output category
+        :param name: str: name of the output category, None if output holds several named output parameters
+                          (default: None)
         :return: boolean: True if assignment was successful, False otherwise
         """
 
         # ensure variable type
         assert type(output) is dict, "output must be dict and follow the needed structure"
 
+        # a single output parameter is a setting dict with one entry
+        if name is not None:
+            output = {name: [output]}
+
         try:
-            # create a Membership object which will handle Parameter specific tasks
+            # create a Membership object for each output parameter which will handle Parameter specific tasks
             # Class Membership can be found in memberships.py
-            mem = Membership()
-            mem.fit(output, name=name)
-            self.output = mem
+            outputs = dict()
+            for category, setup in output.items():
+                assert type(setup[0]) is dict, f"{category} does not contain a setup dict, create a dict"
+
+                mem = Membership(measure=setup[1] if len(setup) > 1 else "")
+                mem.fit(setup[0], name=category)
+                outputs[category] = mem
+
+            self._centroid_tables = {category: self._build_centroid_table(mem) for category, mem in outputs.items()}
+            self.outputs = outputs
+            self.output = next(iter(outputs.values()))
+            self._compile()
             return True
 
         except Exception as exc:
             warnings.warn(f"Error {exc} occured")
             return False
 
+    def set_inference(self, mode: str = "mamdani", crisp: str = "centroid", normalize: bool = True):
+        """
+        Selects the inference mode of run and run_batch. The default "mamdani" mode cuts the triangle of each fired
+        output member at the degree of the rule and uses the centroid of the resulting polygon. The zero order
+        "sugeno" mode reduces each output member to one precomputed crisp value, so the defuzzification is a single
+        dot product of the rule degrees and the crisp values. By default the sugeno output is the weighted average of
+        the crisp values, without normalize it is the weighted sum like the sum of the centroids in the mamdani mode.
+        A lookup table or cached outputs of the previous mode get dropped.
+
+        :param mode: str: "mamdani" or "sugeno" (default: "mamdani")
+        :param crisp: str: crisp value of each output member in the sugeno mode, "centroid" of the full triangle
+                           (lower_end + center + upper_end) / 3 or "center" of the triangle (default: "centroid")
+        :param normalize: bool: divide the sugeno output by the sum of the degrees of the fired rules (default: True)
+        :return: boolean: True if assignment was successful, False otherwise
+        """
+
+        if mode not in ("mamdani", "sugeno") or crisp not in ("centroid", "center"):
+            warnings.warn(f"unknown inference mode {mode} with crisp values {crisp}, use mamdani or sugeno with "
+                          f"centroid or center")
+            return False
+
+        self.mode, self.crisp, self.normalize = mode, crisp, normalize
+        self._compile()
+        return True
+
     def show_members(self):
         """
         Function displays the all input parameter set with ser_inputs.
 
         :return: None: displays plot
         """
+        from matplotlib import pyplot as plt
+
         plt.figure(figsize=(10, 15))
 
         # iterate over each Membership object in feature_space
@@ -382,9 +968,306 @@ class FuzzyController(object):
         """
         Main function of the FuzzyController class. It will calculate a response for a given input situation.
 
+        :param inputs: dict: contains key name of each input parameter and an absolute value for each input parameter
+        :return: float: returns the absolute reaction value, with several output parameters a dict with the reaction
+                        value of each output parameter
+        """
+
+        # a compiled lookup table replaces the entire inference
+        if self.lut is not None:
+            return self.lut(inputs)
+
+        # with a cache the output gets calculated for the quantized inputs and only once per quantized situation
+        cache = self.cache
+        quantized = cache.quantize(inputs) if cache is not None else None
+        if quantized is not None:
+            key, inputs = quantized
+            action = cache.get(key)
+            if action is None:
+                action = self._run(inputs)
+                cache.put(key, action)
+
+            # the reactions of several output parameters are shared with the cache, hand out a copy
+            return dict(action) if isinstance(action, dict) else action
+
+        return self._run(inputs)
+
+    def _run(self, inputs: dict):
+        """
+        class internal function which runs fuzzification, inference and defuzzification for an input situation.
+
         :param inputs: dict: contains key name of each input parameter and an absolute value for each input parameter
         :return: float: returns the absolute reaction value
         """
+
+        if self.profiler is not None:
+            return self._run_profiled(inputs)
+
         perception = self._fuzzification(inputs)
         results = self._inference(perception)
-        return self._defuzzification(results)
\ No newline at end of file
+        return self._defuzzification(results)
+
+    def _run_profiled(self, inputs: dict):
+        """
+        class internal function, same as run but records the wall time of each stage and the fired rules in
+        self.profiler.
+
+        :param inputs: dict: contains key name of each input parameter and an absolute value for each input parameter
+        :return: float: returns the absolute reaction value
+        """
+
+        start = time.perf_counter()
+        perception = self._fuzzification(inputs)
+        fuzzified = time.perf_counter()
+        subset = self._get_rule_subset(perception)
+        results = self._inference(perception, subset)
+        inferred = time.perf_counter()
+        action = self._defuzzification(results)
+        end = time.perf_counter()
+
+        fired = subset[results[1] != 0]
+        self.profiler.record((fuzzified - start, inferred - fuzzified, end - inferred), fired, np.array([len(fired)]))
+        return action
+
+    def run_batch(self, inputs, chunk_size: int = None):
+        """
+        Vectorized counterpart of run. It will calculate a response for many input situations at once, all steps
+        (fuzzification, inference and defuzzification) run as array operations over all rows.
+
+        :param inputs: np.ndarray or pd.DataFrame: N x k array with one column per input parameter in the order of
+                                                    set_inputs or a data frame with one column per input parameter name
+        :param chunk_size: int: amount of rows inferred together, limits the memory of the rows x rules matrices.
+                                (default: None - derived from the amount of rules)
+        :return: np.ndarray: returns one absolute reaction value per row, with several output parameters a dict with
+                             the reaction values of each output parameter
+        """
+
+        # bring the inputs into the order of the input parameters handed over with set_inputs
+        if _is_data_frame(inputs):
+            values = inputs.loc[:, list(self.feature_space.keys())].to_numpy(dtype=float)
+        else:
+            values = np.asarray(inputs, dtype=float).reshape(-1, len(self.feature_space))
+
+        if self.lut is not None:
+            return self.lut.evaluate(values)
+
+        # a rule tensor only looks at the combinations of the active members, usually two per input parameter
+        if chunk_size is None:
+            width = 2 ** len(self.rule_index.axes) if isinstance(self.rule_index, RuleTensor) else self.rule_index.size
+            chunk_size = max(1, 2 ** 20 // max(width, 1))
+
+        if self.profiler is not None:
+            return self._run_batch_profiled(values, chunk_size)
+
+        perception = self._batch_fuzzification(values)
+        actions = {output: np.zeros(len(values)) for output in self._output_codes}
+        for start in range(0, len(values), chunk_size):
+            chunk = {category: degrees[start:start + chunk_size] for category, degrees in perception.items()}
+            for output, action in self._batch_defuzzification(self._batch_inference(chunk)).items():
+                actions[output][start:start + chunk_size] = action
+
+        return self._collect(actions)
+
+    def _run_batch_profiled(self, values: np.ndarray, chunk_size: int):
+        """
+        class internal function, same as run_batch but records the wall time of each stage and the fired rules in
+        self.profiler.
+
+        :param values: np.ndarray: N x k input values in the order of set_inputs
+        :param chunk_size: int: amount of rows inferred together
+        :return: np.ndarray: returns one absolute reaction value per row (dict of arrays for several output parameters)
+        """
+
+        durations = np.zeros(3)
+        fired_rules = list()
+        fired_per_row = np.zeros(len(values), dtype=np.int64)
+
+        start = time.perf_counter()
+        perception = self._batch_fuzzification(values)
+        durations[0] = time.perf_counter() - start
+
+        actions = {output: np.zeros(len(values)) for output in self._output_codes}
+        for start in range(0, len(values), chunk_size):
+            chunk = {category: degrees[start:start + chunk_size] for category, degrees in perception.items()}
+
+            begin = time.perf_counter()
+            positions, degree = results = self._batch_inference(chunk)
+            inferred = time.perf_counter()
+            for output, action in self._batch_defuzzification(results).items():
+                actions[output][start:start + chunk_size] = action
+            durations[1:] += (inferred - begin, time.perf_counter() - inferred)
+
+            fired = degree != 0
+            rows, columns = np.nonzero(fired)
+            fired_rules.append(columns if positions is None else positions[rows, columns])
+            fired_per_row[start:start + chunk_size] = fired.sum(axis=1)
+
+        self.profiler.record(tuple(durations), np.concatenate(fired_rules), fired_per_row)
+        return self._collect(actions)
+
+    def compile_lut(self, resolution=32, samples: int = 10000):
+        """
+        Precomputes the output of the controller over a grid of the input space. Afterwards run and run_batch return
+        the multilinear interpolation of the table instead of running the inference. The max_error attribute of the
+        table tells whether the resolution is fine enough. Setting new inputs, rules or outputs removes the table,
+        assign None to self.lut in order to switch back to the exact inference manually.
+
+        :param resolution: int or dict: amount of grid points per input parameter, either one value for all parameters
+                                        or a dict with the name of the parameter as key (default: 32)
+        :param samples: int: amount of random points used to measure the error of the table (default: 10000)
+        :return: LookupTable: the compiled table with its max_error and mean_error against the exact inference
+        """
+
+        # the table must be computed with the exact inference
+        self.lut = None
+
+        lut = LookupTable(resolution=resolution)
+        lut.fit(self, samples=samples)
+        self.lut = lut
+        return lut
+
+    def enable_profiling(self, enabled: bool = True):
+        """
+        Switches the run time statistics on or off. While switched on run and run_batch record the cumulative wall
+        time of fuzzification, inference and defuzzification, how many rules fired per input situation and how often
+        each rule fired. While switched off the only cost is one attribute check per call. Lookups of a compiled
+        lookup table (compile_lut) are not recorded.
+
+        :param enabled: bool: True to record statistics, False to stop and drop them (default: True)
+        :return: None
+        """
+
+        if not enabled:
+            self.profiler = None
+        elif self.profiler is None:
+            self.profiler = Profiler(n_rules=self.rule_index.size if self.rule_index is not None else 0)
+
+    def stats(self):
+        """
+        Snapshot of the run time statistics recorded since profiling was enabled or reset. The position of a rule is
+        its row in the rule set handed over with set_ruleset, or its flat position in the grid of a dense rule set.
+
+        :return: dict: {"calls", "rows", "seconds": {"fuzzification", "inference", "defuzzification"},
+                        "rules_fired": {"total", "mean", "max"}, "fired_histogram", "rule_counts", "dead_rules"}
+                       or None while profiling is switched off
+        """
+
+        return self.profiler.snapshot() if self.profiler is not None else None
+
+    def reset_stats(self):
+        """
+        Sets the run time statistics back to zero without switching profiling off.
+
+        :return: None
+        """
+
+        if self.profiler is not None:
+            self.profiler.reset()
+
+    def enable_cache(self, resolution, maxsize: int = 4096):
+        """
+        Switches on the memoization of run. Each input gets rounded to a multiple of the resolution of its parameter,
+        the output gets calculated for the rounded inputs and stored for the rounded situation. The cache keeps at
+        most maxsize outputs and evicts the least recently used one. Setting new inputs, rules or outputs clears the
+        cache, new input parameters get the same resolution. Inputs which can not be rounded (missing parameter, nan)
+        are run without the cache. run_batch is not cached.
+
+        :param resolution: float or dict: step size the inputs get rounded to, either one value for all parameters or a
+                                          dict with the name of the parameter as key e.g. {"vel_crnt": 0.1, ...}.
+                                          None or 0 for a parameter keeps its value as it is.
+        :param maxsize: int: max amount of cached outputs (default: 4096)
+        :return: None
+        """
+
+        self.cache = ResultCache(list(self.feature_space.keys()), resolution, maxsize=maxsize)
+
+    def disable_cache(self):
+        """
+        Switches the memoization of run off and drops all cached outputs.
+
+        :return: None
+        """
+
+        self.cache = None
+
+    def cache_stats(self):
+        """
+        Counters of the memoization of run.
+
+        :return: dict: {"hits", "misses", "evictions", "size", "maxsize", "hit_rate"} or None without a cache
+        """
+
+        return self.cache.stats() if self.cache is not None else None
+
+    def save_compiled(self, path: str):
+        """
+        Stores the compiled controller in one binary file: the members of all input and output parameters, the
+        integer coded rule set (posting lists or rule tensor) and the centroid tables of the defuzzification. The
+        arrays are aligned, so load_compiled can memory map them. Lookup tables, caches and statistics are not stored.
+
+        :param path: str: path of the file e.g. "controller.fzc"
+        :return: None
+        """
+
+        storage.save(self, path)
+
+    @classmethod
+    def load_compiled(cls, path: str):
+        """
+        Creates a controller from a file written by save_compiled without parsing a rule set. The rule set is memory
+        mapped read only, so the start up does not grow with the size of the rule set and processes loading the same
+        file share its memory pages. The data frame of the rule set is not part of the file, rules stays None.
+
+        :param path: str: path of the file
+        :return: FuzzyController: controller with all settings handed over
+        """
+
+        return storage.load(cls, path)
+
+    def publish_shared(self, name: str = None):
+        """
+        Writes the compiled controller into a shared memory block in the layout of save_compiled, e.g. once in the
+        main process of a process pool. Workers create their controller with attach_shared and the name of the block
+        instead of unpickling or building their own, so the rule set exists only once in memory. Unlink the block
+        (or use the returned object as context manager) once no worker needs to attach anymore.
+
+        Needs python 3.8 or newer (multiprocessing.shared_memory), the module is only imported here.
+
+        :param name: str: name of the shared memory block, None for a random name (default: None)
+        :return: shared.SharedTables: owner of the block with its name
+        """
+        from components.controller import shared
+
+        return shared.publish(self, name=name)
+
+    @classmethod
+    def attach_shared(cls, name: str):
+        """
+        Creates a controller from a shared memory block written by publish_shared without copying the rule set, the
+        rule set is read only and shared with all other processes attached to the block. Edits of the rules
+        (add_rules, ...) copy the rule set into this process first. The data frame of the rule set is not part of the
+        block, rules stays None.
+
+        :param name: str: name of the shared memory block
+        :return: FuzzyController: controller with all settings handed over
+        """
+        from components.controller import shared
+
+        return shared.attach(cls, name)
+
+    def generate_source(self, path: str = None):
+        """
+        Writes the controller as standalone python module which only needs the standard library, e.g. for workers
+        where the import of numpy or the overhead of run matters. All members, rules and centroid tables are
+        constants of the module, its function evaluate(x0, x1, ...) takes the input values in the order of set_inputs
+        and run(inputs) a dict like this function. codegen.check_parity compares the module with run.
+
+        :param path: str: path of the python file, None only returns the source code (default: None)
+        :return: str: source code of the module
+        """
+
+        source = codegen.generate_source(self)
+        if path is not None:
+            with open(path, "w") as file:
+                file.write(source)
+        return source
@@ -0,0 +1,99 @@
+# import standard modules
+import csv
+import itertools
+
+# import third party modules
+import numpy as np
+
+# import project related modules
+
+
+class RuleFileError(ValueError):
+    """
+    Error for a rule file with invalid rows or columns. The attribute errors holds the line number (1 is the header)
+    and a description of each invalid row, several problems of one row share its entry.
+
+    :param path: str: path of the rule file
+    :param errors: list: (line number, description) of each invalid row
+    """
+
+    def __init__(self, path: str, errors: list):
+        self.path = path
+        self.errors = errors
+        lines = "; ".join(f"line {line}: {message}" for line, message in errors[:10])
+        more = f" and {len(errors) - 10} more" if len(errors) > 10 else ""
+        super().__init__(f"{len(errors)} problems in rule file {path} - {lines}{more}")
+
+
+def read_rule_codes(path: str, parameters: dict, sep: str = ";", chunk_size: int = 65536, skip_invalid: bool = False,
+                    max_errors: int = 1000):
+    """
+    reads a rule file with one column per parameter and one member name per cell in chunks of rows. Each member name
+    gets validated against the members of its parameter and encoded into the member id of the parameter right away,
+    so only one chunk of strings is held in memory at a time.
+
+    :param path: str: path of the rule file, the first line holds the names of the parameters
+    :param parameters: dict: name of the parameter -> fitted Membership object, each parameter needs a column
+    :param sep: str: separator of the columns (default: ";")
+    :param chunk_size: int: amount of rows validated and encoded together (default: 65536)
+    :param skip_invalid: bool: drop invalid rows instead of raising a RuleFileError (default: False)
+    :param max_errors: int: reading stops after this amount of invalid rows (default: 1000)
+
+    :return: tuple: (codes, errors) - dict of parameter name -> integer array with the member id of each valid rule
+             in the order of the file and list of (line number, description) of each dropped row
+    """
+
+    errors = list()
+    dtypes = {name: np.min_scalar_type(-len(membership.names)) for name, membership in parameters.items()}
+    chunks = {name: list() for name in parameters}
+
+    with open(path, newline="") as file:
+        reader = csv.reader(file, delimiter=sep)
+
+        # the header defines the position of each parameter, columns without a parameter are a typo most likely
+        header = next(reader, [])
+        missing = [name for name in parameters if name not in header]
+        unknown = [column for column in header if column not in parameters]
+        if missing or unknown:
+            raise RuleFileError(path, [(1, f"missing columns {missing}, unknown columns {unknown}")])
+
+        columns = [(header.index(name), name, parameters[name].index) for name in parameters]
+
+        # each row with the number of its (last) line in the file, blank lines are skipped
+        rows = ((reader.line_num, row) for row in reader if row)
+
+        while len(errors) < max_errors:
+            chunk = list(itertools.islice(rows, chunk_size))
+            if not chunk:
+                break
+
+            # rows with a wrong amount of cells are dropped before the member names get encoded
+            problems = dict()
+            valid = np.ones(len(chunk), dtype=bool)
+            for ix, (line, row) in enumerate(chunk):
+                if len(row) != len(header):
+                    valid[ix] = False
+                    problems[ix] = [f"expected {len(header)} cells but found {len(row)}"]
+
+            # encode the chunk column by column, unknown members get the id -1
+            codes = dict()
+            for position, name, index in columns:
+                codes[name] = np.fromiter((index.get(row[position], -1) if ok else 0
+                                           for ok, (_, row) in zip(valid.tolist(), chunk)), dtype=np.int64,
+                                          count=len(chunk))
+                for ix in np.flatnonzero(codes[name] < 0).tolist():
+                    problems.setdefault(ix, list()).append(f"unknown member '{chunk[ix][1][position]}' of {name}")
+
+            # one error per invalid row, with all problems of the row
+            errors += [(chunk[ix][0], ", ".join(problems[ix])) for ix in sorted(problems)]
+            valid &= np.logical_and.reduce([codes[name] >= 0 for name in parameters])
+            for name in parameters:
+                chunks[name].append(codes[name][valid].astype(dtypes[name]))
+
+    # a file with too many invalid rows is not read to the end, even invalid rows can not be skipped then
+    if errors and (not skip_invalid or len(errors) >= max_errors):
+        raise RuleFileError(path, errors)
+
+    codes = {name: np.concatenate(parts) if parts else np.empty(0, dtype=dtypes[name])
+             for name, parts in chunks.items()}
+    return codes, errors
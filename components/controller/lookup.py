@@ -0,0 +1,245 @@
+# import standard modules
+import bisect
+import itertools
+
+# import third party modules
+import numpy as np
+
+# import project related modules
+
+
+class LookupTable:
+    """
+    Class that holds the precomputed output of a fitted FuzzyController over a grid of its input space. Each input
+    parameter gets one grid axis between its min_value and max_value, the output at any point in between comes from
+    multilinear interpolation of the surrounding grid points. Fit is the main function to compute a new table.
+
+    The controller output jumps where a member starts or stops to be true. All lower ends, centers and upper ends are
+    part of the grid, so these jumps only happen on grid lines. Therefore each grid cell does not share its corners
+    with the neighbour cells but uses values evaluated an epsilon inside the cell, and a value exactly on a grid line
+    (e.g. an input clipped to min_value) uses the value on the line itself.
+
+    A controller with several output parameters gets one table per output parameter, stacked along the last axis.
+
+    :param resolution: int or dict: amount of grid points per input parameter, either one value for all parameters or
+                                    a dict with the name of the parameter as key e.g. {"vel_crnt": 50, ...}
+    """
+
+    def __init__(self, resolution=32):
+        self.resolution = resolution   # amount of grid points per input parameter
+        self.names = list()            # names of the input parameters in the order of the table axes
+        self.outputs = list()          # names of the output parameters in the order of the last table axis
+        self.axes = list()             # grid points of each input parameter
+        self.corners = list()          # position on the table axis of both corners of each segment, per parameter
+        self.table = None              # exact controller output for each combination of evaluated positions
+        self.max_error = None          # max absolute error against the exact controller output
+        self.mean_error = None         # mean absolute error against the exact controller output
+
+        self._axis_lists = list()      # plain python copies of axes and corners for single lookups
+        self._corner_lists = list()
+        self._table_item = None
+
+    def _get_axis(self, membership):
+        """
+        class internal function which creates the grid points of one input parameter. Beside the evenly spaced points
+        all lower ends, centers and upper ends of the members are part of the axis, so each kink and jump of the
+        degrees of truth lies on a grid line.
+
+        :param membership: Membership: fitted input parameter
+
+        :return: np.ndarray: sorted, unique grid points
+        """
+
+        if isinstance(self.resolution, dict):
+            points = self.resolution[membership.name]
+        else:
+            points = self.resolution
+
+        breakpoints = np.concatenate([membership.lower, membership.center, membership.upper])
+        breakpoints = breakpoints[(breakpoints >= membership.min_value) & (breakpoints <= membership.max_value)]
+        return np.unique(np.concatenate([np.linspace(membership.min_value, membership.max_value, points), breakpoints]))
+
+    @staticmethod
+    def _get_positions(axis: np.ndarray):
+        """
+        class internal function without influence on class attributes. Each axis with n grid points is split into
+        2n - 1 segments: the grid points themselves (even segments) and the open cells in between (odd segments).
+        The function returns the positions the controller gets evaluated at and for each segment the index of its
+        lower and upper corner within these positions. Grid points use their own position for both corners.
+
+        :param axis: np.ndarray: sorted grid points of one input parameter
+
+        :return: tuple: (positions, corners) - positions as float array and corners as (2n - 1) x 2 integer array
+        """
+
+        n = len(axis)
+        epsilon = np.diff(axis) * 1e-9
+
+        # positions: n grid points followed by the lower and upper corner an epsilon inside each of the n - 1 cells
+        positions = np.concatenate([axis, np.stack([axis[:-1] + epsilon, axis[1:] - epsilon], axis=-1).reshape(-1)])
+
+        corners = np.empty((2 * n - 1, 2), dtype=np.int64)
+        corners[0::2] = np.arange(n)[:, None]
+        corners[1::2] = n + np.arange(2 * (n - 1)).reshape(-1, 2)
+        return positions, corners
+
+    def fit(self, controller, samples: int = 10000, seed: int = 0):
+        """
+        computes the table with the exact output of the controller for all grid points and cell corners and reports
+        the error of the interpolation against the exact output on randomly drawn points of the input space.
+
+        :param controller: FuzzyController: controller with all settings handed over and without a lookup table
+        :param samples: int: amount of random points used to measure the error of the table (default: 10000)
+        :param seed: int: seed of the random points (default: 0)
+
+        :return: None
+        """
+
+        self.names = list(controller.feature_space.keys())
+        self.axes = [self._get_axis(membership) for membership in controller.feature_space.values()]
+
+        positions = list()
+        self.corners = list()
+        for axis in self.axes:
+            position, corners = self._get_positions(axis)
+            positions.append(position)
+            self.corners.append(corners)
+
+        # evaluate the controller for all combinations of positions with one batch call
+        grid = np.stack(np.meshgrid(*positions, indexing="ij"), axis=-1).reshape(-1, len(self.axes))
+        self.outputs = list(controller._output_codes.keys())
+        self.table = self._stack(controller.run_batch(grid)).reshape([len(position) for position in positions] + [-1])
+        self._prepare()
+
+        # measure the error of the interpolation on random points of the input space over all output parameters
+        rng = np.random.default_rng(seed)
+        points = np.stack([rng.uniform(axis[0], axis[-1], samples) for axis in self.axes], axis=-1)
+        error = np.abs(self._stack(self.evaluate(points)) - self._stack(controller.run_batch(points)))
+        self.max_error = float(error.max())
+        self.mean_error = float(error.mean())
+
+    def refresh(self, controller, affected):
+        """
+        evaluates the controller again for the positions of the table whose output may have changed, e.g. after a few
+        rules of the controller got edited. max_error and mean_error keep the values measured by fit.
+
+        :param controller: FuzzyController: controller the table was fitted for, without a lookup table
+        :param affected: callable: takes the evaluated positions of each axis (list of arrays) and returns a boolean
+                                   array in the shape of the table without the output axis, True for each position to
+                                   evaluate again
+
+        :return: int: amount of evaluated positions
+        """
+
+        positions = [self._get_positions(axis)[0] for axis in self.axes]
+        index = np.nonzero(affected(positions))
+        if not len(index[0]):
+            return 0
+
+        values = np.stack([position[ix] for position, ix in zip(positions, index)], axis=-1)
+        self.table[index] = self._stack(controller.run_batch(values))
+        return len(index[0])
+
+    def _stack(self, output):
+        """
+        class internal function which brings the output of run_batch or evaluate into one N x outputs array.
+
+        :param output: np.ndarray or dict: output values of one or several output parameters
+
+        :return: np.ndarray: N x outputs array in the order of self.outputs
+        """
+
+        if isinstance(output, dict):
+            return np.stack([output[name] for name in self.outputs], axis=-1)
+        return np.asarray(output)[:, None]
+
+    def _prepare(self):
+        """
+        class internal function which keeps plain python copies of the axes and corners for single lookups.
+
+        :return: None
+        """
+
+        self._axis_lists = [axis.tolist() for axis in self.axes]
+        self._corner_lists = [corners.tolist() for corners in self.corners]
+        self._table_item = self.table.item
+
+    def evaluate(self, values):
+        """
+        multilinear interpolation of the table for many input situations at once.
+
+        :param values: array like: N x k input values with one column per input parameter in the order of self.names
+
+        :return: np.ndarray: one interpolated output per row, with several output parameters a dict of arrays with the
+                             name of each output parameter as key
+        """
+
+        values = np.asarray(values, dtype=float).reshape(-1, len(self.axes))
+
+        # find the segment and the relative position within the segment for each input parameter
+        segments, weights = list(), list()
+        for ix, axis in enumerate(self.axes):
+            value = np.clip(values[:, ix], axis[0], axis[-1])
+            point = np.searchsorted(axis, value, side="left")
+            on_grid = axis[np.minimum(point, len(axis) - 1)] == value
+
+            # a value on a grid point uses the even segment of the point, any other the odd segment of its cell
+            cell = np.maximum(point - 1, 0)
+            segments.append(np.where(on_grid, 2 * point, 2 * cell + 1))
+            weights.append(np.where(on_grid, 0.0, (value - axis[cell]) / (axis[cell + 1] - axis[cell])))
+
+        # sum up the 2^k corners of each segment weighted by the product of the relative positions
+        output = np.zeros((len(values), len(self.outputs)))
+        for corner in np.ndindex(*([2] * len(self.axes))):
+            weight = np.ones(len(values))
+            index = list()
+            for ix, upper in enumerate(corner):
+                weight *= weights[ix] if upper else 1 - weights[ix]
+                index.append(self.corners[ix][segments[ix], upper])
+            output += weight[:, None] * self.table[tuple(index)]
+
+        if len(self.outputs) == 1:
+            return output[:, 0]
+        return {name: output[:, ix] for ix, name in enumerate(self.outputs)}
+
+    def __call__(self, inputs: dict):
+        """
+        interpolated output for a single input situation.
+
+        :param inputs: dict: contains key name of each input parameter and an absolute value for each input parameter
+
+        :return: float: interpolated reaction value, with several output parameters a dict with the name of each
+                        output parameter as key
+        """
+
+        # same steps as in evaluate, but with plain python numbers - a single lookup is dominated by the overhead of
+        # small numpy calls otherwise
+        segments, weights = list(), list()
+        for name, axis in zip(self.names, self._axis_lists):
+            value = min(max(float(inputs[name]), axis[0]), axis[-1])
+            point = bisect.bisect_left(axis, value)
+
+            if point < len(axis) and axis[point] == value:
+                segments.append(2 * point)
+                weights.append(0.0)
+            else:
+                segments.append(2 * point - 1)
+                weights.append((value - axis[point - 1]) / (axis[point] - axis[point - 1]))
+
+        outputs = range(len(self.outputs))
+        output = [0.0] * len(self.outputs)
+        for corner in itertools.product((0, 1), repeat=len(segments)):
+            weight = 1.0
+            index = list()
+            for segment, fraction, upper, corners in zip(segments, weights, corner, self._corner_lists):
+                weight *= fraction if upper else 1 - fraction
+                index.append(corners[segment][upper])
+            if weight:
+                for ix in outputs:
+                    index.append(ix)
+                    output[ix] += weight * self._table_item(tuple(index))
+                    index.pop()
+
+        if len(output) == 1:
+            return output[0]
+        return dict(zip(self.outputs, output))
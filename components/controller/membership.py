@@ -1,16 +1,19 @@
 # import standard modules
+import bisect
 
-# import third party modules
-from scipy.interpolate import interp1d
+# import third party modules - matplotlib is only imported for plotting
+import numpy as np
 
 # import project related modules
-from matplotlib import pyplot as plt
 
 
 class Membership:
     """
     Class that performs membership specific tasks. Like calculating the degree of truth for a given value. Fit is the
-    main function to initialize a new Membership with new members.
+    main function to initialize a new Membership with new members. The members are kept in contiguous arrays of
+    lower end, center and upper end, so the degrees of truth of all members are calculated in closed form at once.
+    For single values an interval index over the supports of the members finds the members which are true to a degree
+    without looking at all others, see get_active_degrees.
 
     :param: measure: str: (empty string default): defines in measure unit of measure the members are measured -
                           cosmetics for plotting.
@@ -22,34 +25,95 @@ class Membership:
         self.max_value = 0         # max value on x axis
         self.min_value = 0         # min value on y axis
         self.measure = measure     # description of base unit of measure
+        self.names = list()        # names of all members, the position in the list is the member id
+        self.index = dict()        # member name -> member id
+        self.lower = None          # lower end of each member
+        self.center = None         # center of each member
+        self.upper = None          # upper end of each member
+
+        self._breakpoints = list()     # sorted lower and upper ends, min_value and max_value of the interval index
+        self._offsets = list()         # start of the entries of each segment of the interval index
+        self._entry_ids = None         # member id of each entry of the interval index
+        self._entries = None           # lower, rise, upper, fall of each entry of the interval index
+
+    def get_degrees(self, values):
+        """
+        for a given input value or an array of input values get the degrees of truth for each member available in the
+        Membership object. The triangles are evaluated in closed form: rising edge (value - lower) / (center - lower),
+        falling edge (upper - value) / (upper - center) and a degree of 1 for an edge of length zero (shoulder).
 
-    def get_membership_degree(self, value: float):
+        :param values: float or array like: value(s) for which degrees of truth are of interest
+
+        :return: np.ndarray: degrees with one column per member (order of self.names) - a vector for a single value
+                             and a dense matrix with one row per value for an array
         """
-        for a given input value get the degrees of truth for each member available in the Membership object.
+
+        # prevent edge case that input values are higher or lower than defined scale
+        values = np.clip(np.asarray(values, dtype=float), self.min_value, self.max_value)[..., None]
+
+        rise = self.center - self.lower
+        fall = self.upper - self.center
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            rising = np.where(rise > 0, (values - self.lower) / rise, 1)
+            falling = np.where(fall > 0, (self.upper - values) / fall, 1)
+
+        # a member is only true to a degree between its lower and upper end
+        in_range = (values >= self.lower) & (values <= self.upper)
+        return np.where(in_range, np.minimum(rising, falling), 0.0)
+
+    def get_active_degrees(self, value: float):
+        """
+        for a given input value get the degrees of truth of the members which are true to a degree. The breakpoints of
+        the interval index split the axis into segments - the breakpoints themselves and the open cells in between -
+        and each segment knows the members whose support covers it. A binary search finds the segment of the value,
+        so the costs grow with the log of the amount of members plus the amount of active members.
 
         :param value: float: value for which degrees of truth are of interest
 
-        :return: returns memberships with an additional degree value
+        :return: tuple: (ids, degrees) - np.ndarray of the ids of the active members in ascending order and
+                        np.ndarray of their degrees of truth (all greater than zero)
         """
 
-        # prevent edge case that input value is higher or lower than defined scale
-        if value > self.max_value:
-            value = self.max_value
+        # prevent edge case that input values are higher or lower than defined scale, a nan is not true to any member
+        value = min(max(float(value), self.min_value), self.max_value)
+        if value != value:
+            return self._entry_ids[:0], self._entries[0, :0]
 
-        elif value < self.min_value:
-            value = self.min_value
+        # even segments are the breakpoints, odd segments the open cells in between
+        point = bisect.bisect_left(self._breakpoints, value)
+        on_breakpoint = self._breakpoints[point] == value
+        segment = 2 * point if on_breakpoint else 2 * point - 1
 
-        # calculate the degree of truth for a given value for each member available in Membership object
-        # therefore the interpolation function is used
-        for category, values in self.memberships.items():
+        start, end = self._offsets[segment], self._offsets[segment + 1]
+        ids = self._entry_ids[start:end]
+        lower, rise, upper, fall = self._entries[:, start:end]
 
-            if (value >= values["lower_end"]) and (value <= values["upper_end"]):
-                values["degree"] = float(values["coordinates"]["degree_func"](value))
+        # same closed form as get_degrees, an edge of length zero has an infinite length in the index and adds one
+        rising = (value - lower) / rise + np.isinf(rise)
+        falling = (upper - value) / fall + np.isinf(fall)
+        degrees = np.minimum(rising, falling)
 
-            else:
-                values["degree"] = 0
+        # within an open cell all members of the segment are true to a degree, on a breakpoint a member may start or
+        # end with a degree of zero
+        if on_breakpoint:
+            active = degrees > 0
+            return ids[active], degrees[active]
+        return ids, degrees
 
-        return self.memberships
+    def get_membership_degree(self, value: float):
+        """
+        for a given input value get the degrees of truth for each member available in the Membership object.
+
+        :param value: float: value for which degrees of truth are of interest
+
+        :return: returns a copy of the memberships with an additional degree value - self.memberships stays untouched,
+                 so the same object can be used by several threads at once
+        """
+
+        # calculate the degree of truth for a given value for each member available in Membership object
+        return {category: dict(self.memberships[category], degree=float(degree))
+                for category, degree in zip(self.names, self.get_degrees(value))}
 
     def get_member(self, name: str):
         """
@@ -90,21 +154,31 @@ class Membership:
         :return: None
         """
 
-        # set input parameters to global attributes
-        self.memberships = members
+        # set input parameters to global attributes - each member gets copied, so the handed over dict stays untouched
+        self.memberships = {category: dict(values) for category, values in members.items()}
         self.name = name
+        self.names = list(self.memberships.keys())
+        self.index = {category: ix for ix, category in enumerate(self.names)}
+
+        # collect the lower, center and upper values of all members in contiguous arrays. The arrays are read only,
+        # a fitted Membership does not change while it is evaluated
+        self.lower, self.center, self.upper = (
+            np.array([values[key] for values in self.memberships.values()], dtype=float)
+            for key in ("lower_end", "center", "upper_end")
+        )
+        for array in (self.lower, self.center, self.upper):
+            array.setflags(write=False)
 
         # iterate over each member and its values (lower, center, upper) in order to set the write values
-        # get the max and min values and to set a interpolation function to create an easy access to all y values
-        # at a given x value.
+        # get the max and min values and the coordinates of each members triangle
         for category, values in self.memberships.items():
 
             # find the min and max x values
-            for x in list(values.values()):
+            x_values = [values["lower_end"], values["center"], values["upper_end"]]
+            for x in x_values:
                 self._contribute_max_min(x)
 
             # defines the y values for each member. since only triangles supported it always as 3 binary values
-            x_values = list(values.values())
             if len(set(x_values[:2])) == 1:
                 y_values = [1, 1, 0]
             elif len(set(x_values[1:])) == 1:
@@ -112,9 +186,78 @@ class Membership:
             else:
                 y_values = [0, 1, 0]
 
-            # add member specific coordinates with x's y's and function to get the degree of truth for a certain
-            # x input. will be accessible in self.memberships[category]
-            values["coordinates"] = {"x": x_values, "y": y_values, "degree_func": interp1d(x_values, y_values)}
+            # add member specific coordinates with x's and y's, will be accessible in self.memberships[category]
+            values["coordinates"] = {"x": x_values, "y": y_values}
+
+        self._fit_interval_index()
+
+    def get_tables(self):
+        """
+        exports the fitted members as plain data, e.g. to store a compiled controller. set_tables restores them.
+
+        :return: tuple: (meta, arrays) - dict with name, measure and member names and dict with the arrays "lower",
+                        "center" and "upper"
+        """
+
+        meta = {"name": self.name, "measure": self.measure, "names": list(self.names)}
+        return meta, {"lower": self.lower, "center": self.center, "upper": self.upper}
+
+    def set_tables(self, meta: dict, arrays: dict):
+        """
+        initializes the Membership object from the output of get_tables.
+
+        :param meta: dict: name, measure and member names
+        :param arrays: dict: arrays "lower", "center" and "upper" in the order of the member names
+
+        :return: None
+        """
+
+        members = {
+            category: {"lower_end": lower, "center": center, "upper_end": upper}
+            for category, lower, center, upper in zip(meta["names"], arrays["lower"].tolist(),
+                                                      arrays["center"].tolist(), arrays["upper"].tolist())
+        }
+        self.measure = meta["measure"]
+        self.fit(members, name=meta["name"])
+
+    def _fit_interval_index(self):
+        """
+        class internal function which builds the interval index used by get_active_degrees. The sorted breakpoints
+        (all lower and upper ends plus min_value and max_value) split the axis into 2n - 1 segments: the n breakpoints
+        (even segments) and the open cells in between (odd segments). The support of each member covers a contiguous
+        range of segments, the entries of all segments are stored one after the other (CSR), ordered by member id
+        within a segment.
+
+        :return: None
+        """
+
+        breakpoints = np.unique(np.concatenate([self.lower, self.upper, [self.min_value, self.max_value]]))
+
+        # first and last segment covered by the support of each member
+        first = 2 * np.searchsorted(breakpoints, self.lower)
+        last = 2 * np.searchsorted(breakpoints, self.upper)
+        counts = last - first + 1
+
+        # expand each member to one entry per covered segment and sort the entries by segment
+        members = np.repeat(np.arange(len(self.names)), counts)
+        segments = np.repeat(first - np.cumsum(counts) + counts, counts) + np.arange(counts.sum())
+        order = np.lexsort((members, segments))
+        members, segments = members[order], segments[order]
+
+        rise = self.center - self.lower
+        fall = self.upper - self.center
+        self._entry_ids = members
+        self._entries = np.stack([
+            self.lower[members],
+            np.where(rise > 0, rise, np.inf)[members],
+            self.upper[members],
+            np.where(fall > 0, fall, np.inf)[members],
+        ])
+        for array in (self._entry_ids, self._entries):
+            array.setflags(write=False)
+
+        self._offsets = np.searchsorted(segments, np.arange(2 * len(breakpoints))).tolist()
+        self._breakpoints = breakpoints.tolist()
 
     def show(self):
         """
@@ -122,6 +265,7 @@ class Membership:
 
         :return: None but displays graph
         """
+        from matplotlib import pyplot as plt
 
         for category, values in self.memberships.items():
             plt.plot(values["coordinates"]["x"], values["coordinates"]["y"], label=category)
@@ -0,0 +1,109 @@
+# import standard modules
+import threading
+
+# import third party modules
+import numpy as np
+
+# import project related modules
+
+
+class Profiler:
+    """
+    Class that collects run time statistics of a FuzzyController: the cumulative wall time of fuzzification,
+    inference and defuzzification, how many rules fired per evaluated input situation and how often each single rule
+    fired. Recording is guarded by a lock, so a controller shared by several threads can be profiled as well.
+
+    :param n_rules: int: amount of rules of the profiled controller
+    """
+
+    STAGES = ("fuzzification", "inference", "defuzzification")
+
+    def __init__(self, n_rules: int = 0):
+        self.n_rules = n_rules
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """
+        sets all statistics back to zero.
+
+        :return: None
+        """
+
+        with self._lock:
+            self.calls = 0                                        # amount of run / run_batch calls
+            self.rows = 0                                         # amount of evaluated input situations
+            self.seconds = {stage: 0.0 for stage in self.STAGES}  # cumulative wall time of each stage
+            self.rule_counts = np.zeros(self.n_rules, dtype=np.int64)   # how often each rule fired
+            self.fired_histogram = np.zeros(1, dtype=np.int64)    # input situations by amount of fired rules
+
+    def grow(self, n_rules: int):
+        """
+        extends the statistics to more rules, e.g. after rules got added to the controller. The counts of the existing
+        rules are kept.
+
+        :param n_rules: int: new amount of rules
+
+        :return: None
+        """
+
+        with self._lock:
+            if n_rules > self.n_rules:
+                self.rule_counts = np.concatenate([self.rule_counts, np.zeros(n_rules - self.n_rules, dtype=np.int64)])
+                self.n_rules = n_rules
+
+    def record(self, durations: tuple, fired: np.ndarray, fired_per_row: np.ndarray):
+        """
+        adds the statistics of one run or run_batch call.
+
+        :param durations: tuple: wall time of fuzzification, inference and defuzzification in seconds
+        :param fired: np.ndarray: positions of the rules fired during the call, once per firing
+        :param fired_per_row: np.ndarray: amount of fired rules for each evaluated input situation
+
+        :return: None
+        """
+
+        per_row = np.bincount(fired_per_row)
+
+        # counting with bincount touches every rule, which only pays off for many firings
+        counts = np.bincount(fired, minlength=self.n_rules) if len(fired) > self.n_rules else None
+
+        with self._lock:
+            self.calls += 1
+            self.rows += len(fired_per_row)
+            for stage, duration in zip(self.STAGES, durations):
+                self.seconds[stage] += float(duration)
+
+            if counts is not None:
+                self.rule_counts += counts
+            else:
+                np.add.at(self.rule_counts, fired, 1)
+            if len(per_row) > len(self.fired_histogram):
+                self.fired_histogram = np.pad(self.fired_histogram, (0, len(per_row) - len(self.fired_histogram)))
+            self.fired_histogram[:len(per_row)] += per_row
+
+    def snapshot(self):
+        """
+        consistent copy of the current statistics.
+
+        :return: dict: {"calls", "rows", "seconds": {stage: seconds}, "rules_fired": {"total", "mean", "max"},
+                        "fired_histogram": rows by amount of fired rules, "rule_counts": fires per rule,
+                        "dead_rules": positions of the rules which never fired}
+        """
+
+        with self._lock:
+            total = int(self.rule_counts.sum())
+            fired = np.flatnonzero(self.fired_histogram)
+            return {
+                "calls": self.calls,
+                "rows": self.rows,
+                "seconds": dict(self.seconds),
+                "rules_fired": {
+                    "total": total,
+                    "mean": total / self.rows if self.rows else 0.0,
+                    "max": int(fired[-1]) if len(fired) else 0,
+                },
+                "fired_histogram": self.fired_histogram.copy(),
+                "rule_counts": self.rule_counts.copy(),
+                "dead_rules": np.flatnonzero(self.rule_counts == 0),
+            }
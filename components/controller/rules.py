@@ -0,0 +1,574 @@
+# import standard modules
+
+# import third party modules
+import numpy as np
+
+# import project related modules
+
+
+class RuleIndex:
+    """
+    Class that holds a compiled, integer coded version of a rule set. Each column of the rule set gets its own
+    vocabulary which maps a member name e.g. "very slow" to an integer id. For each column and member the index keeps
+    a posting list with the positions of all rules using that member. Finding the rules that match a set of active
+    members is therefore a union of posting lists per column followed by an intersection over all columns, without
+    parsing any query string. Fit is the main function to compile a new rule set.
+    """
+
+    def __init__(self):
+        self.columns = list()      # names of all columns in the rule set
+        self.members = dict()      # column -> list of member names, the position in the list is the member id
+        self.lookup = dict()       # column -> dict of member name -> member id
+        self.codes = dict()        # column -> integer array with the member id of each rule
+        self.postings = dict()     # column -> (rule positions ordered by member id, offsets of each member)
+        self.size = 0              # number of rules in the index
+        self.removed = 0           # number of removed rules (tombstones) within size
+
+        self._buffers = dict()     # column -> writable, growable codes once the index gets edited
+        self._delta = dict()       # column -> member id -> positions of the appended rules using the member
+
+    @staticmethod
+    def _build_postings(codes: np.ndarray, n_members: int):
+        """
+        class internal function without influence on class attributes. Creates the posting lists of one column in a
+        compressed layout: all rule positions sorted by member id plus the offsets where each member starts.
+        The posting list of member k is order[offsets[k]:offsets[k + 1]].
+
+        :param codes: np.ndarray: member id of each rule for one column
+        :param n_members: int: amount of members in the vocabulary of the column
+
+        :return: tuple: (order, offsets) both as integer arrays
+        """
+
+        # a stable sort keeps the rule positions within one member in ascending order, removed rules (id -1) come
+        # first and are not part of any posting list
+        order = np.argsort(codes, kind="stable").astype(np.int64)
+        valid = codes[codes >= 0]
+        order = order[len(codes) - len(valid):]
+        offsets = np.zeros(n_members + 1, dtype=np.int64)
+        np.cumsum(np.bincount(valid, minlength=n_members), out=offsets[1:])
+        return order, offsets
+
+    def fit(self, rules):
+        """
+        compiles a rule set into the index. Every column gets encoded into member ids and a posting list.
+
+        :param rules: pandas.DataFrame: rule set with one column per parameter and one member name per cell
+
+        :return: None
+        """
+
+        members, codes = dict(), dict()
+        for column in rules.columns:
+
+            # np.unique returns the sorted vocabulary and the id of each cell within the vocabulary
+            vocabulary, codes[column] = np.unique(np.asarray(rules[column]).astype(str), return_inverse=True)
+            members[column] = [str(m) for m in vocabulary]
+
+        self.fit_codes(members, codes)
+
+    def fit_codes(self, members: dict, codes: dict):
+        """
+        compiles an already integer coded rule set into the index, e.g. streamed from a rule file.
+
+        :param members: dict: column -> list of member names, the position in the list is the member id
+        :param codes: dict: column -> integer array with the member id of each rule
+
+        :return: None
+        """
+
+        self.columns = list(members.keys())
+        self.size = len(next(iter(codes.values()))) if codes else 0
+        self.removed = 0
+        self._buffers, self._delta = dict(), dict()
+
+        for column in self.columns:
+            column_codes = np.asarray(codes[column]).astype(np.int32).reshape(-1)
+
+            self.members[column] = list(members[column])
+            self.lookup[column] = {m: ix for ix, m in enumerate(self.members[column])}
+            self.codes[column] = column_codes
+            self.postings[column] = self._build_postings(column_codes, len(self.members[column]))
+
+            # the compiled index is only read during inference, which makes it safe to share between threads
+            for array in (column_codes, ) + self.postings[column]:
+                array.setflags(write=False)
+
+    def get_tables(self):
+        """
+        exports the compiled index as plain data, e.g. to store a compiled controller. set_tables restores it.
+
+        :return: tuple: (meta, arrays) - dict with the columns, vocabularies and size and dict with the arrays
+                        "codes/<column>", "order/<column>" and "offsets/<column>"
+        """
+
+        meta = {"kind": "index", "columns": self.columns, "members": self.members, "size": self.size,
+                "removed": self.removed}
+        arrays = dict()
+        for column in self.columns:
+            arrays[f"codes/{column}"] = self.codes[column]
+
+            # posting lists of an edited index get merged with the appended rules
+            if column in self._buffers:
+                postings = self._build_postings(self.codes[column], len(self.members[column]))
+            else:
+                postings = self.postings[column]
+            arrays[f"order/{column}"], arrays[f"offsets/{column}"] = postings
+        return meta, arrays
+
+    def set_tables(self, meta: dict, arrays: dict):
+        """
+        initializes the index from the output of get_tables. The arrays are used as they are, e.g. memory mapped.
+
+        :param meta: dict: columns, vocabularies and size
+        :param arrays: dict: codes and posting lists of each column
+
+        :return: None
+        """
+
+        self.columns = list(meta["columns"])
+        self.size = meta["size"]
+        self.removed = meta.get("removed", 0)
+        self._buffers, self._delta = dict(), dict()
+        for column in self.columns:
+            self.members[column] = list(meta["members"][column])
+            self.lookup[column] = {m: ix for ix, m in enumerate(self.members[column])}
+            self.codes[column] = arrays[f"codes/{column}"]
+            self.postings[column] = (arrays[f"order/{column}"], arrays[f"offsets/{column}"])
+
+    def _reserve(self, amount: int):
+        """
+        class internal function which makes sure the codes of all columns can take amount more rules. On the first
+        edit the codes get copied into writable buffers (the compiled codes may be read only or memory mapped), full
+        buffers get twice as large, so appending rules costs amortized time in proportion to their amount.
+
+        :param amount: int: amount of rules to append
+
+        :return: None
+        """
+
+        for column in self.columns:
+            buffer = self._buffers.get(column)
+            if buffer is None or len(buffer) < self.size + amount:
+                grown = np.empty(max(2 * (self.size + amount), 16), dtype=np.int32)
+                grown[:self.size] = self.codes[column]
+                self._buffers[column] = grown
+                self._delta.setdefault(column, dict())
+
+    def _publish(self):
+        """
+        class internal function which hands out read only views of the buffers as codes of the index.
+
+        :return: None
+        """
+
+        for column, buffer in self._buffers.items():
+            codes = buffer[:self.size]
+            codes.setflags(write=False)
+            self.codes[column] = codes
+
+    def add_members(self, column: str, names: list):
+        """
+        adds members to the vocabulary of a column, names which are already part of it are kept.
+
+        :param column: str: name of the column e.g. "vel_crnt"
+        :param names: list: member names
+
+        :return: np.ndarray: member id of each name
+        """
+
+        lookup = self.lookup[column]
+        for name in names:
+            if name not in lookup:
+                lookup[name] = len(self.members[column])
+                self.members[column].append(name)
+        return np.array([lookup[name] for name in names], dtype=np.int64)
+
+    def append(self, codes: dict):
+        """
+        appends rules at the end of the index. The posting lists of the compiled index are not rebuilt, the
+        positions of the new rules are kept in small delta posting lists per member instead.
+
+        :param codes: dict: column -> integer array with the member id of each new rule, all columns are needed
+
+        :return: np.ndarray: positions of the new rules
+        """
+
+        amount = len(next(iter(codes.values())))
+        self._reserve(amount)
+
+        positions = np.arange(self.size, self.size + amount, dtype=np.int64)
+        for column in self.columns:
+            column_codes = np.asarray(codes[column], dtype=np.int64)
+            self._buffers[column][self.size:self.size + amount] = column_codes
+
+            delta = self._delta[column]
+            for member in np.unique(column_codes).tolist():
+                added = positions[column_codes == member]
+                delta[member] = np.concatenate([delta[member], added]) if member in delta else added
+
+        self.size += amount
+        self._publish()
+        return positions
+
+    def remove(self, positions: np.ndarray):
+        """
+        removes rules from the index. The rules keep their position as tombstone, all their member ids become -1 (a
+        member unknown to every parameter), so they never fire. Posting lists still point to them until the index
+        gets compiled again.
+
+        :param positions: np.ndarray: positions of the rules to remove
+
+        :return: None
+        """
+
+        positions = np.asarray(positions, dtype=np.int64)
+        self._reserve(0)
+        self.removed += int(np.count_nonzero(self._buffers[self.columns[0]][positions] >= 0))
+        for column in self.columns:
+            self._buffers[column][positions] = -1
+        self._publish()
+
+    def assign(self, positions: np.ndarray, codes: dict):
+        """
+        overwrites the member ids of rules in place. Only for columns which are not used to find the matching rules
+        (output parameters), the posting lists are not updated.
+
+        :param positions: np.ndarray: positions of the rules
+        :param codes: dict: column -> integer array with the new member id of each rule
+
+        :return: None
+        """
+
+        self._reserve(0)
+        for column, column_codes in codes.items():
+            self._buffers[column][np.asarray(positions, dtype=np.int64)] = column_codes
+        self._publish()
+
+    def get_codes(self, column: str, positions: np.ndarray = None):
+        """
+        get the member ids of a column for the rules at the given positions.
+
+        :param column: str: name of the column e.g. "vel_crnt"
+        :param positions: np.ndarray: positions of the rules, None for all rules (default: None)
+
+        :return: np.ndarray: member id of each rule within the vocabulary of the column
+        """
+
+        codes = self.codes[column]
+        return codes if positions is None else codes[positions]
+
+    def get_postings(self, column: str, ids):
+        """
+        get the sorted positions of all rules which use one of the given members in a column.
+
+        :param column: str: name of the column e.g. "vel_crnt"
+        :param ids: iterable: member ids of the column
+
+        :return: np.ndarray: sorted rule positions
+        """
+
+        order, offsets = self.postings[column]
+        chunks = [order[offsets[ix]:offsets[ix + 1]] for ix in ids if ix < len(offsets) - 1]
+
+        # positions of appended rules are behind all compiled rules
+        delta = self._delta.get(column)
+        if delta:
+            chunks += [delta[ix] for ix in ids if ix in delta]
+
+        if len(chunks) == 1:
+            return chunks[0]
+
+        # members of one column never share a rule, so the union is a plain concatenation which only needs sorting
+        return np.sort(np.concatenate(chunks)) if chunks else np.empty(0, dtype=np.int64)
+
+    def match(self, conditions: dict):
+        """
+        finds all rules which match the given members. Within a column a rule matches if it uses one of the handed
+        over members (OR), over all columns a rule must match each column (AND). Columns which are not handed over do
+        not limit the result, a column with an empty list of members matches no rule at all.
+
+        :param conditions: dict: column name as key and a list of member ids as value e.g. {"vel_crnt": [0, 3]}
+
+        :return: np.ndarray: sorted positions of all matching rules
+        """
+
+        # collect the posting lists of all limiting columns and start the intersection with the shortest one
+        candidates = [self.get_postings(column, ids) for column, ids in conditions.items()]
+        if not candidates:
+            return np.arange(self.size, dtype=np.int64)
+
+        candidates.sort(key=len)
+        positions = candidates[0]
+        for postings in candidates[1:]:
+            if len(positions) == 0:
+                break
+            positions = np.intersect1d(positions, postings, assume_unique=True)
+
+        return positions
+
+
+class RuleTensor:
+    """
+    Class that holds a rule set over a grid of input member combinations as dense tensors. Each input column spans one
+    axis of the grid with one entry per member of its vocabulary. Each other (output) column gets its own tensor which
+    holds the member id of the rule for each combination as small integer, -1 marks a combination without a rule. A
+    rule is addressed by its flat position in the grid (C order). Finding the rules that match a set of active members
+    is a direct indexing of the grid with the active member ids of each axis, so the costs depend on the amount of
+    active members but not on the size of the rule set. Fit is the main function to compile a new rule set.
+    """
+
+    def __init__(self):
+        self.columns = list()      # names of all columns in the rule set
+        self.axes = list()         # names of the input columns in the order of the grid axes
+        self.members = dict()      # column -> list of member names, the position in the list is the member id
+        self.lookup = dict()       # column -> dict of member name -> member id
+        self.tensors = dict()      # output column -> tensor with the member id of the rule of each combination or -1
+        self.shape = tuple()       # amount of members of each axis
+        self.strides = tuple()     # distance of the flat positions of two neighbours along each axis
+        self.size = 0              # amount of combinations in the grid
+        self.count = 0             # amount of rules in the grid
+
+        self._buffers = dict()     # output column -> writable tensor once the grid gets edited
+
+    def fit(self, rules, axes: list):
+        """
+        compiles a rule set into the tensors. Each combination of input members may only have one rule.
+
+        :param rules: pandas.DataFrame: rule set with one column per parameter and one member name per cell
+        :param axes: list: names of the input columns in the order of the grid axes, all other columns are outputs
+
+        :return: None
+        """
+
+        members, codes = dict(), dict()
+        for column in rules.columns:
+
+            # np.unique returns the sorted vocabulary and the id of each cell within the vocabulary
+            vocabulary, codes[column] = np.unique(np.asarray(rules[column]).astype(str), return_inverse=True)
+            members[column] = [str(m) for m in vocabulary]
+
+        self.fit_codes(members, codes, axes)
+
+    def fit_codes(self, members: dict, codes: dict, axes: list):
+        """
+        compiles an already integer coded rule set into the tensors, e.g. streamed from a rule file.
+
+        :param members: dict: column -> list of member names, the position in the list is the member id
+        :param codes: dict: column -> integer array with the member id of each rule
+        :param axes: list: names of the input columns in the order of the grid axes, all other columns are outputs
+
+        :return: None
+        """
+
+        missing = [column for column in axes if column not in members]
+        if missing:
+            raise ValueError(f"the rule set does not contain the input parameters {missing}")
+
+        outputs = [column for column in members if column not in axes]
+        if not outputs:
+            raise ValueError("the rule set does not contain any output parameter")
+
+        for column in members:
+            self.members[column] = list(members[column])
+            self.lookup[column] = {m: ix for ix, m in enumerate(self.members[column])}
+
+        shape = tuple(len(self.members[column]) for column in axes)
+        positions = np.ravel_multi_index([np.asarray(codes[column]).reshape(-1) for column in axes], shape)
+        if len(np.unique(positions)) != len(positions):
+            raise ValueError("the rule set contains several rules for the same combination of input members")
+
+        for column in outputs:
+
+            # the smallest integer type which holds all member ids of the column and -1
+            dtype = np.min_scalar_type(-len(self.members[column]))
+            tensor = np.full(shape, -1, dtype=dtype)
+            tensor.reshape(-1)[positions] = np.asarray(codes[column]).reshape(-1)
+
+            # the compiled tensors are only read during inference, which makes it safe to share between threads
+            tensor.setflags(write=False)
+            self.tensors[column] = tensor
+
+        self.columns = list(members.keys())
+        self.axes = list(axes)
+        self._buffers = dict()
+        self.shape = shape
+        self.strides = tuple(int(np.prod(shape[ix + 1:])) for ix in range(len(shape)))
+        self.size = int(np.prod(shape))
+        self.count = len(positions)
+
+    def get_tables(self):
+        """
+        exports the compiled tensors as plain data, e.g. to store a compiled controller. set_tables restores them.
+
+        :return: tuple: (meta, arrays) - dict with the columns, axes, vocabularies and amount of rules and dict with
+                        the arrays "tensors/<output column>"
+        """
+
+        meta = {"kind": "tensor", "columns": self.columns, "axes": self.axes, "members": self.members,
+                "count": self.count}
+        return meta, {f"tensors/{column}": tensor for column, tensor in self.tensors.items()}
+
+    def set_tables(self, meta: dict, arrays: dict):
+        """
+        initializes the tensors from the output of get_tables. The arrays are used as they are, e.g. memory mapped.
+
+        :param meta: dict: columns, axes, vocabularies and amount of rules
+        :param arrays: dict: tensor of each output column
+
+        :return: None
+        """
+
+        self.columns = list(meta["columns"])
+        self.axes = list(meta["axes"])
+        for column in self.columns:
+            self.members[column] = list(meta["members"][column])
+            self.lookup[column] = {m: ix for ix, m in enumerate(self.members[column])}
+
+        self.tensors = {column: arrays[f"tensors/{column}"] for column in self.columns if column not in self.axes}
+        self._buffers = dict()
+        self.shape = tuple(len(self.members[column]) for column in self.axes)
+        self.strides = tuple(int(np.prod(self.shape[ix + 1:])) for ix in range(len(self.shape)))
+        self.size = int(np.prod(self.shape))
+        self.count = meta["count"]
+
+    def _writable(self):
+        """
+        class internal function which makes sure the tensors can be edited. The compiled tensors may be read only or
+        memory mapped, on the first edit they get copied once. The tensors handed out stay read only views.
+
+        :return: dict: output column -> writable tensor
+        """
+
+        if not self._buffers:
+            self._buffers = {column: np.array(tensor) for column, tensor in self.tensors.items()}
+            for column, buffer in self._buffers.items():
+                view = buffer.view()
+                view.setflags(write=False)
+                self.tensors[column] = view
+        return self._buffers
+
+    def add_members(self, column: str, names: list):
+        """
+        adds members to the vocabulary of an output column, names which are already part of it are kept. The grid
+        axes can not grow in place, the rule set has to be compiled again for new input members.
+
+        :param column: str: name of the column e.g. "acceleration"
+        :param names: list: member names
+
+        :return: np.ndarray: member id of each name
+        """
+
+        lookup = self.lookup[column]
+        new = [name for name in dict.fromkeys(names) if name not in lookup]
+        if new and column in self.axes:
+            raise ValueError(f"the members {new} are not part of the grid axis {column}, compile the rule set again")
+
+        for name in new:
+            lookup[name] = len(self.members[column])
+            self.members[column].append(name)
+
+        # the integer type of the tensor must hold the new member ids
+        if new and np.min_scalar_type(-len(self.members[column])).itemsize > self.tensors[column].itemsize:
+            buffers = self._writable()
+            buffers[column] = buffers[column].astype(np.min_scalar_type(-len(self.members[column])))
+            view = buffers[column].view()
+            view.setflags(write=False)
+            self.tensors[column] = view
+
+        return np.array([lookup[name] for name in names], dtype=np.int64)
+
+    def append(self, codes: dict):
+        """
+        adds rules to empty combinations of the grid.
+
+        :param codes: dict: column -> integer array with the member id of each new rule, all columns are needed
+
+        :return: np.ndarray: flat positions of the new rules
+        """
+
+        positions = np.ravel_multi_index([np.asarray(codes[column]) for column in self.axes], self.shape)
+        positions = np.asarray(positions, dtype=np.int64).reshape(-1)
+        if len(np.unique(positions)) != len(positions) or self.has_rule(positions).any():
+            raise ValueError("each combination of input members may only have one rule")
+
+        self.assign(positions, {column: codes[column] for column in self.tensors})
+        self.count += len(positions)
+        return positions
+
+    def remove(self, positions: np.ndarray):
+        """
+        removes rules from the grid, their combinations become empty.
+
+        :param positions: np.ndarray: flat positions of the rules to remove
+
+        :return: None
+        """
+
+        positions = np.asarray(positions, dtype=np.int64)
+        self.count -= int(np.count_nonzero(self.has_rule(np.unique(positions))))
+        for buffer in self._writable().values():
+            buffer.reshape(-1)[positions] = -1
+
+    def assign(self, positions: np.ndarray, codes: dict):
+        """
+        overwrites the output member ids of rules in place.
+
+        :param positions: np.ndarray: flat positions of the rules
+        :param codes: dict: output column -> integer array with the new member id of each rule
+
+        :return: None
+        """
+
+        buffers = self._writable()
+        for column, column_codes in codes.items():
+            buffers[column].reshape(-1)[np.asarray(positions, dtype=np.int64)] = column_codes
+
+    def has_rule(self, positions: np.ndarray):
+        """
+        checks which of the given grid positions hold a rule.
+
+        :param positions: np.ndarray: flat positions within the grid
+
+        :return: np.ndarray: boolean array in the shape of positions
+        """
+
+        return next(iter(self.tensors.values())).reshape(-1)[positions] >= 0
+
+    def get_codes(self, column: str, positions: np.ndarray = None):
+        """
+        get the member ids of a column for the rules at the given positions. For an input column the member id is the
+        coordinate of the position along its axis.
+
+        :param column: str: name of the column e.g. "vel_crnt"
+        :param positions: np.ndarray: flat positions within the grid, None for all positions (default: None)
+
+        :return: np.ndarray: member id of each rule within the vocabulary of the column, -1 for positions without rule
+        """
+
+        if positions is None:
+            positions = np.arange(self.size)
+
+        if column in self.tensors:
+            return self.tensors[column].reshape(-1)[positions]
+
+        ix = self.axes.index(column)
+        return positions // self.strides[ix] % self.shape[ix]
+
+    def match(self, conditions: dict):
+        """
+        finds all rules which match the given members, same as RuleIndex.match. Within a column a rule matches if it
+        uses one of the handed over members (OR), over all columns a rule must match each column (AND). Columns which
+        are not handed over do not limit the result, a column with an empty list of members matches no rule at all.
+
+        :param conditions: dict: column name as key and a list of member ids as value e.g. {"vel_crnt": [0, 3]}
+
+        :return: np.ndarray: sorted flat positions of all matching rules
+        """
+
+        ids = [np.sort(np.asarray(conditions[column], dtype=np.int64)) if column in conditions else np.arange(n)
+               for column, n in zip(self.axes, self.shape)]
+
+        # all combinations of the member ids as flat positions, in ascending order because each axis is sorted
+        positions = np.ravel_multi_index(np.ix_(*ids), self.shape).reshape(-1)
+        return positions[self.has_rule(positions)]
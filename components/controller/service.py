@@ -0,0 +1,376 @@
+# import standard modules
+import json
+import time
+import asyncio
+import argparse
+import itertools
+
+# import third party modules
+import numpy as np
+
+# import project related modules
+from components.controller.fuzzy import FuzzyController
+
+
+class ControlService:
+    """
+    Class that serves one fitted controller to many callers. Requests wait in a queue and get collected into micro
+    batches of at most max_batch_size requests. A batch is evaluated as soon as it is full or the oldest request waited
+    max_wait seconds, with one call of run_batch. Each caller gets the reaction for its own input situation.
+
+    The service listens on a unix socket or a tcp port. Each line of a connection is one json request and gets one
+    json response, requests of one connection may be answered out of order:
+
+        {"id": 1, "inputs": {"name of parameter1": value, ...}}  ->  {"id": 1, "output": reaction}
+        {"id": 2, "command": "stats"}                             ->  {"id": 2, "stats": {...}}
+
+    Invalid requests get {"id": ..., "error": description}.
+
+    :param controller: FuzzyController: fitted controller, it is only read by the service
+    :param max_batch_size: int: max amount of requests evaluated together (default: 256)
+    :param max_wait: float: max time in seconds the first request of a batch waits for more requests (default: 0.002)
+    """
+
+    def __init__(self, controller: FuzzyController, max_batch_size: int = 256, max_wait: float = 0.002):
+        self.controller = controller                   # fitted FuzzyController
+        self.names = list(controller.feature_space)    # names of the input parameters in the order of run_batch
+        self.max_batch_size = max_batch_size           # max amount of requests evaluated together
+        self.max_wait = max_wait                       # max time the first request of a batch waits
+        self._queue = None                             # pending (values, future) of all callers
+        self._batcher = None                           # task which collects and evaluates the batches
+        self._server = None                            # asyncio server of start
+        self._connections = set()                      # tasks of the open connections
+        self.reset_stats()
+
+    async def submit(self, inputs: dict):
+        """
+        queues one input situation and waits for its batch.
+
+        :param inputs: dict: contains key name of each input parameter and an absolute value for each input parameter
+        :return: float: returns the absolute reaction value, with several output parameters a dict with the reaction
+                        value of each output parameter
+        """
+
+        if self._batcher is None:
+            self._queue = asyncio.Queue()
+            self._batcher = asyncio.create_task(self._run_batches())
+
+        # missing or invalid inputs are reported to the caller right away and do not fail the batch
+        values = [float(inputs[name]) for name in self.names]
+
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((values, future))
+        self._stats["max_queue_depth"] = max(self._stats["max_queue_depth"], self._queue.qsize())
+        return await future
+
+    async def _collect_batch(self):
+        """
+        class internal function which waits for the first request and collects more requests until the batch is full
+        or max_wait seconds passed.
+
+        :return: list: (values, future) of each request
+        """
+
+        loop = asyncio.get_running_loop()
+        batch = [await self._queue.get()]
+        deadline = loop.time() + self.max_wait
+
+        while len(batch) < self.max_batch_size:
+            while len(batch) < self.max_batch_size and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+
+            remaining = deadline - loop.time()
+            if len(batch) == self.max_batch_size or remaining <= 0:
+                break
+
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+
+        return batch
+
+    async def _run_batches(self):
+        """
+        class internal function which evaluates one batch after the other. run_batch runs in a worker thread, so the
+        event loop keeps accepting requests for the next batch in the meantime.
+
+        :return: None
+        """
+
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._collect_batch()
+            values = np.array([values for values, _ in batch], dtype=float)
+
+            start = time.perf_counter()
+            try:
+                actions = await loop.run_in_executor(None, self.controller.run_batch, values)
+            except Exception as error:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(error)
+                self._stats["errors"] += len(batch)
+                continue
+            finally:
+                self._stats["seconds"] += time.perf_counter() - start
+
+            for ix, (_, future) in enumerate(batch):
+                if future.done():
+                    continue
+                if isinstance(actions, dict):
+                    future.set_result({output: float(action[ix]) for output, action in actions.items()})
+                else:
+                    future.set_result(float(actions[ix]))
+
+            size = len(batch)
+            self._stats["requests"] += size
+            self._stats["batches"] += 1
+            self._stats["max_batch_size"] = max(self._stats["max_batch_size"], size)
+            self._stats["batch_sizes"][size] = self._stats["batch_sizes"].get(size, 0) + 1
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """
+        class internal function which answers the requests of one connection.
+
+        :param reader: asyncio.StreamReader: incoming lines of the connection
+        :param writer: asyncio.StreamWriter: outgoing lines of the connection
+        :return: None
+        """
+
+        async def answer(line: bytes):
+            request = dict()
+            try:
+                request = json.loads(line)
+                if request.get("command") == "stats":
+                    response = {"id": request.get("id"), "stats": self.stats()}
+                else:
+                    response = {"id": request.get("id"), "output": await self.submit(request["inputs"])}
+            except Exception as error:
+                response = {"id": request.get("id") if isinstance(request, dict) else None,
+                            "error": f"{type(error).__name__}: {error}"}
+
+            writer.write(json.dumps(response).encode() + b"\n")
+
+        pending = set()
+        try:
+            async for line in reader:
+                if line.strip():
+                    task = asyncio.create_task(answer(line))
+                    pending.add(task)
+                    task.add_done_callback(pending.discard)
+                    await writer.drain()
+
+            if pending:
+                await asyncio.gather(*pending)
+            await writer.drain()
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            for task in pending:
+                task.cancel()
+            writer.close()
+
+    async def _connect(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        task = asyncio.current_task()
+        self._connections.add(task)
+        try:
+            await self._handle(reader, writer)
+        finally:
+            self._connections.discard(task)
+
+    async def start(self, path: str = None, host: str = "127.0.0.1", port: int = 0):
+        """
+        starts listening for connections.
+
+        :param path: str: path of a unix socket, otherwise the service listens on host and port (default: None)
+        :param host: str: host of the tcp server (default: "127.0.0.1")
+        :param port: int: port of the tcp server, 0 picks a free port (default: 0)
+        :return: tuple or str: (host, port) of the tcp server or the path of the unix socket
+        """
+
+        if path is not None:
+            self._server = await asyncio.start_unix_server(self._connect, path=path)
+            return path
+
+        self._server = await asyncio.start_server(self._connect, host=host, port=port)
+        return self._server.sockets[0].getsockname()[:2]
+
+    async def close(self):
+        """
+        stops listening, closes all connections and fails requests which are still queued.
+
+        :return: None
+        """
+
+        if self._server is not None:
+            self._server.close()
+            for task in list(self._connections):
+                task.cancel()
+            await self._server.wait_closed()
+            self._server = None
+
+        if self._batcher is not None:
+            self._batcher.cancel()
+            try:
+                await self._batcher
+            except asyncio.CancelledError:
+                pass
+            while not self._queue.empty():
+                _, future = self._queue.get_nowait()
+                future.cancel()
+            self._batcher, self._queue = None, None
+
+    def stats(self):
+        """
+        Statistics of the service: amount of answered requests and evaluated batches, mean and max batch size, a
+        histogram of the batch sizes, the current and max amount of queued requests, the requests of failed batches
+        and the seconds spent in run_batch.
+
+        :return: dict: statistics of the service
+        """
+
+        stats = dict(self._stats)
+        stats["batch_sizes"] = dict(sorted(self._stats["batch_sizes"].items()))
+        stats["mean_batch_size"] = stats["requests"] / stats["batches"] if stats["batches"] else 0.0
+        stats["queue_depth"] = self._queue.qsize() if self._queue is not None else 0
+        return stats
+
+    def reset_stats(self):
+        """
+        resets the statistics of the service.
+
+        :return: None
+        """
+
+        self._stats = {
+            "requests": 0,
+            "batches": 0,
+            "errors": 0,
+            "max_batch_size": 0,
+            "max_queue_depth": 0,
+            "batch_sizes": dict(),
+            "seconds": 0.0
+        }
+
+
+class ControlClient:
+    """
+    Client of a ControlService, e.g. to stand in for many vehicles in tests. Requests of one client are sent over one
+    connection without waiting for the previous answers.
+    """
+
+    def __init__(self):
+        self._reader = None          # incoming lines of the connection
+        self._writer = None          # outgoing lines of the connection
+        self._pending = dict()       # id -> future of each unanswered request
+        self._ids = itertools.count()
+        self._receiver = None        # task which resolves the futures
+
+    async def connect(self, path: str = None, host: str = "127.0.0.1", port: int = None):
+        """
+        connects to a service.
+
+        :param path: str: path of the unix socket of the service, otherwise host and port are used (default: None)
+        :param host: str: host of the service (default: "127.0.0.1")
+        :param port: int: port of the service
+        :return: ControlClient: the connected client
+        """
+
+        if path is not None:
+            self._reader, self._writer = await asyncio.open_unix_connection(path)
+        else:
+            self._reader, self._writer = await asyncio.open_connection(host, port)
+
+        self._receiver = asyncio.create_task(self._receive())
+        return self
+
+    async def _receive(self):
+        """
+        class internal function which hands each response to the future of its request.
+
+        :return: None
+        """
+
+        try:
+            async for line in self._reader:
+                response = json.loads(line)
+                future = self._pending.pop(response.get("id"), None)
+                if future is None or future.done():
+                    continue
+                if "error" in response:
+                    future.set_exception(RuntimeError(response["error"]))
+                else:
+                    future.set_result(response.get("output", response.get("stats")))
+        finally:
+            for future in self._pending.values():
+                if not future.done():
+                    future.set_exception(ConnectionError("connection to the control service closed"))
+            self._pending.clear()
+
+    async def _request(self, request: dict):
+        request["id"] = next(self._ids)
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request["id"]] = future
+        self._writer.write(json.dumps(request).encode() + b"\n")
+        await self._writer.drain()
+        return await future
+
+    async def run(self, inputs: dict):
+        """
+        asks the service for the reaction to an input situation.
+
+        :param inputs: dict: contains key name of each input parameter and an absolute value for each input parameter
+        :return: float: returns the absolute reaction value, with several output parameters a dict with the reaction
+                        value of each output parameter
+        """
+
+        return await self._request({"inputs": inputs})
+
+    async def stats(self):
+        """
+        :return: dict: statistics of the service, see ControlService.stats
+        """
+
+        return await self._request({"command": "stats"})
+
+    async def close(self):
+        """
+        closes the connection.
+
+        :return: None
+        """
+
+        if self._writer is not None:
+            self._writer.close()
+            await self._receiver
+            self._reader, self._writer, self._receiver = None, None, None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="serves a compiled fuzzy controller with micro batches")
+    parser.add_argument("controller", help="path of a compiled controller (FuzzyController.save_compiled)")
+    parser.add_argument("--socket", default=None, help="path of a unix socket, otherwise tcp on host and port")
+    parser.add_argument("--host", default="127.0.0.1", help="host of the tcp server")
+    parser.add_argument("--port", type=int, default=8765, help="port of the tcp server")
+    parser.add_argument("--max-batch-size", type=int, default=256, help="max amount of requests evaluated together")
+    parser.add_argument("--max-wait", type=float, default=0.002, help="max seconds a request waits for its batch")
+    args = parser.parse_args()
+
+    async def serve():
+        service = ControlService(FuzzyController.load_compiled(args.controller), args.max_batch_size, args.max_wait)
+        address = await service.start(args.socket, args.host, args.port)
+        print(f"serving {args.controller} on {address}")
+        try:
+            await asyncio.Event().wait()
+        finally:
+            await service.close()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
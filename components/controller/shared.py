@@ -0,0 +1,119 @@
+# import standard modules
+from multiprocessing import shared_memory
+
+# import third party modules
+
+# import project related modules
+from components.controller import storage
+
+
+class SharedTables:
+    """
+    Class that owns a shared memory block with the numeric tables of a fitted controller in the layout of
+    save_compiled: members of all parameters, the compiled rule set and the centroid tables. The block is written
+    once by publish, worker processes attach to it by name and use the rule set as read only views into the block,
+    so the memory of the rule set is shared by all processes instead of copied into each one.
+
+    The owner decides about the lifetime of the block: unlink removes its name once no new worker needs to attach,
+    processes which attached before keep their mapping until they exit. Use it as context manager to close and unlink
+    the block at the end.
+
+    :param controller: FuzzyController: controller with all settings handed over
+    :param name: str: name of the block, None for a random name (default: None)
+    """
+
+    def __init__(self, controller, name: str = None):
+        header, arrays = storage.export_tables(controller)
+        prefix, size = storage.get_layout(header, arrays)
+
+        self._block = shared_memory.SharedMemory(name=name, create=True, size=max(size, 1))
+        try:
+            storage.write_into(self._block.buf, prefix, arrays)
+        except Exception:
+            self._block.close()
+            self._block.unlink()
+            raise
+
+        self.name = self._block.name   # name workers attach to
+        self.size = size               # size of the tables in bytes
+        self.unlinked = False          # True once the name of the block is removed
+
+    def close(self):
+        """
+        closes the mapping of the block in this process, the block itself stays until it gets unlinked.
+
+        :return: None
+        """
+
+        self._block.close()
+
+    def unlink(self):
+        """
+        removes the name of the block, workers can not attach anymore. The memory is freed once all processes closed
+        their mapping or exited. Calling it again does nothing.
+
+        :return: None
+        """
+
+        if not self.unlinked:
+            self._block.unlink()
+            self.unlinked = True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+        self.unlink()
+
+
+def publish(controller, name: str = None):
+    """
+    writes the numeric tables of a fitted controller into a new shared memory block.
+
+    :param controller: FuzzyController: controller with all settings handed over
+    :param name: str: name of the block, None for a random name (default: None)
+
+    :return: SharedTables: owner of the block, its name is handed to the workers
+    """
+
+    return SharedTables(controller, name=name)
+
+
+class _AttachedBlock(shared_memory.SharedMemory):
+    """
+    Shared memory block attached by a worker. The arrays of the controller are views into the block, during garbage
+    collection of a reference cycle they may be freed after the block. The mapping is then closed by the last view.
+    """
+
+    def __del__(self):
+        try:
+            self.close()
+        except BufferError:
+            pass
+
+
+def attach(cls, name: str):
+    """
+    creates a controller from a shared memory block written by publish. The arrays of the rule set are read only views
+    into the block, nothing of it gets copied. The controller keeps the block open as long as it exists, the owner of
+    the block stays responsible for unlinking it.
+
+    Since python 3.13 the block is attached without the resource tracker. Before, attaching registers the block with
+    the resource tracker of this process like creating it, so a process with its own resource tracker (not started by
+    the owner) unlinks the block when it exits - attach from workers of the owner there.
+
+    :param cls: type: FuzzyController or a sub class
+    :param name: str: name of the block
+
+    :return: FuzzyController: controller with all settings, rules stays None
+    """
+
+    try:
+        block = _AttachedBlock(name=name, track=False)
+    except TypeError:
+        block = _AttachedBlock(name=name)
+
+    controller = storage.restore_tables(cls, *storage.read_tables(block.buf))
+    controller._shared_block = block
+    return controller
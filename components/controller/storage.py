@@ -0,0 +1,227 @@
+# import standard modules
+import json
+import mmap
+import struct
+
+# import third party modules
+import numpy as np
+
+# import project related modules
+from components.controller.membership import Membership
+from components.controller.rules import RuleIndex, RuleTensor
+
+
+# layout of a compiled controller: magic bytes, length of the json header, json header and all arrays, each array
+# starts at a multiple of ALIGNMENT bytes after the end of the header
+MAGIC = b"FUZZYCTL"
+VERSION = 1
+ALIGNMENT = 64
+_PREFIX = struct.Struct("<8sQ")
+
+
+def _align(offset: int):
+    """
+    rounds an offset up to the next multiple of ALIGNMENT.
+
+    :param offset: int: offset in bytes
+
+    :return: int: aligned offset
+    """
+
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+def export_tables(controller):
+    """
+    collects the numeric tables of a fitted controller: the members of all input and output parameters, the compiled
+    rule set, the centroid tables of the defuzzification and the inference mode. Lookup tables, caches and statistics
+    are not part of it.
+
+    :param controller: FuzzyController: controller with all settings handed over
+
+    :return: tuple: (header, arrays) - json serializable dict which describes the controller and dict of all arrays
+                    by name
+    """
+
+    header = {"version": VERSION, "inputs": list(), "outputs": list(),
+              "inference": {"mode": controller.mode, "crisp": controller.crisp, "normalize": controller.normalize}}
+    arrays = dict()
+
+    for kind, parameters in (("inputs", controller.feature_space), ("outputs", controller.outputs)):
+        for name, membership in parameters.items():
+            meta, tables = membership.get_tables()
+            header[kind].append(meta)
+            arrays.update({f"{kind}/{name}/{key}": array for key, array in tables.items()})
+
+    for name, table in controller._centroid_tables.items():
+        arrays.update({f"centroids/{name}/{key}": array for key, array in table.items()})
+
+    header["rules"], tables = controller.rule_index.get_tables()
+    arrays.update({f"rules/{key}": array for key, array in tables.items()})
+    return header, arrays
+
+
+def restore_tables(cls, header: dict, arrays: dict):
+    """
+    creates a controller from the output of export_tables. The arrays of the rule set are used as they are, e.g.
+    memory mapped or in shared memory, so they are not copied.
+
+    :param cls: type: FuzzyController or a sub class
+    :param header: dict: description of the controller
+    :param arrays: dict: all arrays by name
+
+    :return: FuzzyController: controller with all settings, rules stays None
+    """
+
+    def members(kind: str):
+        parameters = dict()
+        for meta in header[kind]:
+            membership = Membership()
+            prefix = f"{kind}/{meta['name']}/"
+            membership.set_tables(meta, {key[len(prefix):]: a for key, a in arrays.items() if key.startswith(prefix)})
+            parameters[meta["name"]] = membership
+        return parameters
+
+    index = RuleIndex() if header["rules"]["kind"] == "index" else RuleTensor()
+    index.set_tables(header["rules"], {key[len("rules/"):]: a for key, a in arrays.items() if key.startswith("rules/")})
+
+    controller = cls()
+    controller.feature_space = members("inputs")
+    controller.outputs = members("outputs")
+    controller.output = next(iter(controller.outputs.values()), None)
+    controller._centroid_tables = {
+        name: {key: arrays[f"centroids/{name}/{key}"] for key in ("lower", "rise", "upper", "fall", "shoulder")}
+        for name in controller.outputs
+    }
+    controller.rule_index = index
+    inference = header.get("inference", {})
+    controller.mode = inference.get("mode", "mamdani")
+    controller.crisp = inference.get("crisp", "centroid")
+    controller.normalize = inference.get("normalize", True)
+    controller._compile()
+    return controller
+
+
+def get_layout(header: dict, arrays: dict):
+    """
+    places all arrays behind the header. The offsets of the arrays are stored in the header.
+
+    :param header: dict: description of the controller
+    :param arrays: dict: all arrays by name
+
+    :return: tuple: (prefix, size) - bytes of magic, header length and header and total size in bytes
+    """
+
+    offset, layout = 0, dict()
+    for key, array in arrays.items():
+        layout[key] = {"offset": offset, "dtype": array.dtype.str, "shape": list(array.shape)}
+        offset = _align(offset + array.nbytes)
+
+    content = json.dumps(dict(header, arrays=layout)).encode()
+    prefix = _PREFIX.pack(MAGIC, len(content)) + content
+    return prefix, _align(len(prefix)) + offset
+
+
+def write_into(buffer, prefix: bytes, arrays: dict):
+    """
+    writes header and arrays in the layout of get_layout into a writable buffer, e.g. a shared memory block.
+
+    :param buffer: memoryview: writable buffer of at least the size returned by get_layout
+    :param prefix: bytes: prefix returned by get_layout
+    :param arrays: dict: all arrays by name in the same order as handed over to get_layout
+
+    :return: None
+    """
+
+    buffer[:len(prefix)] = prefix
+    header, start = read_header(buffer)
+    for key, entry in header["arrays"].items():
+        array = np.ascontiguousarray(arrays[key])
+        target = np.frombuffer(buffer, dtype=array.dtype, count=array.size, offset=start + entry["offset"])
+        target[:] = array.reshape(-1)
+
+
+def read_header(buffer):
+    """
+    reads the json header of a compiled controller.
+
+    :param buffer: buffer: e.g. memory map or shared memory block
+
+    :return: tuple: (header, start) - description of the controller including the layout of the arrays and the
+                    offset of the first array in bytes
+    """
+
+    magic, length = _PREFIX.unpack_from(buffer, 0)
+    if magic != MAGIC:
+        raise ValueError("the buffer does not hold a compiled controller")
+
+    header = json.loads(bytes(buffer[_PREFIX.size:_PREFIX.size + length]))
+    if header["version"] != VERSION:
+        raise ValueError(f"version {header['version']} of the compiled controller is not supported")
+    return header, _align(_PREFIX.size + length)
+
+
+def read_tables(buffer):
+    """
+    reads header and arrays of a compiled controller. The arrays are read only views into the buffer.
+
+    :param buffer: buffer: e.g. memory map or shared memory block
+
+    :return: tuple: (header, arrays) - description of the controller and dict of all arrays by name
+    """
+
+    header, start = read_header(buffer)
+
+    arrays = dict()
+    for key, entry in header.pop("arrays").items():
+        dtype = np.dtype(entry["dtype"])
+        count = int(np.prod(entry["shape"]))
+        array = np.frombuffer(buffer, dtype=dtype, count=count, offset=start + entry["offset"])
+        array = array.reshape(entry["shape"])
+        array.setflags(write=False)
+        arrays[key] = array
+
+    return header, arrays
+
+
+def save(controller, path: str):
+    """
+    stores the numeric tables of a fitted controller in one binary file.
+
+    :param controller: FuzzyController: controller with all settings handed over
+    :param path: str: path of the file
+
+    :return: None
+    """
+
+    header, arrays = export_tables(controller)
+    prefix, _ = get_layout(header, arrays)
+
+    # arrays are written one after the other without copying them into one buffer first
+    with open(path, "wb") as file:
+        file.write(prefix)
+        header, start = read_header(prefix)
+        position = len(prefix)
+        for key, entry in header["arrays"].items():
+            file.write(bytes(start + entry["offset"] - position))
+            data = np.ascontiguousarray(arrays[key])
+            if data.nbytes:
+                file.write(memoryview(data).cast("B"))
+            position = start + entry["offset"] + data.nbytes
+
+
+def load(cls, path: str):
+    """
+    creates a controller from a file written by save. The file gets memory mapped, the arrays of the rule set are read
+    only views into the mapping, so processes loading the same file share its pages.
+
+    :param cls: type: FuzzyController or a sub class
+    :param path: str: path of the file
+
+    :return: FuzzyController: controller with all settings, rules stays None
+    """
+
+    with open(path, "rb") as file:
+        buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    return restore_tables(cls, *read_tables(buffer))
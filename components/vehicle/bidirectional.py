@@ -1,10 +1,11 @@
 # import standard modules
 
 # import third party modules
-from scipy.interpolate import interp1d
 
 # import project related modules
 from components.controller.fuzzy import FuzzyController
+from components.vehicle.timeline import RouteTimeline
+from components.vehicle.telemetry import History, TelemetrySink
 
 
 class SimpleCar:
@@ -17,21 +18,27 @@ class SimpleCar:
     :param controller: FuzzyController: a predefined controller which does contain (target_distance, accel_crnt,
                                         vel_crnt, and acceleration. (default: None).
     :param adoption_rate: float: rate of adopting the fuzzy controllers recommendation (default 1.0)
+    :param verbose: bool: print a status line in the console on each update (default True)
+    :param sink: TelemetrySink: receives the adjustment and the values of the car on each update, e.g. to write long
+                                runs to a file in chunks (default: None)
+    :param keep_history: bool: record the values of each second in the history, without it the memory of a long run
+                               stays constant (default True)
     """
 
-    def __init__(self, controller: FuzzyController = None, adoption_rate: float = 1.0):
+    def __init__(self, controller: FuzzyController = None, adoption_rate: float = 1.0, verbose: bool = True,
+                 sink: TelemetrySink = None, keep_history: bool = True):
         self.route = None                                  # list of tuples which define milestones of velocity and time
         self.adoption_rate = adoption_rate                 # sensitivity of fuzzy controller adoption
-        self.route_request = dict()                        # placeholder - will hold value for a pre calculated route
+        self.timeline = None                               # placeholder - will hold the pre calculated route
         self.distance_controller = controller              # FuzzyController from the input parameters
         self.velocity = 0                                  # current velocity of the car
         self.distance = 0                                  # current distance driven by the car
         self.acceleration = 0                              # current acceleration of the car
-        self.history = {                                   # values for vel, acc, distance at a given second (index)
-            "velocity": [0],
-            "acceleration": [0],
-            "distance": [0]
-        }
+        self.verbose = verbose                             # print a status line on each update
+        self.sink = sink                                   # optional TelemetrySink for the values of each update
+        self.keep_history = keep_history                   # record the values of each second in the history
+        self.history = History()                           # values for vel, acc, distance at a given second (index)
+        self.history.append(0, 0, 0)
 
     @staticmethod
     def _calculate_acceleration(velocity: float, prev_velocity: float, seconds: int):
@@ -101,53 +108,20 @@ class SimpleCar:
         # overwrite route with copy and additional absolute second count
         self.route = route
 
-        # collect second, velocity, acceleration and distance for each milestone within the route
-        sec = [s[2] for s in self.route]
-        vel = [v[0] for v in self.route]
-
-        # set a quick helper function to calculate distance
-        dis_calculation = lambda vel, acc, sec: abs((vel*sec) + 1/2*acc*(sec**2))
-
-        # calculate acceleration and distance for the milestones in order to make the values
-        # available for a interpolation function
-        distance = 0
-        prev_velo = 0
-        dis = list()
-        acc = list()
-
-        # pre calculate the values (distance, acceleration) for each milestone
-        for pair in self.route:
-
-            velo = pair[0]
-            seconds = pair[1]
-
-            const_acc = self._calculate_acceleration(velo, prev_velo, seconds)
-            d = dis_calculation(velo, const_acc, seconds)
-            prev_velo = velo
-            distance += d
-            acc.append(const_acc)
-            dis.append(distance)
-
-        # set interpolation functions for each attribute in order to request a specific second later on
-        self.route_request["velocity"] = interp1d(sec, vel)
-        self.route_request["acceleration"] = interp1d(sec, acc)
-        self.route_request["distance"] = interp1d(sec, dis)
+        # compile the milestones into segments of constant acceleration, which can be requested at any second
+        self.timeline = RouteTimeline([(v, s) for v, s, _ in self.route[1:]])
 
     def get_second(self, second: int):
         """
-        function takes a second and returns the interpolation value for velocity, acceleration and distance
-        from a given route handed over previously. Make sure the second is within the handed over route timeline.
+        function takes a second and returns the value for velocity, acceleration and distance from a given route
+        handed over previously. Make sure the second is within the handed over route timeline. A whole array of
+        seconds can be requested at once, seconds do not need to be integers.
 
-        :param second: int: defines a second.
+        :param second: int or array like: defines a second.
         :return: tuple: velocity, acceleration and distance at second
         """
 
-        # request interpolation function for each value and hand over the x value (second) in order to get the y value
-        vel = self.route_request["velocity"](second)
-        acc = self.route_request["acceleration"](second)
-        dis = self.route_request["distance"](second)
-
-        return vel, acc, dis
+        return self.timeline.get(second)
 
     def set_route(self, route: list = None):
         """
@@ -211,11 +185,20 @@ class SimpleCar:
         else:
             self.velocity += self.acceleration
 
-        # print a status update in the console and add the current values also to the history
-        print(f"adjustment: {adjustment} velocity: {self.velocity} acceleration: {self.acceleration} distance: {self.distance}, lead_distance: {distance_to_leading_car}")
-        self.history["velocity"].append(self.velocity)
-        self.history["acceleration"].append(self.acceleration)
-        self.history["distance"].append(self.distance)
+        # optionally print a status update in the console and add the current values also to the history
+        if self.verbose:
+            print(f"adjustment: {adjustment} velocity: {self.velocity} acceleration: {self.acceleration} "
+                  f"distance: {self.distance}, lead_distance: {distance_to_leading_car}")
+        if self.keep_history:
+            self.history.append(self.velocity, self.acceleration, self.distance)
+        if self.sink is not None:
+            self.sink.write({
+                "adjustment": adjustment,
+                "velocity": self.velocity,
+                "acceleration": self.acceleration,
+                "distance": self.distance,
+                "lead_distance": distance_to_leading_car
+            })
 
 
 
@@ -0,0 +1,120 @@
+# import standard modules
+
+# import third party modules
+import numpy as np
+
+# import project related modules
+from components.controller.fuzzy import FuzzyController
+
+
+class Platoon:
+    """
+    The class is a column of following cars which all use the same fuzzy controller. The first car follows a leading
+    car, each other car follows the car in front of it. The state of all cars (velocity, acceleration and driven
+    distance) is kept in arrays and all cars are updated together each second with one batch call of the controller.
+    The physics are the same as in SimpleCar.update: the acceleration is capped at +-2 m/s² and a car never reverses.
+
+    :param controller: FuzzyController: a predefined controller which does contain (target_distance, accel_crnt,
+                                        vel_crnt, and acceleration.
+    :param size: int: amount of following cars
+    :param adoption_rate: float or array like: rate of adopting the fuzzy controllers recommendation, one value for
+                                               all cars or one per car (default 1.0)
+    :param spacing: float: distance between two cars at the start, the first car starts this distance behind the
+                           leading car (default 0.0)
+    :param output: str: name of the output parameter used as adjustment by a controller with several outputs
+                        (default "acceleration")
+    """
+
+    def __init__(self, controller: FuzzyController, size: int, adoption_rate=1.0, spacing: float = 0.0,
+                 output: str = "acceleration"):
+        self.distance_controller = controller                            # FuzzyController shared by all cars
+        self.size = size                                                 # amount of following cars
+        self.adoption_rate = np.broadcast_to(np.asarray(adoption_rate, dtype=float), (size, )).copy()
+        self.output = output                                             # output parameter used as adjustment
+        self.velocity = np.zeros(size)                                   # current velocity of each car
+        self.acceleration = np.zeros(size)                               # current acceleration of each car
+        self.distance = -spacing * np.arange(1, size + 1, dtype=float)   # current distance driven by each car
+        self.second = 0                                                  # amount of updates so far
+        self.min_gap = np.full(size, np.inf)                             # smallest gap of each car after the start
+        self.crash_second = np.full(size, -1)                            # first second with a gap <= 0, -1 without
+
+    def get_gaps(self, lead_distance: float):
+        """
+        distance of each car to the car in front of it, the first car measures the distance to the leading car.
+
+        :param lead_distance: float: distance driven by the leading car
+        :return: np.ndarray: one gap per car
+        """
+
+        return np.concatenate([[lead_distance], self.distance[:-1]]) - self.distance
+
+    def update(self, lead_distance: float):
+        """
+        updates all cars by one second. The gaps are measured before any car moves, so each car reacts to the
+        position of the car in front of it at the same second.
+
+        :param lead_distance: float: distance driven by the leading car at the current second
+        :return: np.ndarray: gaps the cars reacted to
+        """
+
+        gap = self.get_gaps(lead_distance)
+
+        # track the metrics of each car, both cars of the experiment start at the same position so the first second
+        # does not count
+        if self.second > 0:
+            np.minimum(self.min_gap, gap, out=self.min_gap)
+            self.crash_second[(gap <= 0) & (self.crash_second < 0)] = self.second
+
+        # run the fuzzy controller for all cars at once, the columns follow the order of the controller inputs
+        current = {
+            "target_distance": gap,
+            "accel_crnt": self.acceleration,
+            "vel_crnt": self.velocity
+        }
+        adjustment = self.distance_controller.run_batch(
+            np.stack([current[name] for name in self.distance_controller.feature_space], axis=-1))
+        if isinstance(adjustment, dict):
+            adjustment = adjustment[self.output]
+
+        # apply the recommended adjustment with the adoption rate of each car and cap the acceleration
+        self.acceleration = np.clip(self.acceleration + self.adoption_rate * adjustment, -2, 2)
+
+        # update the distance of each car, the second is 1 because the update runs each second
+        self.distance = self.distance + np.abs(self.velocity + 1 / 2 * self.acceleration)
+
+        # since the cars can only travel forward the velocity cannot be negative. Therefore make the velocity zero
+        reverse = self.velocity < 0
+        self.velocity = np.where(reverse, 0, self.velocity + self.acceleration)
+        self.acceleration = np.where(reverse, 0, self.acceleration)
+
+        self.second += 1
+        return gap
+
+    def run(self, lead: np.ndarray, record: bool = True):
+        """
+        updates all cars once for each second of the leading car.
+
+        :param lead: np.ndarray: distance driven by the leading car at each second, e.g. from
+                                 experiment.follow.lead_distances
+        :param record: bool: keep the state of all cars at each second, otherwise only the metrics (default True)
+        :return: dict: arrays "velocity", "acceleration", "distance" and "gap" (seconds x cars) with the state each car
+                       reacted to in a second, only with record - and "min_gap" and "crash_second" per car
+        """
+
+        result = dict()
+        if record:
+            for key in ("velocity", "acceleration", "distance", "gap"):
+                result[key] = np.zeros((len(lead), self.size))
+
+        for s, lead_distance in enumerate(lead):
+            if record:
+                result["velocity"][s] = self.velocity
+                result["acceleration"][s] = self.acceleration
+                result["distance"][s] = self.distance
+                result["gap"][s] = self.update(lead_distance)
+            else:
+                self.update(lead_distance)
+
+        result["min_gap"] = self.min_gap.copy()
+        result["crash_second"] = self.crash_second.copy()
+        return result
@@ -0,0 +1,176 @@
+# import standard modules
+import os
+import csv
+import shutil
+import tempfile
+
+# import third party modules - pyarrow is only imported by sinks which write parquet files
+import numpy as np
+
+# import project related modules
+
+
+class History:
+    """
+    The class holds the values of a car at each second in preallocated numpy arrays. Once the arrays are full they get
+    twice as large, so appending a second does not allocate memory in most cases. history["velocity"] returns a view
+    of the seconds recorded so far, a view taken before the arrays grew does not see later seconds.
+
+    :param fields: tuple: names of the recorded values (default: ("velocity", "acceleration", "distance"))
+    :param capacity: int: amount of seconds the arrays can hold before they grow the first time (default: 64)
+    """
+
+    def __init__(self, fields: tuple = ("velocity", "acceleration", "distance"), capacity: int = 64):
+        self.fields = tuple(fields)                               # names of the recorded values
+        self.size = 0                                             # amount of recorded seconds
+        self.values = np.zeros((len(self.fields), max(capacity, 1)))  # one row per value, one column per second
+
+    def append(self, *values: float):
+        """
+        records the values of one second in the order of the fields.
+
+        :param values: float: one value per field
+        :return: None
+        """
+
+        if self.size == self.values.shape[1]:
+            grown = np.zeros((len(self.fields), 2 * self.size))
+            grown[:, :self.size] = self.values
+            self.values = grown
+
+        self.values[:, self.size] = values
+        self.size += 1
+
+    def clear(self):
+        """
+        removes all recorded seconds, the arrays keep their size.
+
+        :return: None
+        """
+
+        self.size = 0
+
+    def keys(self):
+        return self.fields
+
+    def items(self):
+        return [(field, self[field]) for field in self.fields]
+
+    def __getitem__(self, field: str):
+        return self.values[self.fields.index(field), :self.size]
+
+    def __len__(self):
+        return self.size
+
+
+class TelemetrySink:
+    """
+    The class collects records with the same fields (e.g. the values of a car at each second) in chunks and writes
+    each full chunk to a file, so only one chunk is held in memory. The format follows the extension of the path:
+
+    - .csv: one row per record with a header line
+    - .parquet: one row group per chunk, requires pyarrow
+    - .npz: one array per field, the chunks are kept in temporary files until the sink gets closed
+
+    The fields are taken from the first record. Use the sink as context manager or call close at the end, otherwise
+    the last chunk is not written.
+
+    :param path: str: path of the file
+    :param chunk_size: int: amount of records written at once (default: 4096)
+    """
+
+    def __init__(self, path: str, chunk_size: int = 4096):
+        self.format = os.path.splitext(path)[1].lower().lstrip(".")
+        assert self.format in ("csv", "parquet", "npz"), "path must end with .csv, .parquet or .npz"
+
+        self.path = path                                          # path of the written file
+        self.chunk_size = chunk_size                              # amount of records written at once
+        self.fields = None                                        # names of the fields, set by the first record
+        self.chunk = None                                         # one row per field, one column per record
+        self.size = 0                                             # amount of records in the current chunk
+        self.count = 0                                            # amount of records written so far
+        self._writer = None                                       # open file, csv or parquet writer
+        self._file = None
+        self._directory = None                                    # temporary chunks of a npz file
+
+    def write(self, record: dict):
+        """
+        adds one record to the current chunk and writes the chunk once it is full.
+
+        :param record: dict: field name -> number
+        :return: None
+        """
+
+        if self.fields is None:
+            self.fields = tuple(record)
+            self.chunk = np.zeros((len(self.fields), self.chunk_size))
+
+        self.chunk[:, self.size] = [record[field] for field in self.fields]
+        self.size += 1
+        if self.size == self.chunk_size:
+            self.flush()
+
+    def flush(self):
+        """
+        writes the records of the current chunk to the file.
+
+        :return: None
+        """
+
+        if not self.size:
+            return
+
+        chunk = self.chunk[:, :self.size]
+        if self.format == "csv":
+            if self._writer is None:
+                self._file = open(self.path, "w", newline="")
+                self._writer = csv.writer(self._file)
+                self._writer.writerow(self.fields)
+            self._writer.writerows(chunk.T.tolist())
+
+        elif self.format == "parquet":
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            table = pa.table({field: chunk[ix] for ix, field in enumerate(self.fields)})
+            if self._writer is None:
+                self._writer = pq.ParquetWriter(self.path, table.schema)
+            self._writer.write_table(table)
+
+        else:
+            # a npz file can not be appended, so the chunks of each field are collected in a raw file first
+            if self._directory is None:
+                self._directory = tempfile.mkdtemp(prefix="telemetry-")
+            for ix, field in enumerate(self.fields):
+                with open(os.path.join(self._directory, f"{ix}.bin"), "ab") as file:
+                    file.write(np.ascontiguousarray(chunk[ix]).tobytes())
+
+        self.count += self.size
+        self.size = 0
+
+    def close(self):
+        """
+        writes the last chunk and closes the file.
+
+        :return: None
+        """
+
+        self.flush()
+        if self.format == "csv" and self._file is not None:
+            self._file.close()
+        elif self.format == "parquet" and self._writer is not None:
+            self._writer.close()
+        elif self.format == "npz" and self._directory is not None:
+            # the collected chunks are memory mapped, so the arrays do not have to fit into memory at once
+            arrays = {field: np.memmap(os.path.join(self._directory, f"{ix}.bin"), dtype=float, mode="r")
+                      for ix, field in enumerate(self.fields)}
+            np.savez(self.path, **arrays)
+            del arrays
+            shutil.rmtree(self._directory)
+        self._writer, self._file, self._directory = None, None, None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
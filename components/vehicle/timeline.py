@@ -0,0 +1,68 @@
+# import standard modules
+
+# import third party modules
+import numpy as np
+
+# import project related modules
+
+
+class RouteTimeline:
+    """
+    The class compiles the milestones of a route into segments of constant acceleration. Within each segment the car
+    changes its velocity linearly from the velocity of the previous milestone to the velocity of the milestone, so
+    velocity, acceleration and the driven distance are known exactly at any point in time. All values for a whole
+    array of times are evaluated at once.
+
+    A milestone with a duration of 0 seconds changes the velocity instantly.
+
+    :param route: list: of tuples [(meter per seconds, amount of seconds to hold desired velocity), ..]
+    """
+
+    def __init__(self, route: list):
+        starts, velocities, accelerations = list(), list(), list()
+        second, velocity = 0, 0
+
+        for v, s in route:
+            if s > 0:
+                starts.append(second)
+                velocities.append(velocity)
+                accelerations.append((v - velocity) / s)
+            second += s
+            velocity = v
+
+        self.start = np.array(starts, dtype=float)                  # start of each segment in seconds
+        self.velocity = np.array(velocities, dtype=float)           # velocity at the start of each segment
+        self.acceleration = np.array(accelerations, dtype=float)    # constant acceleration within each segment
+        self.end = np.append(self.start[1:], second)                # end of each segment in seconds
+        self.duration = float(second)                               # end of the route in seconds
+        self.final_velocity = float(velocity)                       # velocity after the last milestone
+
+        # distance driven until the start of each segment
+        length = self.end - self.start
+        driven = self.velocity * length + 1 / 2 * self.acceleration * length ** 2
+        self.distance = np.concatenate([[0], np.cumsum(driven)[:-1]])
+
+    def get(self, seconds):
+        """
+        evaluates velocity, acceleration and driven distance of the route. At the end of a segment the acceleration of
+        this segment is returned. Make sure the seconds are within the route timeline.
+
+        :param seconds: float or array like: points in time in seconds
+        :return: tuple: velocity, acceleration and distance - arrays in the shape of seconds
+        """
+
+        seconds = np.asarray(seconds, dtype=float)
+        if np.any(seconds < 0) or np.any(seconds > self.duration):
+            raise ValueError(f"seconds must be within the route timeline of 0 to {self.duration} seconds")
+
+        if not len(self.start):
+            zeros = np.zeros(seconds.shape)
+            return np.full(seconds.shape, self.final_velocity), zeros, zeros
+
+        segment = np.minimum(np.searchsorted(self.end, seconds, side="left"), len(self.start) - 1)
+        t = seconds - self.start[segment]
+        acceleration = self.acceleration[segment]
+
+        velocity = self.velocity[segment] + acceleration * t
+        distance = self.distance[segment] + self.velocity[segment] * t + 1 / 2 * acceleration * t ** 2
+        return velocity, acceleration, distance
@@ -0,0 +1,84 @@
+# import standard modules
+import os
+
+# import third party modules
+import numpy as np
+
+# import project related modules
+from experiment.intervals import accel, settings
+from components.vehicle.bidirectional import SimpleCar
+from components.controller.fuzzy import FuzzyController
+
+
+# rule set of the experiment, next to this file
+RULES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "test_rules.csv")
+
+# milestones of the leading car (meter per seconds, amount of seconds to hold desired velocity) - same as in
+# simple_car_travel.py
+ROUTE = [
+    (8.78, 5), (12.667, 3), (12.667, 4), (17.333, 6), (16.84, 3), (12.222, 2), (6, 5), (0, 5),
+    (5.18, 2), (12.23, 3), (16.667, 2), (18.313, 3), (23.333, 2), (26.212, 2), (15, 5), (7, 3), (0, 4)
+]
+
+
+def build_controller(rules: str = RULES):
+    """
+    creates the distance controller of the experiment with the settings from intervals.py.
+
+    :param rules: str: path of the semicolon separated rule set (default: test_rules.csv of the experiment)
+
+    :return: FuzzyController: controller with inputs, rule set and output handed over
+    """
+    import pandas as pd
+
+    fc = FuzzyController()
+    fc.set_inputs(settings)
+    fc.set_ruleset(pd.read_csv(rules, sep=";"))
+    fc.set_output(accel, "acceleration")
+    return fc
+
+
+def lead_distances(route: list = None, seconds: int = 60):
+    """
+    drives the route with a leading car and collects its distance at each second.
+
+    :param route: list: milestones of the leading car (default: ROUTE)
+    :param seconds: int: duration of the experiment, must be covered by the route (default: 60)
+
+    :return: np.ndarray: distance of the leading car, one value per second
+    """
+
+    leading = SimpleCar()
+    leading.set_route(route=list(route or ROUTE))
+    return leading.get_second(np.arange(seconds))[2]
+
+
+def follow(controller: FuzzyController, route: list = None, adoption_rate: float = 0.6, seconds: int = 60,
+           lead: np.ndarray = None):
+    """
+    headless version of the experiment in simple_car_travel.py. A leading car drives the route and a following car
+    uses the controller to keep its distance. Nothing gets printed or plotted.
+
+    :param controller: FuzzyController: controller of the following car
+    :param route: list: milestones of the leading car (default: ROUTE)
+    :param adoption_rate: float: rate of adopting the fuzzy controllers recommendation (default: 0.6)
+    :param seconds: int: duration of the experiment, must be covered by the route (default: 60)
+    :param lead: np.ndarray: distance of the leading car per second from lead_distances, replaces the route in case
+                             the same route is driven many times (default: None)
+
+    :return: dict: arrays "velocity", "acceleration", "distance" of the following car and "gap" between the cars,
+                   one value per second
+    """
+
+    if lead is None:
+        lead = lead_distances(route, seconds)
+    following = SimpleCar(controller=controller, adoption_rate=adoption_rate, verbose=False)
+
+    gap = np.zeros(seconds)
+    for s in range(seconds):
+        gap[s] = lead[s] - following.distance
+        following.update(gap[s])
+
+    result = {key: np.array(values[:seconds], dtype=float) for key, values in following.history.items()}
+    result["gap"] = gap
+    return result
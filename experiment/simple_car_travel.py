@@ -104,7 +104,7 @@ run = 60
 
 # show velocity at a given second for both cars
 time = [s for s in range(0, run)]
-plt.plot(time, [c.get_second(i)[0] for i in range(0, run)], label="leading car")
+plt.plot(time, c.get_second(np.arange(run))[0], label="leading car")
 plt.plot(time, cf.history["velocity"][:run], label="following car")
 plt.plot()
 plt.title("Velocity chart")
@@ -115,7 +115,7 @@ plt.legend()
 
 # show acceleration at a given second for both cars
 plt.subplot(4, 1, 2)
-plt.plot(time, [c.get_second(i)[1] for i in range(0, run)], label="leading car")
+plt.plot(time, c.get_second(np.arange(run))[1], label="leading car")
 plt.plot(time, cf.history["acceleration"][:run], label="following car")
 plt.title("acceleration chart")
 plt.xlabel("second")
@@ -124,7 +124,7 @@ plt.legend()
 
 # show archived distance at a given second for both cars
 plt.subplot(4, 1, 3)
-plt.plot(time, [c.get_second(i)[2] for i in range(0, run)], label="leading car")
+plt.plot(time, c.get_second(np.arange(run))[2], label="leading car")
 plt.plot(time, cf.history["distance"][:run], label="following car")
 plt.title("distance chart")
 plt.xlabel("second")
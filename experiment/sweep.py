@@ -0,0 +1,146 @@
+# import standard modules
+import os
+import time
+import argparse
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+
+# import third party modules
+import numpy as np
+
+# import project related modules
+from experiment.follow import ROUTE, build_controller, follow, lead_distances
+from components.controller.fuzzy import FuzzyController
+
+
+# state of a worker process: controllers and distances of the leading car by name, created once per process
+_worker = dict()
+
+
+def _build(controller):
+    """
+    creates a controller from its description.
+
+    :param controller: str or callable: path of a file written by FuzzyController.save_compiled or a function without
+                                        arguments which returns a fitted controller (must be picklable, e.g. defined on
+                                        module level)
+
+    :return: FuzzyController: fitted controller
+    """
+
+    if isinstance(controller, str):
+        return FuzzyController.load_compiled(controller)
+    return controller()
+
+
+def _init_worker(routes: dict, controllers: dict, seconds: int):
+    """
+    builds all controllers and drives all routes once per worker process, the scenarios only refer to them by name.
+
+    :param routes: dict: name -> milestones of the leading car
+    :param controllers: dict: name -> description of the controller, see _build
+    :param seconds: int: duration of each scenario
+
+    :return: None
+    """
+
+    _worker["controllers"] = {name: _build(controller) for name, controller in controllers.items()}
+    _worker["lead"] = {name: lead_distances(route, seconds) for name, route in routes.items()}
+    _worker["seconds"] = seconds
+
+
+def _run_scenario(scenario: tuple):
+    """
+    runs one scenario in a worker process.
+
+    :param scenario: tuple: (route name, controller name, adoption rate)
+
+    :return: np.ndarray: 4 x seconds array with velocity, acceleration and distance of the following car and the gap
+    """
+
+    route, controller, adoption_rate = scenario
+    result = follow(_worker["controllers"][controller], adoption_rate=adoption_rate, seconds=_worker["seconds"],
+                    lead=_worker["lead"][route])
+    return np.stack([result[key] for key in ("velocity", "acceleration", "distance", "gap")])
+
+
+def sweep(routes: dict = None, adoption_rates: list = (0.6, ), controllers: dict = None, seconds: int = 60,
+          processes: int = None, chunksize: int = 8):
+    """
+    runs the headless car following experiment for each combination of route, controller and adoption rate across a
+    pool of processes. Each process builds the controllers and drives the leading cars only once.
+
+    :param routes: dict: name -> milestones of the leading car (default: {"experiment": ROUTE})
+    :param adoption_rates: list: rates of adopting the fuzzy controllers recommendation (default: (0.6, ))
+    :param controllers: dict: name -> path of a compiled controller (FuzzyController.save_compiled) or a picklable
+                              function without arguments returning a fitted controller
+                              (default: {"experiment": build_controller})
+    :param seconds: int: duration of each scenario, must be covered by all routes (default: 60)
+    :param processes: int: amount of worker processes, 1 runs all scenarios in this process (default: None - one per
+                           cpu)
+    :param chunksize: int: amount of scenarios handed over to a worker at once (default: 8)
+
+    :return: dict: columnar results with one row per scenario - "route", "controller", "adoption_rate",
+                   "velocity", "acceleration", "distance" and "gap" (scenarios x seconds), "min_gap" and
+                   "crash_second" (first second with a gap <= 0, -1 without crash). Both cars start at the same
+                   position, so second 0 is not part of the metrics.
+    """
+
+    routes = routes or {"experiment": ROUTE}
+    controllers = controllers or {"experiment": build_controller}
+    scenarios = list(itertools.product(routes, controllers, adoption_rates))
+
+    if processes == 1:
+        _init_worker(routes, controllers, seconds)
+        results = [_run_scenario(scenario) for scenario in scenarios]
+    else:
+        with ProcessPoolExecutor(max_workers=processes, initializer=_init_worker,
+                                 initargs=(routes, controllers, seconds)) as pool:
+            results = list(pool.map(_run_scenario, scenarios, chunksize=chunksize))
+
+    values = np.stack(results) if results else np.zeros((0, 4, seconds))
+    gap = values[:, 3, 1:]
+    crashed = gap <= 0
+
+    return {
+        "route": np.array([scenario[0] for scenario in scenarios], dtype=str),
+        "controller": np.array([scenario[1] for scenario in scenarios], dtype=str),
+        "adoption_rate": np.array([scenario[2] for scenario in scenarios], dtype=float),
+        "velocity": values[:, 0],
+        "acceleration": values[:, 1],
+        "distance": values[:, 2],
+        "gap": values[:, 3],
+        "min_gap": gap.min(axis=1) if gap.shape[1] else np.zeros(len(scenarios)),
+        "crash_second": np.where(crashed.any(axis=1), crashed.argmax(axis=1) + 1, -1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="sweep of the car following experiment over adoption rates")
+    parser.add_argument("--adoption-rates", type=float, nargs="+", default=list(np.round(np.arange(0.1, 1.01, 0.1), 2)),
+                        help="rates of adopting the fuzzy controllers recommendation")
+    parser.add_argument("--controller", action="append", default=None,
+                        help="path of a compiled controller (save_compiled), may be repeated - default: experiment")
+    parser.add_argument("--seconds", type=int, default=60, help="duration of each scenario")
+    parser.add_argument("--processes", type=int, default=None, help="amount of worker processes")
+    parser.add_argument("--output", default=None, help="path of a .npz file for the results")
+    args = parser.parse_args()
+
+    controllers = {os.path.basename(path): path for path in args.controller} if args.controller else None
+
+    start = time.perf_counter()
+    results = sweep(adoption_rates=args.adoption_rates, controllers=controllers, seconds=args.seconds,
+                    processes=args.processes)
+    duration = time.perf_counter() - start
+
+    for route, controller, rate, gap, crash in zip(results["route"], results["controller"], results["adoption_rate"],
+                                                   results["min_gap"], results["crash_second"]):
+        print(f"{route:<12} {controller:<16} adoption rate {rate:5.2f} min gap {gap:8.2f} m crash second {crash}")
+    print(f"{len(results['route'])} scenarios in {duration:.2f} s")
+
+    if args.output:
+        np.savez(args.output, **results)
+
+
+if __name__ == "__main__":
+    main()
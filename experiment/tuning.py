@@ -0,0 +1,348 @@
+# import standard modules
+import copy
+import json
+import time
+import argparse
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+
+# import third party modules
+import numpy as np
+
+# import project related modules
+from experiment.intervals import accel, settings
+from experiment.follow import RULES, ROUTE, lead_distances
+from components.vehicle.bidirectional import SimpleCar
+from components.controller.fuzzy import FuzzyController
+
+
+# names of the breakpoints of a member in the order they have to keep
+BREAKPOINTS = ("lower_end", "center", "upper_end")
+
+# state of a worker process: controller, parameter space, cost settings and distances of the leading car by route,
+# created once per process
+_worker = dict()
+
+
+class ParameterSpace:
+    """
+    Class that maps the breakpoints of the members of the input and output parameters to one parameter vector and
+    back. Breakpoints on the min or max value of their parameter stay fixed, so the scale of each parameter and its
+    shoulder members are kept. All other breakpoints are free within the scale of their parameter. Decoding sorts the
+    breakpoints of each member, so every vector describes valid triangles.
+
+    :param inputs: dict: settings of the input parameters like set_inputs e.g. {"vel_crnt": [members, "[ m/s ]"]}
+    :param output: dict: members of the output parameter like set_output
+    :param tune_output: bool: if True the breakpoints of the output members are part of the vector (default: True)
+    """
+
+    def __init__(self, inputs: dict, output: dict, tune_output: bool = True):
+        self.inputs = copy.deepcopy(inputs)    # settings of the input parameters the vector starts from
+        self.output = copy.deepcopy(output)    # members of the output parameter the vector starts from
+        self.entries = list()                  # (parameter name or None for the output, member, breakpoint) per value
+        self.lower = list()                    # lowest value of each free breakpoint
+        self.upper = list()                    # highest value of each free breakpoint
+        self.initial = list()                  # value of each free breakpoint in the settings
+
+        parameters = [(name, setup[0]) for name, setup in self.inputs.items()]
+        if tune_output:
+            parameters.append((None, self.output))
+
+        for name, members in parameters:
+            values = [member[key] for member in members.values() for key in BREAKPOINTS]
+            min_value, max_value = min(values), max(values)
+
+            # free breakpoints stay a small margin away from the ends, so no triangle collapses into one point
+            margin = (max_value - min_value) * 1e-3
+            for member, setup in members.items():
+                for key in BREAKPOINTS:
+                    if min_value < setup[key] < max_value:
+                        self.entries.append((name, member, key))
+                        self.lower.append(min_value + margin)
+                        self.upper.append(max_value - margin)
+                        self.initial.append(float(setup[key]))
+
+        self.lower = np.array(self.lower)
+        self.upper = np.array(self.upper)
+        self.initial = np.array(self.initial)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def clip(self, vectors: np.ndarray):
+        """
+        limits parameter vectors to the scale of each breakpoint.
+
+        :param vectors: np.ndarray: one vector or N x len(self) vectors
+
+        :return: np.ndarray: clipped vectors
+        """
+
+        return np.clip(vectors, self.lower, self.upper)
+
+    def decode(self, vector: np.ndarray):
+        """
+        creates the settings of the input and output parameters for a parameter vector.
+
+        :param vector: np.ndarray: value of each free breakpoint in the order of self.entries
+
+        :return: tuple: (inputs, output) - settings for set_inputs and members for set_output
+        """
+
+        inputs, output = copy.deepcopy(self.inputs), copy.deepcopy(self.output)
+        for (name, member, key), value in zip(self.entries, self.clip(np.asarray(vector, dtype=float)).tolist()):
+            members = output if name is None else inputs[name][0]
+            members[member][key] = value
+
+        for members in [setup[0] for setup in inputs.values()] + [output]:
+            for setup in members.values():
+                for key, value in zip(BREAKPOINTS, sorted(setup[key] for key in BREAKPOINTS)):
+                    setup[key] = value
+        return inputs, output
+
+
+def simulate(controller: FuzzyController, lead: np.ndarray, adoption_rate: float = 0.6, standstill: float = 10.0,
+             headway: float = 2.0, gap_weight: float = 1.0, jerk_weight: float = 10.0, crash_penalty: float = 1000.0,
+             budget: float = np.inf):
+    """
+    headless car following run like follow, scored by a cost. Each second from second 1 on adds the weighted
+    absolute difference between the gap and the desired gap (standstill + headway * velocity) and the weighted
+    absolute change of the acceleration (jerk), both divided by the amount of seconds. A crash (gap <= 0) adds
+    crash_penalty and ends the run. The cost only grows during the run, so the run stops as soon as it is above the
+    budget.
+
+    :param controller: FuzzyController: controller of the following car
+    :param lead: np.ndarray: distance of the leading car per second from lead_distances
+    :param adoption_rate: float: rate of adopting the fuzzy controllers recommendation (default: 0.6)
+    :param standstill: float: desired gap at standstill in meter (default: 10.0)
+    :param headway: float: desired gap per velocity in seconds (default: 2.0)
+    :param gap_weight: float: weight of the gap error (default: 1.0)
+    :param jerk_weight: float: weight of the jerk (default: 10.0)
+    :param crash_penalty: float: cost of a crash (default: 1000.0)
+    :param budget: float: cost above which the run stops early (default: inf)
+
+    :return: tuple: (cost, seconds) - cost of the run (a lower bound if stopped early) and amount of driven seconds
+    """
+
+    seconds = len(lead)
+    scale = 1 / max(seconds - 1, 1)
+    following = SimpleCar(controller=controller, adoption_rate=adoption_rate, verbose=False, keep_history=False)
+
+    cost = 0.0
+    acceleration = following.acceleration
+    for s in range(seconds):
+        gap = lead[s] - following.distance
+        if s:
+            if gap <= 0:
+                return cost + crash_penalty, s
+            cost += scale * (gap_weight * abs(gap - standstill - headway * following.velocity)
+                             + jerk_weight * abs(following.acceleration - acceleration))
+            if cost > budget:
+                return cost, s
+
+        acceleration = following.acceleration
+        following.update(gap)
+
+    return cost, seconds
+
+
+def _init_worker(space: ParameterSpace, routes: dict, adoption_rates: list, seconds: int, rules: str, weights: dict):
+    """
+    builds the controller with the rule set and drives all routes once per worker process, the candidates only
+    change the members of the controller.
+
+    :param space: ParameterSpace: mapping of the parameter vectors to the settings
+    :param routes: dict: name -> milestones of the leading car
+    :param adoption_rates: list: rates of adopting the fuzzy controllers recommendation
+    :param seconds: int: duration of each scenario
+    :param rules: str: path of the semicolon separated rule set
+    :param weights: dict: keyword arguments of simulate for the cost
+
+    :return: None
+    """
+    import pandas as pd
+
+    controller = FuzzyController()
+    controller.set_inputs(space.inputs)
+    controller.set_ruleset(pd.read_csv(rules, sep=";"))
+    controller.set_output(space.output, "acceleration")
+
+    _worker["controller"] = controller
+    _worker["space"] = space
+    _worker["scenarios"] = [(lead_distances(route, seconds), rate)
+                            for route in routes.values() for rate in adoption_rates]
+    _worker["weights"] = weights
+
+
+def _evaluate(task: tuple):
+    """
+    scores one candidate in a worker process. The cost is the mean over all scenarios. Each scenario can only add
+    cost, so the candidate is given up as soon as its cost is above the threshold.
+
+    :param task: tuple: (parameter vector, threshold)
+
+    :return: tuple: (cost, pruned, seconds) - cost (a lower bound if pruned), True if the candidate was given up early
+                    and the amount of simulated seconds
+    """
+
+    vector, threshold = task
+    controller, scenarios = _worker["controller"], _worker["scenarios"]
+    inputs, output = _worker["space"].decode(vector)
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        if not (controller.set_inputs(inputs) and controller.set_output(output, "acceleration")):
+            return np.inf, False, 0
+
+    cost, driven = 0.0, 0
+    for lead, rate in scenarios:
+        scenario_cost, scenario_seconds = simulate(controller, lead, rate, budget=(threshold - cost) * len(scenarios),
+                                                   **_worker["weights"])
+        cost += scenario_cost / len(scenarios)
+        driven += scenario_seconds
+        if cost > threshold:
+            return cost, True, driven
+    return cost, False, driven
+
+
+def tune(inputs: dict = None, output: dict = None, routes: dict = None, adoption_rates: list = (0.6, ),
+         seconds: int = 60, rules: str = RULES, generations: int = 20, population: int = 32, elite: int = 8,
+         sigma: float = 0.1, patience: int = 5, tune_output: bool = True, weights: dict = None, processes: int = None,
+         seed: int = 0, verbose: bool = False):
+    """
+    tunes the breakpoints of the members with an elitist cross entropy search. Each generation draws a population of
+    parameter vectors from a normal distribution around the mean of the elite, scores them with headless car
+    following runs across a pool of processes and keeps the best candidates seen so far as elite. A candidate whose
+    cost exceeds the cost of the worst elite can never join the elite, so its runs stop as soon as that happens.
+
+    :param inputs: dict: settings of the input parameters to start from (default: settings of intervals.py)
+    :param output: dict: members of the output parameter "acceleration" to start from (default: accel of intervals.py)
+    :param routes: dict: name -> milestones of the leading car (default: {"experiment": ROUTE})
+    :param adoption_rates: list: rates of adopting the fuzzy controllers recommendation (default: (0.6, ))
+    :param seconds: int: duration of each scenario, must be covered by all routes (default: 60)
+    :param rules: str: path of the semicolon separated rule set (default: test_rules.csv of the experiment)
+    :param generations: int: max amount of generations (default: 20)
+    :param population: int: amount of candidates per generation (default: 32)
+    :param elite: int: amount of best candidates the next generation is drawn around (default: 8)
+    :param sigma: float: initial standard deviation relative to the scale of each breakpoint (default: 0.1)
+    :param patience: int: stop after this amount of generations without improvement, None to run all generations
+                          (default: 5)
+    :param tune_output: bool: if True the output members get tuned as well (default: True)
+    :param weights: dict: keyword arguments of simulate for the cost e.g. {"headway": 1.5} (default: None)
+    :param processes: int: amount of worker processes, 1 scores all candidates in this process (default: None - one
+                           per cpu)
+    :param seed: int: seed of the random candidates (default: 0)
+    :param verbose: bool: print one line per generation (default: False)
+
+    :return: dict: "cost" and "initial_cost", "vector", "inputs" and "output" (settings of the best candidate),
+                   "history" (one record per generation), "candidates", "pruned", "seconds" and
+                   "candidates_per_second"
+    """
+
+    space = ParameterSpace(inputs or settings, output or accel, tune_output=tune_output)
+    initargs = (space, routes or {"experiment": ROUTE}, list(adoption_rates), seconds, rules, weights or dict())
+    rng = np.random.default_rng(seed)
+    scale = space.upper - space.lower
+
+    pool = None
+    if processes == 1:
+        _init_worker(*initargs)
+        evaluate = lambda tasks: [_evaluate(task) for task in tasks]
+    else:
+        pool = ProcessPoolExecutor(max_workers=processes, initializer=_init_worker, initargs=initargs)
+        evaluate = lambda tasks: list(pool.map(_evaluate, tasks))
+
+    start = time.perf_counter()
+    try:
+        initial_cost = evaluate([(space.initial, np.inf)])[0][0]
+        vectors, costs = space.initial[None, :], np.array([initial_cost])
+        mean, deviation = space.initial, sigma * scale
+
+        history, candidates, pruned, stale = list(), 1, 0, 0
+        for generation in range(generations):
+            generation_start = time.perf_counter()
+            threshold = costs[-1] if len(costs) >= elite else np.inf
+            drawn = space.clip(rng.normal(mean, deviation, (population, len(space))))
+            results = evaluate([(vector, threshold) for vector in drawn])
+
+            drawn_costs = np.array([result[0] for result in results])
+            drawn_pruned = np.array([result[1] for result in results])
+            best = costs[0]
+
+            # pruned candidates are worse than the worst elite, they never take part in the selection
+            vectors = np.concatenate([vectors, drawn[~drawn_pruned]])
+            costs = np.concatenate([costs, drawn_costs[~drawn_pruned]])
+            order = np.argsort(costs, kind="stable")[:elite]
+            vectors, costs = vectors[order], costs[order]
+
+            # the next generation is drawn around the elite, the spread shrinks with the spread of the elite
+            mean = vectors.mean(axis=0)
+            deviation = np.maximum(0.5 * deviation + 0.5 * vectors.std(axis=0), 1e-3 * scale)
+
+            duration = time.perf_counter() - generation_start
+            candidates += population
+            pruned += int(drawn_pruned.sum())
+            stale = 0 if costs[0] < best else stale + 1
+            history.append({
+                "generation": generation,
+                "best_cost": float(costs[0]),
+                "elite_cost": float(costs[-1]),
+                "pruned": int(drawn_pruned.sum()),
+                "simulated_seconds": int(sum(result[2] for result in results)),
+                "candidates_per_second": population / duration,
+            })
+            if verbose:
+                print(f"generation {generation:3d} best cost {costs[0]:10.4f} elite cost {costs[-1]:10.4f} "
+                      f"pruned {history[-1]['pruned']:4d}/{population} {history[-1]['candidates_per_second']:8.1f} "
+                      f"candidates/s")
+            if patience is not None and stale >= patience:
+                break
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    duration = time.perf_counter() - start
+    best_inputs, best_output = space.decode(vectors[0])
+    return {
+        "cost": float(costs[0]),
+        "initial_cost": float(initial_cost),
+        "vector": vectors[0],
+        "inputs": best_inputs,
+        "output": best_output,
+        "history": history,
+        "candidates": candidates,
+        "pruned": pruned,
+        "seconds": duration,
+        "candidates_per_second": candidates / duration,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="tunes the members of the car following controller")
+    parser.add_argument("--generations", type=int, default=20, help="max amount of generations")
+    parser.add_argument("--population", type=int, default=32, help="amount of candidates per generation")
+    parser.add_argument("--elite", type=int, default=8, help="amount of best candidates kept per generation")
+    parser.add_argument("--adoption-rates", type=float, nargs="+", default=[0.6],
+                        help="rates of adopting the fuzzy controllers recommendation")
+    parser.add_argument("--headway", type=float, default=2.0, help="desired gap per velocity in seconds")
+    parser.add_argument("--inputs-only", action="store_true", help="keep the members of the output parameter")
+    parser.add_argument("--processes", type=int, default=None, help="amount of worker processes")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the random candidates")
+    parser.add_argument("--output", default=None, help="path of a .json file for the tuned settings")
+    args = parser.parse_args()
+
+    result = tune(adoption_rates=args.adoption_rates, generations=args.generations, population=args.population,
+                  elite=args.elite, tune_output=not args.inputs_only, weights={"headway": args.headway},
+                  processes=args.processes, seed=args.seed, verbose=True)
+
+    print(f"cost {result['initial_cost']:.4f} -> {result['cost']:.4f}, {result['candidates']} candidates "
+          f"({result['pruned']} stopped early) in {result['seconds']:.2f} s, "
+          f"{result['candidates_per_second']:.1f} candidates/s")
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump({"inputs": result["inputs"], "output": result["output"], "cost": result["cost"]}, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,33 @@
+# import standard modules
+import os
+
+# import third party modules
+import numpy as np
+import pandas as pd
+import pytest
+
+# import project related modules
+from experiment.follow import build_controller
+
+
+# outputs of the experiment controller computed with the original implementation (shapely polygons and pandas rule
+# queries), inputs partly outside the scales, on the scale ends and on the corner points of the members
+REFERENCE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "reference_outputs.csv")
+INPUTS = ["target_distance", "accel_crnt", "vel_crnt"]
+
+
+@pytest.fixture
+def controller():
+    return build_controller()
+
+
+@pytest.fixture(scope="session")
+def reference():
+    data = pd.read_csv(REFERENCE, sep=";")
+    return data[INPUTS].to_numpy(), data["acceleration"].to_numpy()
+
+
+@pytest.fixture(scope="session")
+def samples():
+    rng = np.random.default_rng(0)
+    return np.column_stack([rng.uniform(30, 210, 1000), rng.uniform(-2.5, 2.5, 1000), rng.uniform(5, 35, 1000)])
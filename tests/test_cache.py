@@ -0,0 +1,44 @@
+# import standard modules
+import math
+
+# import third party modules
+import pytest
+
+# import project related modules
+from experiment.intervals import settings
+
+
+@pytest.mark.parametrize("inputs", [
+    {"target_distance": math.nan, "accel_crnt": 0.0, "vel_crnt": 10.0},
+    {"accel_crnt": 0.0, "vel_crnt": 10.0},
+])
+def test_cache_accepts_the_same_inputs_as_run(controller, inputs):
+    expected = controller.run(inputs)
+    controller.enable_cache(0.5)
+
+    assert controller.run(inputs) == expected
+    assert controller.cache_stats()["size"] == 0
+
+
+def test_cache_hits_quantized_inputs(controller):
+    controller.enable_cache({"target_distance": 1.0, "accel_crnt": 0.1, "vel_crnt": 0.1})
+    first = controller.run({"target_distance": 100.2, "accel_crnt": 0.01, "vel_crnt": 10.02})
+    second = controller.run({"target_distance": 99.8, "accel_crnt": -0.01, "vel_crnt": 9.98})
+
+    assert first == second
+    assert controller.cache_stats()["hits"] == 1
+
+
+def test_cache_follows_renamed_inputs(controller):
+    controller.enable_cache(0.5, maxsize=16)
+    controller.run({"target_distance": 100.0, "accel_crnt": 0.0, "vel_crnt": 10.0})
+
+    renamed = {"gap" if name == "target_distance" else name: setup for name, setup in settings.items()}
+    with pytest.warns(UserWarning):
+        controller.set_inputs(renamed)
+    controller.set_ruleset(controller.rules.rename(columns={"target_distance": "gap"}))
+    controller.run({"gap": 100.0, "accel_crnt": 0.0, "vel_crnt": 10.0})
+
+    assert controller.cache.names == list(renamed)
+    assert controller.cache.maxsize == 16
+    assert controller.cache_stats()["size"] == 1
@@ -0,0 +1,36 @@
+# import standard modules
+import importlib.util
+
+# import third party modules
+import numpy as np
+import pytest
+
+# import project related modules
+from components.controller import codegen
+
+
+def test_generated_module_matches_run(controller):
+    module = codegen.load_source(controller.generate_source())
+
+    assert codegen.check_parity(controller, module, samples=500)["passed"]
+
+
+def test_generated_module_matches_reference(controller, reference):
+    values, expected = reference
+    module = codegen.load_source(controller.generate_source())
+
+    np.testing.assert_allclose([module.evaluate(*row) for row in values.tolist()], expected, rtol=0, atol=1e-9)
+    assert module.run(dict(zip(controller.feature_space, values[0]))) == pytest.approx(expected[0], abs=1e-9)
+
+
+def test_written_module_only_needs_the_standard_library(controller, reference, tmp_path):
+    values, expected = reference
+    path = tmp_path / "controller_module.py"
+    controller.generate_source(str(path))
+
+    imports = [line for line in path.read_text().splitlines() if line.startswith(("import ", "from "))]
+    assert imports == ["import math"]
+    spec = importlib.util.spec_from_file_location("controller_module", str(path))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    assert module.evaluate(*values[0].tolist()) == pytest.approx(expected[0], abs=1e-9)
@@ -0,0 +1,41 @@
+# import standard modules
+
+# import third party modules
+import numpy as np
+import pytest
+
+# import project related modules
+from experiment.follow import follow
+
+
+def test_run_matches_reference(controller, reference):
+    values, expected = reference
+    outputs = [controller.run(dict(zip(controller.feature_space, row))) for row in values.tolist()]
+
+    np.testing.assert_allclose(outputs, expected, rtol=0, atol=1e-9)
+
+
+@pytest.mark.parametrize("dense", [False, True])
+def test_run_batch_matches_reference(controller, reference, dense):
+    values, expected = reference
+    controller.set_ruleset(controller.rules, dense=dense)
+
+    np.testing.assert_allclose(controller.run_batch(values), expected, rtol=0, atol=1e-9)
+    np.testing.assert_allclose(controller.run_batch(values, chunk_size=7), expected, rtol=0, atol=1e-9)
+
+
+def test_profiling_keeps_outputs(controller, reference):
+    values, expected = reference
+    controller.enable_profiling()
+
+    np.testing.assert_allclose(controller.run_batch(values), expected, rtol=0, atol=1e-9)
+    assert controller.run(dict(zip(controller.feature_space, values[0]))) == pytest.approx(expected[0], abs=1e-9)
+
+
+def test_unknown_inputs_give_zero(controller):
+    with pytest.warns(UserWarning):
+        assert controller.run({"unknown": 1.0}) == 0
+
+
+def test_follow_experiment_does_not_crash(controller):
+    assert follow(controller)["gap"][1:].min() > 0
@@ -0,0 +1,86 @@
+# import standard modules
+
+# import third party modules
+import numpy as np
+import pytest
+
+# import project related modules
+from components.controller.loader import RuleFileError, read_rule_codes
+from experiment.follow import RULES
+
+
+HEADER = "target_distance;accel_crnt;vel_crnt;acceleration"
+
+
+def parameters(fc):
+    return dict(fc.feature_space, **fc.outputs)
+
+
+def write_rules(path, *rows):
+    path.write_text("\n".join((HEADER,) + rows) + "\n")
+    return str(path)
+
+
+@pytest.mark.parametrize("dense", [False, True])
+def test_load_ruleset_matches_set_ruleset(controller, samples, dense):
+    controller.set_ruleset(controller.rules, dense=dense)
+    expected = controller.run_batch(samples)
+
+    assert controller.load_ruleset(RULES, dense=dense, chunk_size=16)
+    assert controller.rules is None
+    np.testing.assert_allclose(controller.run_batch(samples), expected, rtol=0, atol=1e-12)
+
+
+def test_invalid_rows_are_reported_with_their_line(controller, tmp_path):
+    path = write_rules(tmp_path / "rules.csv",
+                       "very low;strong positive;very slow;strong negative",
+                       "very low;warp;very slow;hyper",
+                       "",
+                       "low;zero;slow")
+
+    with pytest.raises(RuleFileError) as info:
+        read_rule_codes(path, parameters(controller))
+
+    assert info.value.errors == [
+        (3, "unknown member 'warp' of accel_crnt, unknown member 'hyper' of acceleration"),
+        (5, "expected 4 cells but found 3"),
+    ]
+    assert "line 3: unknown member 'warp'" in str(info.value)
+
+
+def test_unknown_columns_are_reported_in_the_header(controller, tmp_path):
+    path = tmp_path / "rules.csv"
+    path.write_text("target_distance;accel_crnt;velocity;acceleration\nvery low;zero;slow;zero\n")
+
+    with pytest.raises(RuleFileError) as info:
+        read_rule_codes(str(path), parameters(controller))
+
+    assert info.value.errors == [(1, "missing columns ['vel_crnt'], unknown columns ['velocity']")]
+
+
+def test_skipped_rows_are_counted_once(controller, tmp_path):
+    path = write_rules(tmp_path / "rules.csv",
+                       "very low;strong positive;very slow;strong negative",
+                       "very low;warp;very slow;hyper",
+                       "low;zero;slow;zero")
+
+    with pytest.warns(UserWarning, match="skipped 1 invalid rows"):
+        assert controller.load_ruleset(path, skip_invalid=True)
+    assert controller.rule_index.get_codes("acceleration").tolist() == [0, 2]
+
+
+def test_large_files_are_streamed_in_chunks(controller, tmp_path):
+    with open(RULES) as file:
+        rows = file.read().splitlines()[1:]
+    repeats = 800
+    lines = rows * repeats
+    lines[-1] = "very low;warp;very slow;zero"
+    path = write_rules(tmp_path / "rules.csv", *lines)
+
+    codes, errors = read_rule_codes(path, parameters(controller), chunk_size=1000, skip_invalid=True)
+
+    assert errors == [(len(lines) + 1, "unknown member 'warp' of accel_crnt")]
+    assert len(codes["acceleration"]) == len(lines) - 1
+    assert codes["acceleration"].dtype == np.int8
+    expected = np.array([controller.outputs["acceleration"].index[row.split(";")[3]] for row in rows])
+    np.testing.assert_array_equal(codes["acceleration"], np.tile(expected, repeats)[:-1])
@@ -0,0 +1,37 @@
+# import standard modules
+import itertools
+
+# import third party modules
+import numpy as np
+import pytest
+
+# import project related modules
+
+
+def test_lookup_table_is_close(controller, samples):
+    exact = controller.run_batch(samples)
+    lut = controller.compile_lut(resolution=16, samples=1000)
+
+    assert np.abs(controller.run_batch(samples) - exact).max() <= lut.max_error + 1e-9
+    assert controller.run(dict(zip(controller.feature_space, samples[0]))) == pytest.approx(
+        controller.run_batch(samples[:1])[0])
+
+
+def test_lookup_table_is_exact_on_member_breakpoints(controller):
+    # all breakpoints are grid lines, so inputs on them (e.g. clipped to the scale) use the exact output
+    axes = [np.unique(np.concatenate([m.lower, m.center, m.upper])) for m in controller.feature_space.values()]
+    values = np.array(list(itertools.product(*axes)))
+    exact = controller.run_batch(values)
+    controller.compile_lut(resolution=4, samples=100)
+
+    np.testing.assert_allclose(controller.run_batch(values), exact, rtol=0, atol=1e-12)
+
+
+def test_new_rules_drop_the_lookup_table(controller, samples):
+    exact = controller.run_batch(samples)
+    controller.compile_lut(resolution=4, samples=100)
+
+    controller.set_ruleset(controller.rules)
+
+    assert controller.lut is None
+    np.testing.assert_allclose(controller.run_batch(samples), exact, rtol=0, atol=1e-12)
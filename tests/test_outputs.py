@@ -0,0 +1,65 @@
+# import standard modules
+
+# import third party modules
+import numpy as np
+import pytest
+
+# import project related modules
+from experiment.follow import build_controller
+from experiment.intervals import accel
+
+
+MIRRORED = {"strong negative": "strong positive", "negative": "positive", "zero": "zero", "positive": "negative",
+            "strong positive": "strong negative"}
+
+
+@pytest.fixture
+def single():
+    # one controller per output, the second output uses the mirrored members of the acceleration
+    fc = build_controller()
+    mirrored = build_controller()
+    mirrored.set_ruleset(fc.rules.assign(acceleration=fc.rules["acceleration"].map(MIRRORED)))
+    return {"acceleration": fc, "mirrored": mirrored}
+
+
+@pytest.fixture
+def several(single):
+    fc = build_controller()
+    fc.set_ruleset(fc.rules.assign(mirrored=single["mirrored"].rules["acceleration"]))
+    fc.set_output({"acceleration": [accel, "[ m/s2 ]"], "mirrored": [accel, "[ m/s2 ]"]})
+    return fc
+
+
+def test_run_returns_each_output(several, single, samples):
+    for row in samples[:50].tolist():
+        inputs = dict(zip(several.feature_space, row))
+        outputs = several.run(inputs)
+
+        assert list(outputs) == ["acceleration", "mirrored"]
+        for name, fc in single.items():
+            assert outputs[name] == pytest.approx(fc.run(inputs), abs=1e-12)
+
+
+@pytest.mark.parametrize("dense", [False, True])
+def test_run_batch_returns_each_output(several, single, samples, dense):
+    several.set_ruleset(several.rules, dense=dense)
+    outputs = several.run_batch(samples)
+
+    assert list(outputs) == ["acceleration", "mirrored"]
+    for name, fc in single.items():
+        np.testing.assert_allclose(outputs[name], fc.run_batch(samples), rtol=0, atol=1e-12)
+
+
+def test_lookup_table_returns_each_output(several, samples):
+    # inputs on the member breakpoints lie on grid lines of the table and get the exact outputs
+    axes = [np.unique(np.concatenate([m.lower, m.center, m.upper])) for m in several.feature_space.values()]
+    values = np.stack(np.meshgrid(*axes, indexing="ij"), axis=-1).reshape(-1, len(axes))
+    exact = several.run_batch(values)
+    lut = several.compile_lut(resolution=8, samples=100)
+
+    assert lut.outputs == ["acceleration", "mirrored"]
+    interpolated, batch = several.run_batch(values), several.run_batch(samples[:1])
+    single = several.run(dict(zip(several.feature_space, samples[0])))
+    for name in lut.outputs:
+        np.testing.assert_allclose(interpolated[name], exact[name], rtol=0, atol=1e-12)
+        assert single[name] == pytest.approx(batch[name][0])
@@ -0,0 +1,53 @@
+# import standard modules
+
+# import third party modules
+import numpy as np
+import pytest
+
+# import project related modules
+from components.vehicle.platoon import Platoon
+from experiment.follow import follow, lead_distances
+
+
+KEYS = ("velocity", "acceleration", "distance", "gap")
+
+
+@pytest.fixture(scope="module")
+def lead():
+    return lead_distances()
+
+
+def test_single_car_matches_follow(controller, lead):
+    expected = follow(controller, adoption_rate=0.6, lead=lead)
+
+    result = Platoon(controller, 1, adoption_rate=0.6).run(lead)
+
+    for key in KEYS:
+        np.testing.assert_allclose(result[key][:, 0], expected[key], rtol=0, atol=1e-12)
+    assert result["min_gap"][0] == pytest.approx(expected["gap"][1:].min())
+    assert result["crash_second"][0] == -1
+
+
+def test_each_car_follows_the_car_in_front(controller, lead):
+    rates = [0.6, 0.4, 0.8]
+    result = Platoon(controller, 3, adoption_rate=rates, spacing=20.0).run(lead)
+
+    # the leader follows the leading car, each follower the distances of its predecessor at the same seconds
+    ahead = lead
+    for car, rate in enumerate(rates):
+        start = -20.0 * (car + 1)
+        expected = follow(controller, adoption_rate=rate, lead=ahead - start)
+        np.testing.assert_allclose(result["distance"][:, car] - start, expected["distance"], rtol=0, atol=1e-9)
+        np.testing.assert_allclose(result["gap"][:, car], expected["gap"], rtol=0, atol=1e-9)
+        ahead = result["distance"][:, car]
+
+
+def test_metrics_without_records(controller, lead):
+    recorded = Platoon(controller, 3, adoption_rate=[0.6, 0.4, 0.8]).run(lead)
+
+    metrics = Platoon(controller, 3, adoption_rate=[0.6, 0.4, 0.8]).run(lead, record=False)
+
+    assert set(metrics) == {"min_gap", "crash_second"}
+    np.testing.assert_array_equal(metrics["min_gap"], recorded["min_gap"])
+    np.testing.assert_array_equal(metrics["crash_second"], recorded["crash_second"])
+    np.testing.assert_array_equal(recorded["min_gap"], recorded["gap"][1:].min(axis=0))
@@ -0,0 +1,116 @@
+# import standard modules
+
+# import third party modules
+import numpy as np
+import pandas as pd
+import pytest
+
+# import project related modules
+from experiment.follow import build_controller
+
+
+OUTPUT = "acceleration"
+
+
+def rebuilt(rules: pd.DataFrame, dense: bool = False):
+    fc = build_controller()
+    fc.set_ruleset(rules.reset_index(drop=True), dense=dense)
+    return fc
+
+
+def positions(fc, rules: pd.DataFrame):
+    # a sparse rule set addresses rules by their row, a dense one by the flat position of their input members
+    if not hasattr(fc.rule_index, "axes"):
+        return rules.index.to_numpy()
+    index = fc.rule_index
+    codes = [np.array([index.lookup[axis][str(member)] for member in rules[axis]]) for axis in index.axes]
+    return np.ravel_multi_index(codes, index.shape)
+
+
+@pytest.mark.parametrize("dense", [False, True])
+def test_edits_match_a_rebuilt_controller(dense, samples):
+    fc = build_controller()
+    rules = fc.rules.copy()
+    fc.set_ruleset(rules, dense=dense)
+    version = fc.version
+
+    fc.remove_rules(positions(fc, rules.loc[[0, 7, 20]]))
+    changed = rules.loc[[1, 2]].assign(**{OUTPUT: ["zero", "positive"]})
+    fc.update_rules(positions(fc, rules.loc[[1, 2]]), changed)
+    fc.add_rules(rules.loc[[0]])
+
+    expected = pd.concat([rules.drop(index=[0, 1, 2, 7, 20]), changed, rules.loc[[0]]])
+    np.testing.assert_allclose(fc.run_batch(samples), rebuilt(expected, dense).run_batch(samples), rtol=0, atol=1e-12)
+    assert fc.version == version + 3
+    assert fc.rules is None
+
+
+def test_update_moves_rules_with_new_input_members(samples):
+    fc = build_controller()
+    rules = fc.rules.copy()
+    moved = rules.loc[[4]].assign(target_distance=rules.loc[30, "target_distance"])
+
+    new_positions = fc.update_rules([4], moved.to_dict("records"))
+
+    assert new_positions.tolist() == [len(rules)]
+    expected = pd.concat([rules.drop(index=[4]), moved])
+    np.testing.assert_allclose(fc.run_batch(samples), rebuilt(expected).run_batch(samples), rtol=0, atol=1e-12)
+
+
+def test_dense_rule_sets_refuse_occupied_combinations():
+    fc = build_controller()
+    fc.set_ruleset(fc.rules, dense=True)
+
+    with pytest.raises(ValueError):
+        fc.add_rules(build_controller().rules.loc[[1]])
+
+
+def test_unknown_members_are_refused(controller):
+    rule = controller.rules.loc[[0]].assign(**{OUTPUT: "warp speed"})
+
+    with pytest.raises(ValueError):
+        controller.add_rules(rule)
+
+
+def test_edits_only_drop_affected_cached_outputs(controller, samples):
+    rules = controller.rules.copy()
+    controller.enable_cache(0.5, maxsize=10000)
+    situations = [dict(zip(controller.feature_space, row)) for row in samples.tolist()]
+    for inputs in situations:
+        controller.run(inputs)
+    cached, hits = controller.cache_stats()["size"], controller.cache_stats()["hits"]
+
+    controller.remove_rules([3, 40])
+    kept = controller.cache_stats()["size"]
+
+    expected = rebuilt(rules.drop(index=[3, 40]))
+    expected.enable_cache(0.5, maxsize=10000)
+    assert 0 < kept < cached
+    assert max(abs(controller.run(inputs) - expected.run(inputs)) for inputs in situations) < 1e-12
+    # each kept output answers at least the situation it was computed for
+    assert controller.cache_stats()["hits"] >= hits + kept
+
+
+def test_edits_refresh_the_lookup_table(controller):
+    rules = controller.rules.copy()
+    controller.compile_lut(resolution=10, samples=100)
+
+    controller.remove_rules([0, 5])
+    controller.update_rules([9], rules.loc[[9]].assign(**{OUTPUT: "zero"}))
+
+    expected = rebuilt(pd.concat([rules.drop(index=[0, 5, 9]), rules.loc[[9]].assign(**{OUTPUT: "zero"})]))
+    np.testing.assert_allclose(controller.lut.table, expected.compile_lut(resolution=10, samples=100).table,
+                               rtol=0, atol=1e-12)
+
+
+def test_edited_controller_round_trips(controller, samples, tmp_path):
+    rules = controller.rules.copy()
+    controller.remove_rules([2, 3])
+    controller.add_rules(rules.loc[[2]])
+    controller.save_compiled(str(tmp_path / "edited.fzc"))
+
+    loaded = type(controller).load_compiled(str(tmp_path / "edited.fzc"))
+
+    expected = rebuilt(pd.concat([rules.drop(index=[2, 3]), rules.loc[[2]]])).run_batch(samples)
+    np.testing.assert_allclose(controller.run_batch(samples), expected, rtol=0, atol=1e-12)
+    np.testing.assert_allclose(loaded.run_batch(samples), expected, rtol=0, atol=1e-12)
@@ -0,0 +1,127 @@
+# import standard modules
+import time
+import asyncio
+
+# import third party modules
+import pytest
+
+# import project related modules
+from components.controller.service import ControlClient, ControlService
+
+
+def serve(controller, scenario, **settings):
+    # runs a scenario with the service on a free local tcp port and a factory of connected clients
+    async def main():
+        service = ControlService(controller, **settings)
+        host, port = await service.start()
+
+        async def client():
+            return await ControlClient().connect(host=host, port=port)
+
+        try:
+            return await scenario(service, client)
+        finally:
+            await service.close()
+
+    return asyncio.run(main())
+
+
+def test_answers_match_run(controller, samples):
+    situations = [dict(zip(controller.feature_space, row)) for row in samples[:200].tolist()]
+
+    async def scenario(service, client):
+        # several vehicles with pipelined requests share the batches
+        clients = [await client() for _ in range(4)]
+        outputs = await asyncio.gather(*(clients[ix % 4].run(inputs) for ix, inputs in enumerate(situations)))
+        stats = await clients[0].stats()
+        for each in clients:
+            await each.close()
+        return outputs, stats
+
+    outputs, stats = serve(controller, scenario, max_batch_size=32, max_wait=0.05)
+
+    assert outputs == pytest.approx([controller.run(inputs) for inputs in situations], abs=1e-12)
+    assert stats["requests"] == 200 and stats["errors"] == 0
+    assert stats["batches"] < 200
+
+
+def test_batches_stay_within_max_batch_size(controller, samples):
+    situations = [dict(zip(controller.feature_space, row)) for row in samples[:20].tolist()]
+
+    async def scenario(service, client):
+        vehicle = await client()
+        await asyncio.gather(*(vehicle.run(inputs) for inputs in situations))
+        await vehicle.close()
+        return service.stats()
+
+    stats = serve(controller, scenario, max_batch_size=8, max_wait=0.5)
+
+    assert stats["max_batch_size"] == 8
+    assert max(stats["batch_sizes"]) == 8
+    assert sum(size * count for size, count in stats["batch_sizes"].items()) == 20
+
+
+def test_single_requests_wait_at_most_max_wait(controller):
+    inputs = {"target_distance": 100.0, "accel_crnt": 0.0, "vel_crnt": 10.0}
+
+    async def scenario(service, client):
+        vehicle = await client()
+        start = time.perf_counter()
+        output = await vehicle.run(inputs)
+        waited = time.perf_counter() - start
+        await vehicle.close()
+        return output, waited, service.stats()
+
+    output, waited, stats = serve(controller, scenario, max_batch_size=256, max_wait=0.2)
+
+    assert output == pytest.approx(controller.run(inputs), abs=1e-12)
+    assert 0.15 < waited < 2.0
+    assert stats["batch_sizes"] == {1: 1}
+
+
+def test_invalid_requests_get_errors(controller):
+    async def scenario(service, client):
+        vehicle = await client()
+        with pytest.raises(RuntimeError, match="KeyError"):
+            await vehicle.run({"target_distance": 100.0})
+        output = await vehicle.run({"target_distance": 100.0, "accel_crnt": 0.0, "vel_crnt": 10.0})
+        await vehicle.close()
+        return output
+
+    assert serve(controller, scenario, max_wait=0.001) == pytest.approx(
+        controller.run({"target_distance": 100.0, "accel_crnt": 0.0, "vel_crnt": 10.0}), abs=1e-12)
+
+
+def test_failed_batches_reach_each_caller(controller, samples):
+    def broken(values):
+        raise ValueError("controller failed")
+
+    controller.run_batch = broken
+
+    async def scenario(service, client):
+        vehicle = await client()
+        results = await asyncio.gather(*(vehicle.run(dict(zip(controller.feature_space, row)))
+                                         for row in samples[:5].tolist()), return_exceptions=True)
+        await vehicle.close()
+        return results, service.stats()
+
+    results, stats = serve(controller, scenario, max_wait=0.05)
+
+    assert all(isinstance(result, RuntimeError) and "controller failed" in str(result) for result in results)
+    assert stats["errors"] == 5 and stats["requests"] == 0
+
+
+def test_shutdown_fails_open_requests(controller):
+    async def scenario(service, client):
+        vehicle = await client()
+        pending = asyncio.ensure_future(vehicle.run({"target_distance": 100.0, "accel_crnt": 0.0, "vel_crnt": 10.0}))
+
+        # the request waits for more requests of its batch while the service shuts down
+        await asyncio.sleep(0.1)
+        await service.close()
+        with pytest.raises(ConnectionError):
+            await asyncio.wait_for(pending, 5)
+        await vehicle.close()
+        return service.stats()
+
+    assert serve(controller, scenario, max_wait=30)["requests"] == 0
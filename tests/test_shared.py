@@ -0,0 +1,54 @@
+# import standard modules
+import os
+import sys
+import functools
+import subprocess
+
+# import third party modules
+import numpy as np
+import pytest
+
+# import project related modules
+from components.controller.fuzzy import FuzzyController
+from experiment.sweep import sweep
+
+
+@pytest.mark.parametrize("dense", [False, True])
+def test_publish_and_attach_keep_outputs(controller, reference, dense):
+    values, expected = reference
+    controller.set_ruleset(controller.rules, dense=dense)
+
+    with controller.publish_shared() as tables:
+        attached = FuzzyController.attach_shared(tables.name)
+        np.testing.assert_allclose(attached.run_batch(values), expected, rtol=0, atol=1e-9)
+
+        # the rule set is a read only view into the block
+        codes = next(iter(attached.rule_index.get_tables()[1].values()))
+        assert not codes.flags.writeable
+        del attached, codes
+
+
+def test_unlinked_tables_can_not_be_attached(controller):
+    with controller.publish_shared() as tables:
+        name = tables.name
+
+    with pytest.raises(FileNotFoundError):
+        FuzzyController.attach_shared(name)
+
+
+def test_workers_of_a_sweep_attach_to_the_tables(controller):
+    expected = sweep(adoption_rates=[0.4, 0.8], processes=1)
+
+    with controller.publish_shared() as tables:
+        attach = functools.partial(FuzzyController.attach_shared, tables.name)
+        results = sweep(adoption_rates=[0.4, 0.8], controllers={"experiment": attach}, processes=2, chunksize=1)
+
+    np.testing.assert_allclose(results["gap"], expected["gap"], rtol=0, atol=1e-9)
+
+
+def test_controller_imports_without_shared_memory():
+    # multiprocessing.shared_memory needs python 3.8, the controller itself must not import it
+    code = ("import sys; sys.modules['multiprocessing.shared_memory'] = None; "
+            "from experiment.follow import build_controller, follow; follow(build_controller())")
+
+    subprocess.run([sys.executable, "-c", code], check=True, cwd=os.path.dirname(os.path.dirname(__file__)))
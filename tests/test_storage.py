@@ -0,0 +1,36 @@
+# import standard modules
+
+# import third party modules
+import numpy as np
+import pytest
+
+# import project related modules
+from components.controller.fuzzy import FuzzyController
+
+
+@pytest.mark.parametrize("dense", [False, True])
+def test_save_and_load_keep_outputs(controller, reference, tmp_path, dense):
+    values, expected = reference
+    controller.set_ruleset(controller.rules, dense=dense)
+    controller.save_compiled(str(tmp_path / "controller.fzc"))
+
+    loaded = FuzzyController.load_compiled(str(tmp_path / "controller.fzc"))
+
+    np.testing.assert_allclose(loaded.run_batch(values), expected, rtol=0, atol=1e-9)
+    assert loaded.run(dict(zip(loaded.feature_space, values[0]))) == pytest.approx(expected[0], abs=1e-9)
+
+
+def test_loaded_rule_set_is_mapped_read_only(controller, tmp_path):
+    controller.save_compiled(str(tmp_path / "controller.fzc"))
+
+    loaded = FuzzyController.load_compiled(str(tmp_path / "controller.fzc"))
+
+    assert loaded.rules is None
+    assert not any(array.flags.writeable for array in loaded.rule_index.get_tables()[1].values())
+
+
+def test_other_files_are_refused(tmp_path):
+    (tmp_path / "rules.csv").write_text("target_distance;accel_crnt;vel_crnt;acceleration\n" * 10)
+
+    with pytest.raises(ValueError):
+        FuzzyController.load_compiled(str(tmp_path / "rules.csv"))
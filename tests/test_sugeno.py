@@ -0,0 +1,64 @@
+# import standard modules
+
+# import third party modules
+import numpy as np
+import pytest
+
+# import project related modules
+from components.controller import codegen
+from components.controller.fuzzy import FuzzyController
+from experiment.follow import build_controller
+from experiment.intervals import accel
+
+
+MODES = [("centroid", True), ("center", True), ("centroid", False), ("center", False)]
+
+
+@pytest.mark.parametrize("dense", [False, True])
+@pytest.mark.parametrize("crisp, normalize", MODES)
+def test_run_matches_run_batch(controller, reference, crisp, normalize, dense):
+    values, _ = reference
+    controller.set_ruleset(controller.rules, dense=dense)
+    controller.set_inference("sugeno", crisp=crisp, normalize=normalize)
+
+    outputs = [controller.run(dict(zip(controller.feature_space, row))) for row in values.tolist()]
+
+    np.testing.assert_allclose(controller.run_batch(values), outputs, rtol=0, atol=1e-12)
+
+
+@pytest.mark.parametrize("crisp, normalize", MODES)
+def test_generated_module_matches_run(controller, reference, crisp, normalize):
+    values, _ = reference
+    controller.set_inference("sugeno", crisp=crisp, normalize=normalize)
+    module = codegen.load_source(controller.generate_source())
+
+    assert codegen.check_parity(controller, module, samples=500)["passed"]
+    np.testing.assert_allclose([module.evaluate(*row) for row in values.tolist()], controller.run_batch(values),
+                               rtol=0, atol=1e-9)
+
+
+def test_default_output_is_the_weighted_average(controller, samples):
+    controller.set_inference("sugeno", crisp="center", normalize=False)
+    total = controller.run_batch(samples)
+
+    # with a crisp value of 1 for each output member the weighted sum is the sum of the degrees
+    ones = build_controller()
+    ones.set_output({member: {"lower_end": 0, "center": 1, "upper_end": 2} for member in accel}, "acceleration")
+    ones.set_inference("sugeno", crisp="center", normalize=False)
+    weights = ones.run_batch(samples)
+
+    assert controller.set_inference("sugeno", crisp="center") and controller.normalize
+    fired = weights > 0
+    np.testing.assert_allclose(controller.run_batch(samples)[fired], total[fired] / weights[fired], rtol=0,
+                               atol=1e-12)
+    assert np.all(controller.run_batch(samples)[~fired] == 0)
+
+
+def test_save_and_load_keep_inference_mode(controller, samples, tmp_path):
+    controller.set_inference("sugeno", crisp="center", normalize=False)
+    controller.save_compiled(str(tmp_path / "controller.fzc"))
+
+    loaded = FuzzyController.load_compiled(str(tmp_path / "controller.fzc"))
+
+    assert (loaded.mode, loaded.crisp, loaded.normalize) == ("sugeno", "center", False)
+    np.testing.assert_allclose(loaded.run_batch(samples), controller.run_batch(samples), rtol=0, atol=1e-12)
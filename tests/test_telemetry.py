@@ -0,0 +1,89 @@
+# import standard modules
+import csv
+
+# import third party modules
+import numpy as np
+import pytest
+
+# import project related modules
+from components.vehicle.bidirectional import SimpleCar
+from components.vehicle.telemetry import History, TelemetrySink
+from experiment.follow import follow, lead_distances
+
+
+def records(count: int):
+    return [{"second": float(s), "velocity": 0.5 * s, "gap": 100.0 - s} for s in range(count)]
+
+
+def read_csv(path):
+    with open(path, newline="") as file:
+        return list(csv.reader(file))
+
+
+def test_history_grows_beyond_its_capacity():
+    history = History(capacity=2)
+    for s in range(5):
+        history.append(s, 2 * s, 3 * s)
+
+    assert len(history) == 5
+    assert history.values.shape == (3, 8)
+    np.testing.assert_array_equal(history["acceleration"], [0, 2, 4, 6, 8])
+    assert [field for field, _ in history.items()] == ["velocity", "acceleration", "distance"]
+
+
+def test_csv_sink_flushes_full_chunks(tmp_path):
+    path = str(tmp_path / "telemetry.csv")
+    sink = TelemetrySink(path, chunk_size=4)
+    for record in records(6):
+        sink.write(record)
+
+    # the first chunk is written once it is full, the last one stays in memory until close
+    assert (sink.count, sink.size) == (4, 2)
+
+    sink.close()
+    rows = read_csv(path)
+    assert rows[0] == ["second", "velocity", "gap"]
+    assert [[float(value) for value in row] for row in rows[1:]] == [list(r.values()) for r in records(6)]
+    assert sink.count == 6
+
+
+def test_npz_sink_collects_chunks(tmp_path):
+    path = str(tmp_path / "telemetry.npz")
+    with TelemetrySink(path, chunk_size=3) as sink:
+        for record in records(7):
+            sink.write(record)
+
+    with np.load(path) as data:
+        assert sorted(data.files) == ["gap", "second", "velocity"]
+        np.testing.assert_array_equal(data["velocity"], [r["velocity"] for r in records(7)])
+
+
+def test_parquet_sink_writes_one_row_group_per_chunk(tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    path = str(tmp_path / "telemetry.parquet")
+    with TelemetrySink(path, chunk_size=3) as sink:
+        for record in records(7):
+            sink.write(record)
+
+    assert pq.ParquetFile(path).num_row_groups == 3
+    assert pq.read_table(path).column("gap").to_pylist() == [r["gap"] for r in records(7)]
+
+
+def test_silent_car_writes_each_second_to_the_sink(controller, tmp_path):
+    lead = lead_distances()
+    path = str(tmp_path / "car.csv")
+    recorded = SimpleCar(controller=controller, adoption_rate=0.6, verbose=False)
+
+    with TelemetrySink(path, chunk_size=16) as sink:
+        car = SimpleCar(controller=controller, adoption_rate=0.6, verbose=False, sink=sink, keep_history=False)
+        for s in range(len(lead)):
+            recorded.update(lead[s] - recorded.distance)
+            car.update(lead[s] - car.distance)
+
+    rows = read_csv(path)
+    assert rows[0] == ["adjustment", "velocity", "acceleration", "distance", "lead_distance"]
+    written = np.array(rows[1:], dtype=float)
+    assert len(car.history) == 1
+    for ix, field in enumerate(["velocity", "acceleration", "distance"], start=1):
+        np.testing.assert_array_equal(written[:, ix], recorded.history[field][1:])
+    np.testing.assert_allclose(written[:, 4], follow(controller, lead=lead)["gap"], rtol=0, atol=1e-9)
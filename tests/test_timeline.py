@@ -0,0 +1,72 @@
+# import standard modules
+
+# import third party modules
+import numpy as np
+import pytest
+
+# import project related modules
+from components.vehicle.bidirectional import SimpleCar
+from components.vehicle.timeline import RouteTimeline
+
+
+# 0 -> 10 m/s in 5 s, hold 10 m/s for 3 s, stop instantly and reach 4 m/s in 2 s
+ROUTE = [(10, 5), (10, 3), (0, 0), (4, 2)]
+
+
+@pytest.fixture
+def timeline():
+    return RouteTimeline(ROUTE)
+
+
+def test_segments_skip_instant_changes(timeline):
+    np.testing.assert_array_equal(timeline.start, [0, 5, 8])
+    np.testing.assert_array_equal(timeline.end, [5, 8, 10])
+    np.testing.assert_array_equal(timeline.acceleration, [2, 0, 2])
+    np.testing.assert_array_equal(timeline.distance, [0, 25, 55])
+    assert (timeline.duration, timeline.final_velocity) == (10, 4)
+
+
+@pytest.mark.parametrize("second, expected", [
+    (0, (0, 2, 0)),
+    (2.5, (5, 2, 6.25)),
+    # the end of a segment belongs to the segment
+    (5, (10, 2, 25)),
+    (8, (10, 0, 55)),
+    (10, (4, 2, 59)),
+    # right after the instant stop the next segment starts at 0 m/s
+    (8 + 1e-9, (2e-9, 2, 55)),
+])
+def test_boundaries(timeline, second, expected):
+    assert tuple(value.item() for value in timeline.get(second)) == pytest.approx(expected, abs=1e-12)
+
+
+def test_arrays_match_single_seconds(timeline):
+    seconds = np.linspace(0, 10, 41).reshape(-1, 1)
+
+    velocity, acceleration, distance = timeline.get(seconds)
+
+    assert velocity.shape == seconds.shape
+    for s, v, a, d in zip(seconds.ravel(), velocity.ravel(), acceleration.ravel(), distance.ravel()):
+        assert (v, a, d) == tuple(value.item() for value in timeline.get(s))
+
+
+@pytest.mark.parametrize("second", [-1e-9, 10 + 1e-9])
+def test_seconds_outside_the_route_are_refused(timeline, second):
+    with pytest.raises(ValueError):
+        timeline.get(second)
+
+
+def test_route_without_durations_keeps_its_velocity():
+    velocity, acceleration, distance = RouteTimeline([(5, 0)]).get([0, 0])
+
+    assert velocity.tolist() == [5, 5] and acceleration.tolist() == [0, 0] and distance.tolist() == [0, 0]
+
+
+def test_simple_car_samples_the_timeline():
+    car = SimpleCar(verbose=False)
+    car.set_route(route=list(ROUTE))
+
+    velocity, acceleration, distance = car.get_second(np.arange(11))
+
+    np.testing.assert_allclose(velocity, [0, 2, 4, 6, 8, 10, 10, 10, 10, 2, 4], rtol=0, atol=1e-12)
+    np.testing.assert_allclose(distance[[5, 8, 10]], [25, 55, 59], rtol=0, atol=1e-12)